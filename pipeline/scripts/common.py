@@ -66,3 +66,21 @@ def parse_es_query(query_str: str) -> dict[str, Any]:
 
 def index_name(namespace: str, suffix: str | None) -> str:
     return f"{namespace}-{suffix}" if suffix else namespace
+
+
+# Read alias the webapp queries, pointing at the live outcomes-indexed version
+OUTCOMES_READ_ALIAS = "outcomes-indexed"
+
+
+async def live_index_suffix(client) -> str | None:
+    """Suffix of the pipeline indices behind the outcomes-indexed read alias."""
+    from pipeline.services.opensearch_utils import (
+        alias_for_versioned_index,
+        alias_targets,
+    )
+
+    for index in await alias_targets(client, OUTCOMES_READ_ALIAS):
+        alias = alias_for_versioned_index(index) or index
+        if alias.startswith(f"{OUTCOMES_READ_ALIAS}-"):
+            return alias.removeprefix(f"{OUTCOMES_READ_ALIAS}-")
+    return None
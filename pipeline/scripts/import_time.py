@@ -0,0 +1,89 @@
+#!/usr/bin/env -S uv run python
+"""
+Measure cold-start import cost of each lambda handler with ``python -X importtime``.
+
+Each handler module is imported in a fresh interpreter (several times, keeping the
+median) and the cumulative import time is reported alongside its slowest imports.
+With --budget-ms the script exits non-zero if any handler goes over budget, so it
+can be used to catch import-time regressions.
+
+Usage:
+  uv run python scripts/import_time.py
+  uv run python scripts/import_time.py --handlers scraper indexer --budget-ms 1500
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+HANDLERS = ["scraper", "augmenter", "company_disambiguator", "indexer", "refresher"]
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Return {imported module: (self us, cumulative us)} for one cold import."""
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(
+            [SRC_DIR, *filter(None, [os.getenv("PYTHONPATH")])]
+        ),
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        cwd=os.path.dirname(SRC_DIR),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Report cold-start import time per lambda handler."
+    )
+    parser.add_argument("--handlers", nargs="+", choices=HANDLERS, default=HANDLERS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="Fail if any handler's median cumulative import time exceeds this",
+    )
+    args = parser.parse_args()
+
+    over_budget = []
+    for handler in args.handlers:
+        module = f"lambdas.{handler}"
+        runs = [import_times(module) for _ in range(args.repeat)]
+        total_ms = statistics.median(run[module][1] for run in runs) / 1000
+        print(f"{module}: {total_ms:.1f} ms")
+
+        slowest = sorted(runs[-1].items(), key=lambda kv: kv[1][0], reverse=True)
+        for name, (self_us, _) in slowest[: args.top]:
+            print(f"    {self_us / 1000:8.1f} ms  {name}")
+
+        if args.budget_ms is not None and total_ms > args.budget_ms:
+            over_budget.append(module)
+
+    if over_budget:
+        print(
+            f"Over the {args.budget_ms} ms budget: {', '.join(over_budget)}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
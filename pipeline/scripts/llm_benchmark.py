@@ -0,0 +1,221 @@
+#!/usr/bin/env -S uv run python
+"""
+Benchmark the augmentation and company disambiguation paths against recorded
+LLM and Companies House responses.
+
+``record`` runs every input once against the live APIs and appends each call to
+a recordings JSONL file. ``replay`` serves those recordings from fake clients,
+with artificial latency and injected throttling/validation failures, and drives
+``get_extracted_data`` and ``disambiguate_company`` at scale.
+
+Inputs are JSONL: ``--documents`` lines hold ``document_type`` and
+``document_content`` (e.g. exported from outcomes-raw); ``--companies`` lines
+are DisambiguateCompanyRequest objects.
+
+Usage:
+  uv run python scripts/llm_benchmark.py record --documents docs.jsonl --recordings rec.jsonl
+  uv run python scripts/llm_benchmark.py replay --documents docs.jsonl --recordings rec.jsonl \\
+      --repeat 20 --concurrency 64 --latency 1.5 --throttle-rate 0.02 --invalid-rate 0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import statistics
+import time
+from collections import defaultdict
+
+from company_disambiguator.companies_house import CompaniesHouseClient
+from company_disambiguator.model import DisambiguateCompanyRequest
+from company_disambiguator.pipeline import disambiguate_company
+from pipeline.services import baml
+from pipeline.services.llm_replay import (
+    CallStats,
+    RecordingClient,
+    ReplayClient,
+    call_trace,
+    load_recordings,
+)
+from pipeline.transforms.augmentation import get_extracted_data
+
+LLM_CLIENTS = {"DefaultClient", "LargeClient"}
+
+
+def read_jsonl(path):
+    if not path:
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(values, p):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.traces = defaultdict(list)
+        self.failures = defaultdict(int)
+
+    async def run(self, label, coro_fn):
+        trace = []
+        call_trace.set(trace)
+        start = time.perf_counter()
+        try:
+            await coro_fn()
+        except Exception as e:
+            self.failures[label] += 1
+            print(f"{label} failed: {e!r}")
+        self.latencies[label].append(time.perf_counter() - start)
+        self.traces[label].append(trace)
+
+    def report(self, elapsed):
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        print(f"\n{total} items in {elapsed:.1f}s ({total / elapsed:.1f}/s)\n")
+        print(
+            f"{'path':<40} {'n':>6} {'fail':>5} {'p50 s':>7} {'p95 s':>7} "
+            f"{'calls':>6} {'retry%':>7} {'tokens':>8}"
+        )
+        for label in sorted(self.latencies):
+            latencies = self.latencies[label]
+            llm_calls = [
+                [call for call in trace if call[1] in LLM_CLIENTS]
+                for trace in self.traces[label]
+            ]
+            n = len(latencies)
+            calls = sum(len(trace) for trace in llm_calls)
+            retries = sum(
+                1 for trace in llm_calls for call in trace if call[1] == "LargeClient"
+            )
+            tokens = sum(call[2] for trace in llm_calls for call in trace)
+            print(
+                f"{label:<40} {n:>6} {self.failures[label]:>5} "
+                f"{percentile(latencies, 50):>7.2f} {percentile(latencies, 95):>7.2f} "
+                f"{calls / n:>6.2f} {100 * retries / max(calls, 1):>6.1f}% "
+                f"{tokens / n:>8.0f}"
+            )
+
+
+async def run(args):
+    async with contextlib.AsyncExitStack() as stack:
+        await benchmark(args, stack)
+
+
+async def benchmark(args, stack):
+    stats = CallStats()
+    if args.mode == "record":
+        baml.override_clients(
+            authenticated_client=RecordingClient(
+                baml.get_authenticated_client(), "DefaultClient", args.recordings, stats
+            ),
+            large_client=RecordingClient(
+                baml.get_large_client(), "LargeClient", args.recordings, stats
+            ),
+        )
+        companies_house = RecordingClient(
+            CompaniesHouseClient(), "CompaniesHouse", args.recordings, stats
+        )
+        await stack.enter_async_context(companies_house.inner)
+        repeat = 1
+    else:
+        recordings = load_recordings(args.recordings)
+
+        def replay(client_name):
+            return ReplayClient(
+                recordings,
+                client_name,
+                latency=args.latency,
+                throttle_rate=args.throttle_rate,
+                invalid_rate=args.invalid_rate,
+                stats=stats,
+                seed=args.seed,
+            )
+
+        baml.override_clients(
+            authenticated_client=replay("DefaultClient"),
+            large_client=replay("LargeClient"),
+        )
+        companies_house = ReplayClient(
+            recordings, "CompaniesHouse", latency=args.api_latency, stats=stats
+        )
+        repeat = args.repeat
+
+    documents = read_jsonl(args.documents)
+    companies = [
+        DisambiguateCompanyRequest.model_validate(request)
+        for request in read_jsonl(args.companies)
+    ]
+
+    results = Results()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(label, coro_fn):
+        async with semaphore:
+            await results.run(label, coro_fn)
+
+    tasks = []
+    for _ in range(repeat):
+        for doc in documents:
+            tasks.append(
+                bounded(
+                    f"extract:{doc['document_type']}",
+                    lambda doc=doc: get_extracted_data(
+                        doc["document_type"], doc["document_content"]
+                    ),
+                )
+            )
+        for request in companies:
+            tasks.append(
+                bounded(
+                    "disambiguate_company",
+                    lambda request=request: disambiguate_company(
+                        request, companies_house
+                    ),
+                )
+            )
+
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    results.report(time.perf_counter() - start)
+    if stats.errors:
+        print(f"\nInjected/API errors: {dict(stats.errors)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Record LLM responses, or replay them to benchmark extraction."
+    )
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--recordings", required=True, help="Recordings JSONL file")
+    parser.add_argument("--documents", help="Decision documents JSONL")
+    parser.add_argument("--companies", help="Disambiguation requests JSONL")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Replay each input N times"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        help="Seconds per replayed LLM call (default: recorded latency)",
+    )
+    parser.add_argument(
+        "--api-latency",
+        type=float,
+        default=0.1,
+        help="Seconds per replayed Companies House call",
+    )
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--invalid-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    if not args.documents and not args.companies:
+        parser.error("Pass --documents and/or --companies")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env -S uv run python
+"""
+Point the outcomes-indexed read alias, which the webapp queries, at the
+outcomes-indexed index for a pipeline suffix.
+
+The flip is a single atomic alias update, so readers switch from one suffix
+(or rebuilt version) to the next without downtime or editing the webapp's
+OUTCOMES_INDEX. The previously live index is left in place.
+
+Before the first promotion outcomes-indexed may still be a concrete index rather
+than an alias. --replace-index deletes it in the same atomic update, moving any
+other aliases on it to the promoted index.
+
+Usage:
+  uv run python scripts/promote_outcomes_index.py --index-suffix 1013
+  uv run python scripts/promote_outcomes_index.py --index-suffix 1013 --replace-index
+  uv run python scripts/promote_outcomes_index.py --show
+"""
+
+import argparse
+import asyncio
+import sys
+
+from common import (
+    OUTCOMES_READ_ALIAS,
+    get_boto_session,
+    get_opensearch_config,
+    index_name,
+)
+from pipeline.services.opensearch_utils import (
+    alias_targets,
+    create_client,
+    flip_aliases,
+)
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=f"Point the {OUTCOMES_READ_ALIAS} read alias at a suffix's index."
+    )
+    parser.add_argument("--index-suffix", help="Promote outcomes-indexed-SUFFIX")
+    parser.add_argument(
+        "--show", action="store_true", help="Only print what the alias points at"
+    )
+    parser.add_argument(
+        "--replace-index",
+        action="store_true",
+        help=f"If {OUTCOMES_READ_ALIAS} is a concrete index, delete it and replace "
+        "it with the alias",
+    )
+    args = parser.parse_args()
+    if not args.show and not args.index_suffix:
+        parser.error("--index-suffix is required unless --show is given")
+
+    session = get_boto_session(role_session_name="promote-outcomes-index")
+    endpoint, auth = get_opensearch_config(session)
+    client = create_client(cluster_host=endpoint, auth=auth, async_client=True)
+
+    try:
+        live = await alias_targets(client, OUTCOMES_READ_ALIAS)
+        concrete = not live and await client.indices.exists(index=OUTCOMES_READ_ALIAS)
+        if concrete:
+            print(f"{OUTCOMES_READ_ALIAS} is a concrete index", file=sys.stderr)
+        else:
+            print(
+                f"{OUTCOMES_READ_ALIAS} points at {', '.join(live) or 'nothing'}",
+                file=sys.stderr,
+            )
+        if args.show:
+            return
+
+        # The suffix's own name may be a versioned alias or a concrete index
+        source = index_name(OUTCOMES_READ_ALIAS, args.index_suffix)
+        targets = await alias_targets(client, source)
+        if len(targets) > 1:
+            raise SystemExit(f"{source} points at several indices: {targets}")
+        if not targets and not await client.indices.exists(index=source):
+            raise SystemExit(f"{source} does not exist")
+        index = targets[0] if targets else source
+
+        if concrete and not args.replace_index:
+            raise SystemExit(
+                f"{OUTCOMES_READ_ALIAS} is a concrete index, not an alias; pass "
+                f"--replace-index to delete it and point the alias at {index}"
+            )
+        await flip_aliases(
+            client, index, [OUTCOMES_READ_ALIAS], replace_index=args.replace_index
+        )
+        print(f"{OUTCOMES_READ_ALIAS} now points at {index}", file=sys.stderr)
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env -S uv run python
+"""
+Rebuild outcomes-indexed from the augmented decisions already in OpenSearch.
+
+Use this after changing transform_for_index, the events logic or the
+outcomes_indexed.json mapping, instead of a Step Functions redrive: no LLM or
+lambda is involved. Outcomes are transformed in a process pool and loaded into
+a new versioned index (e.g. outcomes-indexed-1012-v20250101120000), and the
+outcomes-indexed alias is then switched to it atomically. The previous index
+is left in place unless --delete-previous is given.
+
+The new index is loaded with refreshes and replicas off, then has the live
+index's settings restored and is force-merged before the alias flips. With
+--promote, the unsuffixed outcomes-indexed read alias that the webapp queries
+flips to it in the same update.
+
+The first rebuild of an index created before versioning needs
+--replace-index, which deletes the concrete index in the same update that
+creates the alias.
+
+Usage:
+  uv run python scripts/rebuild_outcomes_indexed.py --index-suffix 1012
+  uv run python scripts/rebuild_outcomes_indexed.py --index-suffix 1012 --workers 8 --no-swap
+  uv run python scripts/rebuild_outcomes_indexed.py --index-suffix 1013 --promote
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from common import (
+    OUTCOMES_READ_ALIAS,
+    get_boto_session,
+    get_opensearch_config,
+    index_name,
+)
+from pipeline.rebuild_outcomes import rebuild_outcomes_indexed
+from pipeline.services.opensearch_utils import (
+    alias_targets,
+    create_client,
+    get_mapping_from_path,
+)
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild outcomes-indexed from outcomes-augmented without lambdas."
+    )
+    parser.add_argument("--index-suffix", help="Rebuild outcomes-indexed-SUFFIX")
+    parser.add_argument(
+        "--workers", type=int, help="Transform processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--no-swap",
+        action="store_true",
+        help="Load the new index but leave the alias pointing where it is",
+    )
+    parser.add_argument(
+        "--promote",
+        action="store_true",
+        help=f"Also point the {OUTCOMES_READ_ALIAS} read alias at the new index",
+    )
+    parser.add_argument(
+        "--replace-index",
+        action="store_true",
+        help="Replace a concrete (unversioned) index with the alias",
+    )
+    parser.add_argument(
+        "--delete-previous",
+        action="store_true",
+        help="Delete the indices the alias pointed at before the swap",
+    )
+    args = parser.parse_args()
+    if args.promote and args.no_swap:
+        parser.error("--promote needs the alias swap")
+
+    source_index = index_name("outcomes-augmented", args.index_suffix)
+    alias = index_name("outcomes-indexed", args.index_suffix)
+
+    session = get_boto_session(role_session_name="rebuild-outcomes-indexed")
+    endpoint, auth = get_opensearch_config(session)
+    client = create_client(cluster_host=endpoint, auth=auth, async_client=True)
+
+    try:
+        previous = await alias_targets(client, alias)
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            stats = await rebuild_outcomes_indexed(
+                client,
+                source_index=source_index,
+                alias=alias,
+                mapping=get_mapping_from_path("./index_mappings/outcomes_indexed.json"),
+                executor=executor,
+                swap=not args.no_swap,
+                replace_index=args.replace_index,
+                read_aliases=[OUTCOMES_READ_ALIAS] if args.promote else [],
+            )
+        print(stats.report(), file=sys.stderr)
+        print(f"Took {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        if args.no_swap:
+            print(f"{alias} still points at {previous or 'nothing'}", file=sys.stderr)
+        elif previous and args.delete_previous:
+            await client.indices.delete(index=",".join(previous))
+            print(f"Deleted {', '.join(previous)}", file=sys.stderr)
+        elif previous:
+            print(f"Previous index(es) kept: {', '.join(previous)}", file=sys.stderr)
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
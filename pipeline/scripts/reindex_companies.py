@@ -11,6 +11,13 @@ Usage:
   uv run python scripts/reindex_companies.py '{"match":{"input.name":"Acme"}}'  # raw query JSON
   uv run python scripts/reindex_companies.py --unidentified         # built-in unidentified query
   uv run python scripts/reindex_companies.py --unidentified --clear-existing-disambiguation
+  uv run python scripts/reindex_companies.py --unidentified --local  # bulk, in this process
+
+With --local, companies are disambiguated here with the bulk disambiguation API
+rather than by invoking the Lambda once per company: identical requests run once,
+requests for the same employer share Companies House searches, and results are
+written with a single bulk upsert per batch. Needs COMPANIES_HOUSE_API_KEY and
+Gemini credentials in the environment.
 
 """
 
@@ -25,11 +32,16 @@ from tqdm import tqdm
 
 from common import get_boto_session, get_opensearch_config
 
-BOTO_TIMEOUT = 900  # seconds
-
+from company_disambiguator.companies_house import CompaniesHouseClient
 from company_disambiguator.model import DisambiguateCompanyRequest, request_to_doc_id
+from company_disambiguator.pipeline import (
+    bulk_upsert_stored_results,
+    disambiguate_companies,
+)
 from pipeline.services.opensearch_utils import create_client
 
+BOTO_TIMEOUT = 900  # seconds
+
 INDEX = "disambiguated-companies"
 DEFAULT_LAMBDA_NAME = "pipeline-company-disambiguator"
 
@@ -121,6 +133,45 @@ def invoke_lambda_sync(session, function_name: str, event: dict) -> dict:
     return result
 
 
+async def reindex_locally(client, requests, batch_size: int, concurrency: int):
+    """Disambiguate in bulk in this process, upserting each batch at once."""
+    failures = 0
+    async with CompaniesHouseClient() as companies_house_client:
+        with tqdm(
+            total=len(requests), desc="Reindexing", unit="company", file=sys.stderr
+        ) as progress:
+            for start in range(0, len(requests), batch_size):
+                batch = requests[start : start + batch_size]
+                results = await disambiguate_companies(
+                    batch, companies_house_client, concurrency=concurrency
+                )
+                stored = []
+                for req, result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        failures += 1
+                        tqdm.write(
+                            f"Failed for {req.name}: {result!r}", file=sys.stderr
+                        )
+                    else:
+                        stored.append(result)
+                # Duplicate requests in a batch share a result
+                unique = list({result.id: result for result in stored}.values())
+                written = await bulk_upsert_stored_results(client, INDEX, unique)
+                for stored, result in zip(unique, written):
+                    if isinstance(result, Exception):
+                        failures += 1
+                        tqdm.write(
+                            f"Failed to write {stored.id}: {result}", file=sys.stderr
+                        )
+                progress.update(len(batch))
+        print(
+            f"Companies House cache: {companies_house_client.cache_stats()}",
+            file=sys.stderr,
+        )
+    if failures:
+        print(f"{failures} companies failed", file=sys.stderr)
+
+
 async def main():
     parser = argparse.ArgumentParser(
         description="Reindex companies by running an ES query and invoking the company-disambiguator Lambda."
@@ -140,6 +191,23 @@ async def main():
         action="store_true",
         help="Before reindexing, remove existing disambiguation fields from matched docs",
     )
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Disambiguate in bulk in this process instead of invoking the Lambda",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=200,
+        help="Companies per bulk upsert with --local (default: 200)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Companies disambiguated at once with --local (default: 8)",
+    )
     args = parser.parse_args()
     if not args.unidentified and not args.query:
         parser.error("query is required unless --unidentified is provided")
@@ -169,6 +237,11 @@ async def main():
             )
             await clear_existing_disambiguation(client, requests)
 
+        if args.local:
+            await reindex_locally(client, requests, args.batch_size, args.concurrency)
+            print("Done.", file=sys.stderr)
+            return
+
         for req in tqdm(
             requests,
             desc="Reindexing",
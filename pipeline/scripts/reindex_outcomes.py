@@ -2,7 +2,8 @@
 """
 Build a Step Functions ScraperEvent JSON for re-indexing pipeline outcomes.
 
-Queries outcomes-indexed (by default outcomes-indexed-1012), resolves matching
+Queries outcomes-indexed (by default the live index behind the outcomes-indexed
+read alias), resolves matching
 outcome references to raw decision document IDs in outcomes-raw, and prints a
 JSON payload suitable for pasting into the AWS Step Functions console.
 
@@ -22,11 +23,19 @@ import sys
 
 from opensearchpy import helpers
 
-from common import get_boto_session, get_opensearch_config, index_name, parse_es_query
+from common import (
+    get_boto_session,
+    get_opensearch_config,
+    index_name,
+    live_index_suffix,
+    parse_es_query,
+)
 from pipeline.services.opensearch_utils import create_client
 from pipeline.types.documents import DocumentType
 
 STEP_FUNCTIONS_INPUT_LIMIT_BYTES = 256 * 1024
+# Suffix of the indices from before the outcomes-indexed read alias existed
+LEGACY_INDEX_SUFFIX = "1012"
 REFERENCE_BATCH_SIZE = 500
 
 
@@ -106,8 +115,9 @@ async def main() -> None:
     )
     parser.add_argument(
         "--index-suffix",
-        default="1012",
-        help="Index suffix for outcomes-indexed / outcomes-raw (default: 1012)",
+        help="Index suffix for outcomes-indexed / outcomes-raw "
+        "(default: the suffix the outcomes-indexed read alias points at, "
+        f"or {LEGACY_INDEX_SUFFIX} before it exists)",
     )
     parser.add_argument(
         "--outcomes-index",
@@ -136,10 +146,6 @@ async def main() -> None:
     args = parser.parse_args()
 
     query = parse_es_query(args.query)
-    outcomes_index = args.outcomes_index or index_name(
-        "outcomes-indexed", args.index_suffix
-    )
-    raw_index = args.raw_index or index_name("outcomes-raw", args.index_suffix)
 
     session = get_boto_session(role_session_name="reindex-outcomes")
     endpoint, auth = get_opensearch_config(session)
@@ -150,6 +156,23 @@ async def main() -> None:
     )
 
     try:
+        if args.index_suffix is None:
+            args.index_suffix = await live_index_suffix(client)
+            if args.index_suffix is None:
+                args.index_suffix = LEGACY_INDEX_SUFFIX
+                print(
+                    "The outcomes-indexed read alias isn't set up yet (see "
+                    "scripts/promote_outcomes_index.py); using index suffix "
+                    f"{args.index_suffix}",
+                    file=sys.stderr,
+                )
+            else:
+                print(f"Using live index suffix {args.index_suffix}", file=sys.stderr)
+        outcomes_index = args.outcomes_index or index_name(
+            "outcomes-indexed", args.index_suffix
+        )
+        raw_index = args.raw_index or index_name("outcomes-raw", args.index_suffix)
+
         print(f"Querying {outcomes_index}…", file=sys.stderr)
         references = await collect_outcome_references(client, outcomes_index, query)
         print(f"Matched {len(references)} outcome(s).", file=sys.stderr)
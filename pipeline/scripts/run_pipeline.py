@@ -0,0 +1,116 @@
+#!/usr/bin/env -S uv run python
+"""
+Run the whole pipeline (scrape, augment, disambiguate, index) in this process,
+without Step Functions or a lambda invocation per decision.
+
+Uses the same environment as the lambdas (OPENSEARCH_ENDPOINT, API_BASE,
+GOOGLE_API_KEY, COMPANIES_HOUSE_API_KEY, ...). Each stage runs with its own
+concurrency and a per-stage throughput report is printed at the end.
+
+Usage:
+  uv run python scripts/run_pipeline.py                          # scrape updated outcomes
+  uv run python scripts/run_pipeline.py --index-suffix 1012 --limit-items 50
+  uv run python scripts/run_pipeline.py --redrive --augment-concurrency 32  # full backfill
+  uv run python scripts/run_pipeline.py --ignore-fingerprints --bulk-load   # full scrape
+  uv run python scripts/run_pipeline.py --redrive-ids ID [ID ...] --no-augment
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from lambdas.local_pipeline import LocalPipeline, redrive_refs, report, scraped_refs
+from lambdas.refresher import RefresherEvent, refresh_indices
+from lambdas.scraper import Redrive, ScraperEvent, raw_index
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Run the scrape → augment → disambiguate → index pipeline locally."
+    )
+    parser.add_argument("--index-suffix", help="Use outcomes-*-SUFFIX indices")
+    parser.add_argument("--limit-items", type=int, help="Stop scraping after N items")
+    parser.add_argument(
+        "--force-last-event", help="As for the scraper's forceLastEvent"
+    )
+    parser.add_argument(
+        "--ignore-fingerprints",
+        action="store_true",
+        help="Re-download every document even if unchanged",
+    )
+    parser.add_argument(
+        "--bulk-load",
+        action="store_true",
+        help="Write scraped decisions with large concurrent bulks, for a full scrape",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--redrive",
+        action="store_true",
+        help="Process every decision already in the raw index instead of scraping",
+    )
+    source.add_argument(
+        "--redrive-ids", nargs="+", help="Process these raw decision IDs only"
+    )
+    parser.add_argument(
+        "--no-augment",
+        action="store_true",
+        help="With a redrive, reuse existing augmented documents",
+    )
+    parser.add_argument("--augment-concurrency", type=int, default=8)
+    parser.add_argument("--disambiguate-concurrency", type=int, default=4)
+    parser.add_argument("--index-concurrency", type=int, default=8)
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=100,
+        help="Items buffered between stages (default: 100)",
+    )
+    parser.add_argument(
+        "--no-refresh",
+        action="store_true",
+        help="Skip the final refresh of the augmented and indexed indices",
+    )
+    args = parser.parse_args()
+    if args.no_augment and not (args.redrive or args.redrive_ids):
+        parser.error("--no-augment only applies to a redrive")
+
+    scraper_event = ScraperEvent(
+        indexSuffix=args.index_suffix,
+        limitItems=args.limit_items,
+        forceLastEvent=args.force_last_event,
+        ignoreFingerprints=args.ignore_fingerprints,
+        bulkLoad=args.bulk_load,
+    )
+    if args.redrive or args.redrive_ids:
+        redrive = Redrive(
+            complete=args.redrive, augment=not args.no_augment, ids=args.redrive_ids
+        )
+        refs = redrive_refs(redrive, raw_index(scraper_event))
+    else:
+        refs = scraped_refs(scraper_event, queue_size=args.queue_size)
+
+    pipeline = LocalPipeline(
+        augment_concurrency=args.augment_concurrency,
+        disambiguate_concurrency=args.disambiguate_concurrency,
+        index_concurrency=args.index_concurrency,
+        queue_size=args.queue_size,
+    )
+    start = time.perf_counter()
+    try:
+        await pipeline.run(refs)
+    finally:
+        elapsed = time.perf_counter() - start
+        print(f"\nPipeline ran for {elapsed:.1f}s\n", file=sys.stderr)
+        print(report(pipeline.stats), file=sys.stderr)
+
+    if not args.no_refresh:
+        refreshed = await refresh_indices(RefresherEvent(indexSuffix=args.index_suffix))
+        print(f"Refreshed {', '.join(refreshed['refreshed'])}", file=sys.stderr)
+    if any(stage.failed for stage in pipeline.stats):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -44,13 +44,13 @@ args = parser.parse_args()
 async def main():
     """Run the Companies House search."""
     try:
-        client = CompaniesHouseClient()
-        result = await client.search(
-            q=args.query,
-            items_per_page=args.items_per_page,
-            start_index=args.start_index,
-            restrictions=args.restrictions,
-        )
+        async with CompaniesHouseClient() as client:
+            result = await client.search(
+                q=args.query,
+                items_per_page=args.items_per_page,
+                start_index=args.start_index,
+                restrictions=args.restrictions,
+            )
 
         if args.json:
             print(json.dumps(result, indent=2))
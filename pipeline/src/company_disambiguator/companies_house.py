@@ -1,12 +1,17 @@
 import os
 import json
 import asyncio
+import importlib.util
+import socket
+import threading
 import time
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Mapping
 from dataclasses import dataclass
 import httpx
 from async_batcher.batcher import AsyncBatcher
-from pipeline.services.secrets import secrets_store
+from pipeline.services.secrets import get_secrets_store
+from company_disambiguator.response_cache import ResponseCache, search_cache_key
+from company_disambiguator.rate_limit import RateLimitBackend, retry_after_seconds
 
 
 def _get_api_key() -> Optional[str]:
@@ -24,7 +29,7 @@ def _get_api_key() -> Optional[str]:
     secret_name = os.getenv("COMPANIES_HOUSE_API_KEY_SECRET")
     if secret_name:
         try:
-            secret_string = secrets_store.get_secret_string(secret_name)
+            secret_string = get_secrets_store().get_secret_string(secret_name)
             secret_dict = json.loads(secret_string)
             return secret_dict.get("api_key") or secret_dict.get(
                 "COMPANIES_HOUSE_API_KEY"
@@ -54,16 +59,35 @@ SEARCH_RESULT_ALLOWLIST = [
 ]
 
 
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# One search fans out to up to items_per_page profile requests, and the
+# profile batcher runs up to 10 batches at once
+CONNECTION_LIMITS = dict(
+    max_connections=50,
+    max_keepalive_connections=20,
+    keepalive_expiry=60.0,
+)
+
+
+# Retries of a request answered with 429 before giving up
+MAX_RATE_LIMITED_RETRIES = 3
+
+
 @dataclass
-class RateLimitState:
-    """Tracks rate limit state from API headers."""
+class RateLimitState(RateLimitBackend):
+    """Tracks rate limit state from API headers, for this process only.
+
+    See company_disambiguator.rate_limit for backends shared between processes.
+    """
 
     limit: int = 600
     remaining: int = 600
     reset: int = 0  # Unix timestamp
     window: str = "5m"
 
-    def update_from_headers(self, headers: Dict[str, str]) -> None:
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
         """Update rate limit state from response headers."""
         if "X-Ratelimit-Limit" in headers:
             self.limit = int(headers["X-Ratelimit-Limit"])
@@ -98,6 +122,43 @@ class RateLimitState:
                 # Reset remaining to limit after waiting
                 self.remaining = self.limit
 
+    async def acquire(self, count: int = 1) -> None:
+        await self.wait_if_needed(count)
+        self.remaining -= count
+
+    async def observe(self, headers: Mapping[str, str]) -> None:
+        self.update_from_headers(headers)
+
+    async def pause(self, seconds: float) -> None:
+        self.remaining = 0
+        self.reset = max(self.reset, int(time.time() + seconds))
+
+
+async def rate_limited_get(
+    client: httpx.AsyncClient,
+    rate_limit: RateLimitBackend,
+    url: str,
+    max_retries: int = MAX_RATE_LIMITED_RETRIES,
+    **kwargs,
+) -> httpx.Response:
+    """GET within the rate limit, waiting out and retrying 429 responses.
+
+    Raises:
+        httpx.HTTPStatusError: For other error responses, or once retries run out
+    """
+    for attempt in range(max_retries + 1):
+        await rate_limit.acquire(1)
+        response = await client.get(url, **kwargs)
+        # httpx headers are case-insensitive; a plain dict of them is not
+        await rate_limit.observe(response.headers)
+        if response.status_code != 429 or attempt == max_retries:
+            break
+        wait_time = retry_after_seconds(response.headers)
+        print(f"Rate limited by Companies House, retrying in {wait_time:.1f}s")
+        await rate_limit.pause(wait_time)
+    response.raise_for_status()
+    return response
+
 
 class CompanyProfileBatcher(AsyncBatcher[str, Dict[str, Any]]):
     """Batcher for fetching company profiles in parallel with rate limiting."""
@@ -107,7 +168,7 @@ class CompanyProfileBatcher(AsyncBatcher[str, Dict[str, Any]]):
         client: httpx.AsyncClient,
         auth: tuple,
         timeout: float,
-        rate_limit: RateLimitState,
+        rate_limit: RateLimitBackend,
         base_url: str,
     ):
         """Initialize the company profile batcher.
@@ -142,9 +203,6 @@ class CompanyProfileBatcher(AsyncBatcher[str, Dict[str, Any]]):
         Returns:
             List of company profile dictionaries with sic_codes
         """
-        # Check rate limit before making requests
-        await self.rate_limit.wait_if_needed(len(batch))
-
         # Fetch all company profiles in parallel
         tasks = [
             self._fetch_company_profile(company_number) for company_number in batch
@@ -172,21 +230,43 @@ class CompanyProfileBatcher(AsyncBatcher[str, Dict[str, Any]]):
             Dictionary with requested fields from company profile
         """
         url = f"{self.base_url}/{company_number}"
-        response = await self.client.get(
+        response = await rate_limited_get(
+            self.client,
+            self.rate_limit,
             url,
             auth=self.auth,
             timeout=self.timeout,
         )
-        response.raise_for_status()
-
-        # Update rate limit from response headers
-        self.rate_limit.update_from_headers(dict(response.headers))
 
         profile = response.json()
         # Extract only requested fields
         return {field: profile.get(field) for field in COMPANY_PROFILE_FIELDS}
 
 
+async def _close_session(
+    http_client: httpx.AsyncClient, batcher: CompanyProfileBatcher
+) -> None:
+    await batcher.stop(force=False)
+    await http_client.aclose()
+
+
+def _drop_connections(http_client: httpx.AsyncClient) -> None:
+    """Shut down the pooled connections of a client whose event loop has
+    closed, as ``aclose`` can no longer run; the sockets are freed with it.
+    """
+    pool = getattr(http_client._transport, "_pool", None)
+    for connection in getattr(pool, "connections", []):
+        stream = getattr(
+            getattr(connection, "_connection", None), "_network_stream", None
+        )
+        sock = stream.get_extra_info("socket") if stream else None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # Already disconnected
+
+
 class CompaniesHouseClient:
     """Client for Companies House Search API.
 
@@ -194,6 +274,10 @@ class CompaniesHouseClient:
     in parallel to enrich results with SIC codes. Respects global rate limits
     via response headers.
 
+    Owns a pooled (HTTP/2 where available) httpx client and a profile batcher,
+    both created on first use and reused across searches. Use it as an async
+    context manager, or call ``aclose`` when done.
+
     Documentation:
     - Search: https://developer-specs.company-information.service.gov.uk/companies-house-public-data-api/reference/search/search-companies
     - Company Profile: https://developer-specs.company-information.service.gov.uk/companies-house-public-data-api/reference/company-profile/company-profile
@@ -204,6 +288,10 @@ class CompaniesHouseClient:
         api_key: Optional[str] = None,
         timeout: float = 30.0,
         base_url: str = "https://api.company-information.service.gov.uk",
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        search_cache: Optional[ResponseCache] = None,
+        profile_cache: Optional[ResponseCache] = None,
+        rate_limit: Optional[RateLimitBackend] = None,
     ):
         """Initialize the Companies House client.
 
@@ -213,6 +301,13 @@ class CompaniesHouseClient:
             timeout: Request timeout in seconds. Defaults to 30.0.
             base_url: Base URL for the Companies House API. Defaults to the official
                      API URL. Can be set to point to a fake API for testing.
+            transport: Optional httpx transport, e.g. a MockTransport for tests.
+            search_cache: Optional cache of enriched search results, keyed by
+                     normalized query and paging parameters.
+            profile_cache: Optional cache of company profiles by company number.
+            rate_limit: Where to draw request quota from. Defaults to
+                     per-process state; pass a shared backend when several
+                     processes use the same API key.
         """
         self.api_key = api_key or _get_api_key()
         if not self.api_key:
@@ -227,7 +322,77 @@ class CompaniesHouseClient:
         # and an empty password
         self.auth = (self.api_key, "")
         # Shared rate limit state across all requests
-        self.rate_limit = RateLimitState()
+        self.rate_limit = rate_limit or RateLimitState()
+        self.transport = transport
+        self.search_cache = search_cache
+        self.profile_cache = profile_cache
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._profile_batcher: Optional[CompanyProfileBatcher] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> "CompaniesHouseClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _session(self) -> tuple[httpx.AsyncClient, CompanyProfileBatcher]:
+        """Get the pooled client and batcher, (re)creating them for this event loop.
+
+        Both are bound to the loop they were created on, and a lambda may run
+        successive invocations on a new loop. Ones left on another loop are
+        closed there, or dropped if that loop has gone.
+        """
+        loop = asyncio.get_running_loop()
+        if self._http_client is None or self._loop is not loop:
+            if self._http_client is not None:
+                self._abandon_session(self._loop)
+            self._http_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(**CONNECTION_LIMITS),
+                transport=self.transport,
+            )
+            self._profile_batcher = CompanyProfileBatcher(
+                self._http_client,
+                self.auth,
+                self.timeout,
+                self.rate_limit,
+                self.base_url,
+            )
+            self._loop = loop
+        return self._http_client, self._profile_batcher
+
+    def _abandon_session(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Release the client and batcher created on ``loop``, which isn't the
+        running one, so their connections and tasks don't outlive it.
+        """
+        http_client, batcher = self._http_client, self._profile_batcher
+        self._http_client = self._profile_batcher = self._loop = None
+        if loop.is_running():
+            # On another thread, so close them there
+            asyncio.run_coroutine_threadsafe(_close_session(http_client, batcher), loop)
+        elif not loop.is_closed():
+            # Idle, so run it just long enough to close them
+            closer = threading.Thread(
+                target=loop.run_until_complete,
+                args=(_close_session(http_client, batcher),),
+            )
+            closer.start()
+            closer.join()
+        else:
+            _drop_connections(http_client)
+
+    async def aclose(self) -> None:
+        """Stop the profile batcher and close pooled connections."""
+        if self._http_client is None:
+            return
+        if self._loop is not asyncio.get_running_loop():
+            self._abandon_session(self._loop)
+            return
+        http_client, batcher = self._http_client, self._profile_batcher
+        self._http_client = self._profile_batcher = self._loop = None
+        await _close_session(http_client, batcher)
 
     async def search(
         self,
@@ -252,6 +417,51 @@ class CompaniesHouseClient:
             httpx.HTTPStatusError: If the API request fails
             httpx.RequestError: If there's a network error
         """
+        cache_key = search_cache_key(q, items_per_page, start_index, restrictions)
+        if self.search_cache is not None:
+            cached = await self.search_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        items = await self._search(q, items_per_page, start_index, restrictions)
+        if self.search_cache is not None:
+            await self.search_cache.put(cache_key, items)
+        return items
+
+    def cache_stats(self) -> Dict[str, str]:
+        """Hit-rate summary for each configured cache."""
+        caches = {"search": self.search_cache, "profile": self.profile_cache}
+        return {name: str(cache.stats) for name, cache in caches.items() if cache}
+
+    async def _fetch_profiles(
+        self, batcher: CompanyProfileBatcher, company_numbers: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Profiles by company number, from the profile cache where possible."""
+        profiles = {}
+        if self.profile_cache is not None:
+            for company_number in company_numbers:
+                cached = await self.profile_cache.get(company_number)
+                if cached is not None:
+                    profiles[company_number] = cached
+
+        missing = [number for number in company_numbers if number not in profiles]
+        fetched = await asyncio.gather(
+            *(batcher.process(company_number) for company_number in missing)
+        )
+        for company_number, profile in zip(missing, fetched):
+            profiles[company_number] = profile
+            # Failed fetches come back empty and aren't worth remembering
+            if profile and self.profile_cache is not None:
+                await self.profile_cache.put(company_number, profile)
+        return profiles
+
+    async def _search(
+        self,
+        q: str,
+        items_per_page: int,
+        start_index: int,
+        restrictions: Optional[str],
+    ) -> List[Dict[str, Any]]:
         # Build search parameters
         params: Dict[str, Any] = {
             "q": q,
@@ -261,77 +471,61 @@ class CompaniesHouseClient:
         if restrictions:
             params["restrictions"] = restrictions
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            # Check rate limit before search request
-            await self.rate_limit.wait_if_needed(1)
+        client, batcher = self._session()
 
-            # Perform search
-            search_url = f"{self.base_url}/search/companies"
-            response = await client.get(
-                search_url,
-                auth=self.auth,
-                params=params,
-            )
-            response.raise_for_status()
-
-            # Update rate limit from search response headers
-            self.rate_limit.update_from_headers(dict(response.headers))
-
-            search_result = response.json()
-
-            items = search_result.get("items", [])
-            if not items:
-                return []
-
-            # Filter items to only include allowlisted fields
-            filtered_items = []
-            for item in items:
-                filtered_item = {
-                    field: item.get(field)
-                    for field in SEARCH_RESULT_ALLOWLIST
-                    if field in item
-                }
-                filtered_items.append(filtered_item)
-
-            # Extract company numbers from filtered search results
-            company_numbers = [
-                item.get("company_number")
-                for item in filtered_items
-                if item.get("company_number")
-            ]
-
-            if not company_numbers:
-                # Return filtered results even if no company numbers
-                return filtered_items
-
-            # Fetch company profiles in parallel using batcher
-            batcher = CompanyProfileBatcher(
-                client, self.auth, self.timeout, self.rate_limit, self.base_url
-            )
-            try:
-                # Process all company numbers through the batcher
-                profile_futures = [
-                    batcher.process(company_number)
-                    for company_number in company_numbers
-                ]
-                profiles = await asyncio.gather(*profile_futures)
-
-                # Merge profile fields into filtered search results
-                for item, profile in zip(filtered_items, profiles):
-                    if profile:
-                        for field in COMPANY_PROFILE_FIELDS:
-                            item[field] = profile.get(field)
-                    else:
-                        # Set defaults for missing profiles
-                        for field in COMPANY_PROFILE_FIELDS:
-                            if field == "sic_codes":
-                                item[field] = []
-                            else:
-                                item[field] = None
-
-            finally:
-                # Stop the batcher
-                await batcher.stop(force=False)
-
-            # Return filtered and enriched items
+        # Perform search within the rate limit
+        search_url = f"{self.base_url}/search/companies"
+        response = await rate_limited_get(
+            client,
+            self.rate_limit,
+            search_url,
+            auth=self.auth,
+            params=params,
+        )
+
+        search_result = response.json()
+
+        items = search_result.get("items", [])
+        if not items:
+            return []
+
+        # Filter items to only include allowlisted fields
+        filtered_items = []
+        for item in items:
+            filtered_item = {
+                field: item.get(field)
+                for field in SEARCH_RESULT_ALLOWLIST
+                if field in item
+            }
+            filtered_items.append(filtered_item)
+
+        # Extract company numbers from filtered search results
+        company_numbers = [
+            item.get("company_number")
+            for item in filtered_items
+            if item.get("company_number")
+        ]
+
+        if not company_numbers:
+            # Return filtered results even if no company numbers
             return filtered_items
+
+        # Fetch company profiles in parallel using the shared batcher
+        profiles = await self._fetch_profiles(batcher, company_numbers)
+
+        # Merge profile fields into filtered search results
+        for item in filtered_items:
+            profile = profiles.get(item.get("company_number"))
+            if profile:
+                for field in COMPANY_PROFILE_FIELDS:
+                    item[field] = profile.get(field)
+            else:
+                # Set defaults for missing profiles
+                for field in COMPANY_PROFILE_FIELDS:
+                    if field == "sic_codes":
+                        item[field] = []
+                    else:
+                        item[field] = None
+
+        # Return filtered and enriched items
+        return filtered_items
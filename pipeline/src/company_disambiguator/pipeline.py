@@ -1,13 +1,21 @@
 """Operations for disambiguated companies: storage, retrieval, and indexing."""
 
+import asyncio
 import json
 import logging
 import os
 from typing import Optional
 
-from opensearchpy import AsyncOpenSearch
+from opensearchpy import AsyncOpenSearch, helpers
 
-from pipeline.services.baml import authenticated_client
+from pipeline.services.opensearch_utils import RefreshPolicy, refresh_params
+
+from pipeline.services import baml
+from pipeline.services.llm_scheduler import (
+    Priority,
+    estimate_tokens,
+    get_llm_scheduler,
+)
 from company_disambiguator.companies_house import CompaniesHouseClient
 from company_disambiguator.model import (
     DisambiguateCompanyRequest,
@@ -15,7 +23,9 @@ from company_disambiguator.model import (
     IdentifiedCompany,
     UnidentifiedCompany,
     StoredResult,
+    request_to_doc_id,
 )
+from company_disambiguator.response_cache import normalize_query, search_cache_key
 from company_disambiguator.sic_codes import transform_sic_codes
 
 
@@ -24,15 +34,33 @@ if os.getenv("MOCK_LLM"):
     baml_options["client"] = "FakeApiClient"
 
 
+def speculative_from_env() -> bool:
+    return os.getenv("DISAMBIGUATION_SPECULATIVE", "false").lower() in ("1", "true")
+
+
+def abandon(task: asyncio.Task):
+    """Cancel a task whose result is no longer wanted. If it has already
+    failed, its exception is retrieved so asyncio doesn't log it as unhandled.
+    """
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
 async def disambiguate_company(
     request: DisambiguateCompanyRequest,
     companies_house_client: CompaniesHouseClient,
+    *,
+    speculative: Optional[bool] = None,
 ) -> tuple[DisambiguatedCompany, Optional[dict[str, str]]]:
     """Disambiguate a single company.
 
     Args:
         request: Disambiguation request
         companies_house_client: Companies House client instance
+        speculative: Start GuessSicCodes alongside the second search rather than
+            after it, cancelling it if the second search identifies the company.
+            Trades a possibly wasted LLM call for lower tail latency. Defaults
+            to DISAMBIGUATION_SPECULATIVE.
 
     Returns:
         Tuple of (transformed result, optional debug info)
@@ -51,20 +79,41 @@ async def disambiguate_company(
 
         # Call BAML function with candidates and other parameters
         return (
-            await authenticated_client.DisambiguateCompany(
-                candidates=candidates_json,
-                name=company_name,
+            await get_llm_scheduler().submit(
+                lambda: baml.authenticated_client.DisambiguateCompany(
+                    candidates=candidates_json,
+                    name=company_name,
+                    unions=request.unions,
+                    application_date=request.application_date,
+                    bargaining_unit=request.bargaining_unit,
+                    locations=request.locations,
+                    baml_options=baml_options,
+                ),
+                tokens=estimate_tokens(candidates_json, request.bargaining_unit),
+                priority=Priority.high,
+            ),
+            filtered_candidates,
+        )
+
+    async def guess_sic_codes():
+        return await get_llm_scheduler().submit(
+            lambda: baml.authenticated_client.GuessSicCodes(
+                name=request.name,
                 unions=request.unions,
-                application_date=request.application_date,
                 bargaining_unit=request.bargaining_unit,
                 locations=request.locations,
                 baml_options=baml_options,
             ),
-            filtered_candidates,
+            tokens=estimate_tokens(request.bargaining_unit),
+            priority=Priority.high,
         )
 
+    if speculative is None:
+        speculative = speculative_from_env()
+
     debug = None
     suggested_name = None
+    guess_task = None
     baml_result, candidates = await disambiguate_for_name(request.name)
     if baml_result.type == "requires-new-search":
         logging.info(f"New search required for {request.name}: {baml_result.reason}")
@@ -74,7 +123,16 @@ async def disambiguate_company(
             "original_candidates": [c["title"] for c in candidates],
         }
         suggested_name = baml_result.suggested_name
-        baml_result, candidates = await disambiguate_for_name(suggested_name)
+        if speculative:
+            guess_task = asyncio.create_task(guess_sic_codes())
+        try:
+            baml_result, candidates = await disambiguate_for_name(suggested_name)
+        except BaseException:
+            if guess_task:
+                abandon(guess_task)
+            raise
+        if guess_task and baml_result.type != "requires-new-search":
+            abandon(guess_task)
 
     if baml_result.type == "requires-new-search":
         debug = {
@@ -84,13 +142,7 @@ async def disambiguate_company(
             "new_search_candidates": [c["title"] for c in candidates],
         }
 
-        baml_result = await authenticated_client.GuessSicCodes(
-            name=request.name,
-            unions=request.unions,
-            bargaining_unit=request.bargaining_unit,
-            locations=request.locations,
-            baml_options=baml_options,
-        )
+        baml_result = await (guess_task or guess_sic_codes())
 
     sic_codes = []
     if hasattr(baml_result, "sic_codes"):
@@ -126,6 +178,7 @@ async def upsert_stored_result(
     client: AsyncOpenSearch,
     index: str,
     stored: StoredResult,
+    refresh: RefreshPolicy = RefreshPolicy.wait_for,
 ) -> StoredResult:
     await client.update(
         index=index,
@@ -134,7 +187,124 @@ async def upsert_stored_result(
             "doc": stored.model_dump(exclude_none=True),
             "doc_as_upsert": True,
         },
-        params={"retry_on_conflict": 3},
+        params={"retry_on_conflict": 3, **refresh_params(refresh)},
     )
-    await client.indices.refresh(index=index)
     return stored
+
+
+class SharedSearches:
+    """Wraps a Companies House client so that concurrent searches for the same
+    (normalized) name are issued once and the result shared.
+    """
+
+    def __init__(self, companies_house_client: CompaniesHouseClient):
+        self.companies_house_client = companies_house_client
+        self._searches: dict[str, asyncio.Task] = {}
+
+    async def search(self, q: str, items_per_page: int = 20, **kwargs):
+        key = search_cache_key(
+            q, items_per_page, kwargs.get("start_index", 0), kwargs.get("restrictions")
+        )
+        if key not in self._searches:
+            self._searches[key] = asyncio.create_task(
+                self.companies_house_client.search(
+                    q=q, items_per_page=items_per_page, **kwargs
+                )
+            )
+        # Callers (and the candidate filtering) must not share result objects
+        return json.loads(json.dumps(await asyncio.shield(self._searches[key])))
+
+    @property
+    def search_count(self) -> int:
+        return len(self._searches)
+
+
+async def disambiguate_companies(
+    requests: list[DisambiguateCompanyRequest],
+    companies_house_client: CompaniesHouseClient,
+    *,
+    concurrency: int = 8,
+    speculative: Optional[bool] = None,
+) -> list[StoredResult | Exception]:
+    """Disambiguate many companies at once.
+
+    Identical requests are disambiguated once, and requests sharing a
+    normalized name share their Companies House searches. At most
+    ``concurrency`` requests are in flight; LLM calls are further limited by
+    the LLM scheduler.
+
+    Args:
+        requests: Disambiguation requests
+        companies_house_client: Companies House client instance
+        concurrency: Maximum requests disambiguated at once
+        speculative: As for ``disambiguate_company``
+
+    Returns:
+        One StoredResult per request, in order, or the exception that
+        request failed with
+    """
+    by_id: dict[str, DisambiguateCompanyRequest] = {}
+    for request in requests:
+        by_id.setdefault(request_to_doc_id(request), request)
+
+    # Start requests for the same employer together, so they share searches
+    # while they're still in flight
+    ordered = sorted(by_id.items(), key=lambda item: normalize_query(item[1].name))
+    searches = SharedSearches(companies_house_client)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(doc_id: str, request: DisambiguateCompanyRequest):
+        async with semaphore:
+            disambiguated, debug = await disambiguate_company(
+                request, searches, speculative=speculative
+            )
+        return StoredResult(
+            id=doc_id, disambiguated_company=disambiguated, input=request, debug=debug
+        )
+
+    results = await asyncio.gather(
+        *(run(doc_id, request) for doc_id, request in ordered),
+        return_exceptions=True,
+    )
+    logging.info(
+        f"Disambiguated {len(requests)} requests ({len(by_id)} distinct) "
+        f"with {searches.search_count} Companies House searches"
+    )
+    results_by_id = {doc_id: result for (doc_id, _), result in zip(ordered, results)}
+    return [results_by_id[request_to_doc_id(request)] for request in requests]
+
+
+async def bulk_upsert_stored_results(
+    client: AsyncOpenSearch,
+    index: str,
+    stored_results: list[StoredResult],
+    refresh: RefreshPolicy = RefreshPolicy.wait_for,
+) -> list[StoredResult | Exception]:
+    """Upsert many stored results with a single bulk request.
+
+    Returns one result per input, in order: the stored result, or an exception
+    where the cluster rejected that document, so that one bad document doesn't
+    lose the rest of the batch.
+    """
+    actions = [
+        {
+            "_op_type": "update",
+            "_index": index,
+            "_id": stored.id,
+            "doc": stored.model_dump(exclude_none=True),
+            "doc_as_upsert": True,
+            "retry_on_conflict": 3,
+        }
+        for stored in stored_results
+    ]
+    results: list[StoredResult | Exception] = list(stored_results)
+    if actions:
+        written = helpers.async_streaming_bulk(
+            client, actions, raise_on_error=False, **refresh_params(refresh)
+        )
+        position = 0
+        async for ok, result in written:
+            if not ok:
+                results[position] = ValueError(f"Failed to write document: {result}")
+            position += 1
+    return results
@@ -0,0 +1,250 @@
+"""Rate limiting for the Companies House API that can be shared between processes.
+
+The API allows 600 requests per 5 minutes per key, and every concurrent
+disambiguator lambda uses the same key. `RateLimitState` only knows about its
+own process; the token bucket backends here keep one bucket in shared storage
+(a locked file, or a document in OpenSearch) so that concurrent clients draw
+from the same quota.
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping, Optional, TypeVar
+
+from opensearchpy.exceptions import ConflictError, NotFoundError
+
+from pipeline.services.opensearch_utils import ensure_index_mapping
+
+T = TypeVar("T")
+
+rate_limit_mapping = {
+    "dynamic": "strict",
+    "properties": {
+        "tokens": {"type": "double"},
+        "updated": {"type": "double"},
+        "blocked_until": {"type": "double"},
+    },
+}
+
+
+def retry_after_seconds(
+    headers: Mapping[str, str], default: float = 10.0, now: Optional[float] = None
+) -> float:
+    """Seconds to wait after a 429, from Retry-After (seconds or HTTP date),
+    else from X-Ratelimit-Reset, else `default`.
+    """
+    now = time.time() if now is None else now
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+    reset = headers.get("X-Ratelimit-Reset")
+    if reset:
+        return max(0.0, int(reset) - now)
+    return default
+
+
+class RateLimitBackend(ABC):
+    """Somewhere to draw Companies House request quota from."""
+
+    @abstractmethod
+    async def acquire(self, count: int = 1) -> None:
+        """Wait until `count` requests may be made, and claim them."""
+
+    @abstractmethod
+    async def observe(self, headers: Mapping[str, str]) -> None:
+        """Reconcile with the X-Ratelimit-* headers of a response."""
+
+    @abstractmethod
+    async def pause(self, seconds: float) -> None:
+        """Stop everyone sharing this backend from making requests for a while."""
+
+
+@dataclass
+class BucketState:
+    tokens: float
+    updated: float
+    blocked_until: float = 0.0
+
+
+class TokenBucketBackend(RateLimitBackend):
+    """Token bucket holding `limit` requests, refilled over `window_seconds`.
+
+    Subclasses provide `_transact`, an atomic read-modify-write of the shared
+    `BucketState`.
+    """
+
+    def __init__(
+        self,
+        limit: int = 600,
+        window_seconds: float = 300,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.limit = limit
+        self.rate = limit / window_seconds
+        self.clock = clock
+
+    @abstractmethod
+    async def _transact(
+        self, update: Callable[[Optional[BucketState]], tuple[BucketState, T]]
+    ) -> T:
+        pass
+
+    def _refilled(self, state: Optional[BucketState], now: float) -> BucketState:
+        if state is None:
+            return BucketState(tokens=self.limit, updated=now)
+        tokens = min(self.limit, state.tokens + (now - state.updated) * self.rate)
+        return BucketState(tokens, now, state.blocked_until)
+
+    async def acquire(self, count: int = 1) -> None:
+        def take(state):
+            now = self.clock()
+            state = self._refilled(state, now)
+            if state.blocked_until > now:
+                return state, state.blocked_until - now
+            if state.tokens >= count:
+                state.tokens -= count
+                return state, 0.0
+            return state, (count - state.tokens) / self.rate
+
+        while (wait := await self._transact(take)) > 0:
+            await asyncio.sleep(wait)
+
+    async def observe(self, headers: Mapping[str, str]) -> None:
+        if "X-Ratelimit-Remain" not in headers:
+            return
+        remaining = int(headers["X-Ratelimit-Remain"])
+        reset = int(headers.get("X-Ratelimit-Reset", 0))
+
+        def reconcile(state):
+            state = self._refilled(state, self.clock())
+            # The API's count is authoritative if it has less left than we think
+            state.tokens = min(state.tokens, remaining)
+            if remaining == 0 and reset:
+                state.blocked_until = max(state.blocked_until, reset)
+            return state, None
+
+        await self._transact(reconcile)
+
+    async def pause(self, seconds: float) -> None:
+        def block(state):
+            now = self.clock()
+            state = self._refilled(state, now)
+            state.tokens = 0
+            state.blocked_until = max(state.blocked_until, now + seconds)
+            return state, None
+
+        await self._transact(block)
+
+
+class InMemoryTokenBucket(TokenBucketBackend):
+    """Single-process bucket, mostly useful for tests."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.state: Optional[BucketState] = None
+
+    async def _transact(self, update):
+        self.state, result = update(self.state)
+        return result
+
+
+class FileLockTokenBucket(TokenBucketBackend):
+    """Bucket in a JSON file, shared by processes on the same machine."""
+
+    def __init__(self, path: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.path = path
+
+    def _locked_update(self, update):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.path) as f:
+                        state = BucketState(**json.load(f))
+                except (FileNotFoundError, json.JSONDecodeError):
+                    state = None
+                state, result = update(state)
+                with open(self.path, "w") as f:
+                    json.dump(asdict(state), f)
+                return result
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    async def _transact(self, update):
+        return await asyncio.to_thread(self._locked_update, update)
+
+
+class OpensearchTokenBucket(TokenBucketBackend):
+    """Bucket in an OpenSearch document, updated with optimistic concurrency
+    control so concurrent lambdas can share it.
+
+    A conflicting update is retried after a jittered exponential backoff, so
+    that lambdas contending for the bucket spread out rather than retrying in
+    lockstep; after `max_attempts` the ConflictError is raised.
+    """
+
+    def __init__(
+        self,
+        client,
+        index: str,
+        bucket_id: str,
+        *args,
+        max_attempts: int = 8,
+        initial_backoff: float = 0.05,
+        max_backoff: float = 2.0,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.client = client
+        self.index = index
+        self.bucket_id = bucket_id
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+    async def _transact(self, update):
+        await ensure_index_mapping(self.client, self.index, rate_limit_mapping)
+        for attempt in range(self.max_attempts):
+            if attempt:
+                backoff = min(
+                    self.max_backoff, self.initial_backoff * 2 ** (attempt - 1)
+                )
+                await asyncio.sleep(random.uniform(0, backoff))
+            try:
+                res = await self.client.get(index=self.index, id=self.bucket_id)
+                state = BucketState(**res["_source"])
+                params: Dict[str, Any] = {
+                    "if_seq_no": res["_seq_no"],
+                    "if_primary_term": res["_primary_term"],
+                }
+            except NotFoundError:
+                state = None
+                params = {"op_type": "create"}
+            state, result = update(state)
+            try:
+                await self.client.index(
+                    index=self.index,
+                    id=self.bucket_id,
+                    body=asdict(state),
+                    params=params,
+                )
+            except ConflictError:
+                if attempt == self.max_attempts - 1:
+                    raise
+                continue  # Someone else updated the bucket first
+            return result
@@ -0,0 +1,185 @@
+"""TTL caches for Companies House responses.
+
+Each cache keeps recent entries in memory, optionally backed by a shared tier
+(a local directory or an OpenSearch index) so that entries survive across
+lambda containers and bulk reruns.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from opensearchpy.exceptions import NotFoundError
+
+from pipeline.services.opensearch_utils import ensure_index_mapping
+
+response_cache_mapping = {
+    "dynamic": "strict",
+    "properties": {
+        "stored_at": {"type": "double"},
+        "value": {"type": "object", "enabled": False},
+    },
+}
+
+
+def normalize_query(q: str) -> str:
+    return re.sub(r"\s+", " ", q).strip().casefold()
+
+
+def search_cache_key(
+    q: str, items_per_page: int, start_index: int, restrictions: Optional[str]
+) -> str:
+    return f"{normalize_query(q)}|{items_per_page}|{start_index}|{restrictions or ''}"
+
+
+class CacheTier(ABC):
+    """Shared backing store for cached responses, as (stored_at, value) pairs."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[tuple[float, Any]]:
+        pass
+
+    @abstractmethod
+    async def put(self, key: str, stored_at: float, value: Any) -> None:
+        pass
+
+
+def _hashed(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class DiskCacheTier(CacheTier):
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{_hashed(key)}.json")
+
+    def _read(self, path):
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        return entry["stored_at"], entry["value"]
+
+    def _write(self, path, entry):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    async def get(self, key):
+        return await asyncio.to_thread(self._read, self.path(key))
+
+    async def put(self, key, stored_at, value):
+        entry = {"stored_at": stored_at, "value": value}
+        await asyncio.to_thread(self._write, self.path(key), entry)
+
+
+class OpensearchCacheTier(CacheTier):
+    def __init__(self, client, index: str):
+        self.client = client
+        self.index = index
+
+    async def get(self, key):
+        await ensure_index_mapping(self.client, self.index, response_cache_mapping)
+        try:
+            res = await self.client.get(index=self.index, id=_hashed(key))
+        except NotFoundError:
+            return None
+        return res["_source"]["stored_at"], res["_source"]["value"]
+
+    async def put(self, key, stored_at, value):
+        await self.client.index(
+            index=self.index,
+            id=_hashed(key),
+            body={"stored_at": stored_at, "value": value},
+        )
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    backing_hits: int = 0
+    misses: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.backing_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.hits + self.backing_hits) / self.lookups if self.lookups else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.hit_rate:.0%} hit rate ({self.hits} memory, "
+            f"{self.backing_hits} backing, {self.misses} misses)"
+        )
+
+
+class ResponseCache:
+    """In-memory LRU with a TTL, optionally in front of a shared `CacheTier`.
+
+    Values are deep-copied in and out, so callers may mutate what they get.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: float,
+        *,
+        backing: Optional[CacheTier] = None,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.backing = backing
+        self.max_entries = max_entries
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def _fresh(self, stored_at: float) -> bool:
+        return self.clock() - stored_at < self.ttl_seconds
+
+    def _remember(self, key: str, stored_at: float, value: Any):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None and self._fresh(entry[0]):
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return copy.deepcopy(entry[1])
+        self._entries.pop(key, None)
+
+        if self.backing is not None:
+            entry = await self.backing.get(f"{self.namespace}:{key}")
+            if entry is not None and self._fresh(entry[0]):
+                self._remember(key, *entry)
+                self.stats.backing_hits += 1
+                return copy.deepcopy(entry[1])
+
+        self.stats.misses += 1
+        return None
+
+    async def put(self, key: str, value: Any) -> None:
+        stored_at = self.clock()
+        self._remember(key, stored_at, copy.deepcopy(value))
+        if self.backing is not None:
+            await self.backing.put(f"{self.namespace}:{key}", stored_at, value)
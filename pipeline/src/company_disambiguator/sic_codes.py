@@ -1,19 +1,22 @@
-import json
+import functools
 import logging
 from typing import List
 from company_disambiguator.model import IndustrialClassification
+from pipeline.services.resources import load_json_resource
 
-# Load SIC codes mapping at module level
 SIC_CODES_PATH = "./company_disambiguator/data/sic_codes.json"
-SIC_CODES_MAPPING: dict[str, dict[str, str]] = {}
 
-try:
-    with open(SIC_CODES_PATH, "r") as f:
-        SIC_CODES_MAPPING = json.load(f)
-except FileNotFoundError:
-    logging.warning(f"SIC codes file not found at {SIC_CODES_PATH}")
-except Exception as e:
-    logging.error(f"Failed to load SIC codes: {e}")
+
+@functools.cache
+def sic_codes_mapping() -> dict[str, dict[str, str]]:
+    """SIC code -> {description, section}, loaded on first use."""
+    try:
+        return load_json_resource(SIC_CODES_PATH)
+    except FileNotFoundError:
+        logging.warning(f"SIC codes file not found at {SIC_CODES_PATH}")
+    except Exception as e:
+        logging.error(f"Failed to load SIC codes: {e}")
+    return {}
 
 
 def transform_sic_codes(sic_codes: List[str]) -> List[IndustrialClassification]:
@@ -26,13 +29,14 @@ def transform_sic_codes(sic_codes: List[str]) -> List[IndustrialClassification]:
         List of industrial classification objects with sic_code, description, section
     """
     industrial_classifications = []
+    mapping = sic_codes_mapping()
 
     for sic_code in sic_codes:
-        if sic_code in SIC_CODES_MAPPING:
+        if sic_code in mapping:
             classification = IndustrialClassification(
                 sic_code=sic_code,
-                description=SIC_CODES_MAPPING[sic_code].get("description", ""),
-                section=SIC_CODES_MAPPING[sic_code].get("section", ""),
+                description=mapping[sic_code].get("description", ""),
+                section=mapping[sic_code].get("section", ""),
             )
             industrial_classifications.append(classification)
         else:
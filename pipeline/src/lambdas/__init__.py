@@ -1,21 +1,34 @@
 import asyncio
 import concurrent.futures
+import functools
 import os
 
+from opensearchpy import helpers
 from pydantic import BaseModel, ConfigDict, Field
 
 from pipeline.services.opensearch_utils import (
+    RefreshPolicy,
     create_client,
     get_auth,
     ensure_index_mapping,
+    refresh_params,
+    refresh_policy_from_env,
 )
 
 
-client = create_client(
-    cluster_host=os.getenv("OPENSEARCH_ENDPOINT"),
-    auth=get_auth(credentials_secret=os.getenv("OPENSEARCH_CREDENTIALS_SECRET")),
-    async_client=True,
-)
+@functools.cache
+def get_client():
+    """Shared OpenSearch client, created (and its secret fetched) on first use."""
+    return create_client(
+        cluster_host=os.getenv("OPENSEARCH_ENDPOINT"),
+        auth=get_auth(credentials_secret=os.getenv("OPENSEARCH_CREDENTIALS_SECRET")),
+        async_client=True,
+    )
+
+
+def error_result(e: Exception) -> dict:
+    """A batch result for a ref that failed, in place of its normal result."""
+    return {"error": type(e).__name__, "cause": str(e)}
 
 
 def run_in_loop(loop, coro):
@@ -72,6 +85,10 @@ class RefEvent(BaseModel):
     ref: DocumentRef
 
 
+class RefBatchEvent(BaseModel):
+    refs: list[DocumentRef]
+
+
 def destination_index(*, source_index, dest_namespace):
     index_suffix = get_index_suffix(source_index)
     dest_index = f"{dest_namespace}-{index_suffix}" if index_suffix else dest_namespace
@@ -86,10 +103,16 @@ async def map_doc(
     dest_namespace: str,
     dest_mapping,
     dest_id: str | None = None,
-    refresh_on_complete: bool = True,
+    refresh: RefreshPolicy | None = None,
     result_transform=None,
 ):
-    """Transform one source document and upsert it into the destination index."""
+    """Transform one source document and upsert it into the destination index.
+
+    ``refresh`` defaults to ``OPENSEARCH_REFRESH_POLICY`` (or wait_for). The
+    passthrough read is a realtime GET so never needs a refresh.
+    """
+    refresh = refresh or refresh_policy_from_env()
+    client = get_client()
     dest_index = destination_index(
         source_index=ref.index, dest_namespace=dest_namespace
     )
@@ -102,10 +125,8 @@ async def map_doc(
             index=dest_index,
             id=doc_id,
             body={"doc": {}},
-            params={"retry_on_conflict": 3},
+            params={"retry_on_conflict": 3, **refresh_params(refresh)},
         )
-        if refresh_on_complete:
-            await client.indices.refresh(index=dest_index)
         augmented = await client.get(index=dest_index, id=doc_id)
         if not augmented.get("found"):
             raise ValueError(f"Document missing after passthrough update: {doc_id}")
@@ -121,10 +142,8 @@ async def map_doc(
             index=dest_index,
             id=doc_id,
             body={"doc": transformed, "doc_as_upsert": True},
-            params={"retry_on_conflict": 3},
+            params={"retry_on_conflict": 3, **refresh_params(refresh)},
         )
-        if refresh_on_complete:
-            await client.indices.refresh(index=dest_index)
         extra = result_transform(transformed) if result_transform else {}
 
     return {
@@ -133,3 +152,114 @@ async def map_doc(
         ).model_dump(by_alias=True),
         **extra,
     }
+
+
+async def map_docs(
+    docs_and_refs: list[tuple[object, DocumentRef]],
+    *,
+    transform,
+    dest_namespace: str,
+    dest_mapping,
+    refresh: RefreshPolicy | None = None,
+    result_transform=None,
+    concurrency: int = 8,
+):
+    """Batched ``map_doc``: transform every document (at most ``concurrency`` at a
+    time) and upsert them all with a single bulk request. Passthrough refs are
+    read back from the destination with a single mget instead.
+
+    Returns one result per input, in order; None where the transform produced
+    nothing, and the exception where that document's transform, read or write
+    failed, so that one failure doesn't lose the rest of the batch.
+    """
+    refresh = refresh or refresh_policy_from_env()
+    client = get_client()
+    dest_indices = [
+        destination_index(source_index=ref.index, dest_namespace=dest_namespace)
+        for _, ref in docs_and_refs
+    ]
+    for dest_index in dict.fromkeys(dest_indices):
+        await ensure_index_mapping(client, dest_index, dest_mapping)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_transform(doc, ref):
+        if ref.passthrough:
+            return None
+        async with semaphore:
+            if asyncio.iscoroutinefunction(transform):
+                return await transform(doc)
+            return transform(doc)
+
+    transformed_docs = await asyncio.gather(
+        *(run_transform(doc, ref) for doc, ref in docs_and_refs),
+        return_exceptions=True,
+    )
+
+    passthrough = [
+        (i, ref.id, dest_index)
+        for i, ((_, ref), dest_index) in enumerate(zip(docs_and_refs, dest_indices))
+        if ref.passthrough
+    ]
+    if passthrough:
+        found = await client.mget(
+            body={
+                "docs": [{"_index": index, "_id": id} for _, id, index in passthrough]
+            }
+        )
+        for (i, id, _), doc in zip(passthrough, found["docs"]):
+            if doc.get("found"):
+                transformed_docs[i] = doc["_source"]
+            else:
+                transformed_docs[i] = ValueError(
+                    f"Document missing for passthrough ref: {id}"
+                )
+
+    actions = []
+    action_positions = []
+    results = []
+    for (_, ref), dest_index, transformed in zip(
+        docs_and_refs, dest_indices, transformed_docs
+    ):
+        if isinstance(transformed, Exception):
+            results.append(transformed)
+            continue
+        if not transformed:
+            results.append(None)
+            continue
+        if not ref.passthrough:
+            action_positions.append(len(results))
+            actions.append(
+                {
+                    "_op_type": "update",
+                    "_index": dest_index,
+                    "_id": ref.id,
+                    "doc": transformed,
+                    "doc_as_upsert": True,
+                    "retry_on_conflict": 3,
+                }
+            )
+        extra = result_transform(transformed) if result_transform else {}
+        results.append(
+            {
+                "ref": DocumentRef(
+                    _id=ref.id, _index=dest_index, passthrough=ref.passthrough
+                ).model_dump(by_alias=True),
+                **extra,
+            }
+        )
+
+    if actions:
+        written = helpers.async_streaming_bulk(
+            client,
+            actions,
+            raise_on_error=False,
+            **refresh_params(refresh),
+        )
+        positions = iter(action_positions)
+        async for ok, result in written:
+            position = next(positions)
+            if not ok:
+                results[position] = ValueError(f"Failed to write document: {result}")
+
+    return results
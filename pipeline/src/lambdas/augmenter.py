@@ -1,5 +1,12 @@
+import functools
+import logging
 import os
 from pipeline.transforms import get_parties
+from pipeline.services.extraction_cache import (
+    LocalExtractionCache,
+    OpensearchExtractionCache,
+)
+from pipeline.transforms.prompt_preprocessing import prompt_savings
 from pipeline.types.decisions import (
     DecisionRaw,
     DecisionAugmented,
@@ -9,10 +16,13 @@ from pipeline.types.decisions import (
 
 from . import (
     RefEvent,
-    client,
+    RefBatchEvent,
+    get_client,
     DocumentRef,
+    error_result,
     lambda_friendly_run_async,
     map_doc,
+    map_docs,
 )
 
 if os.getenv("MOCK_LLM"):
@@ -21,11 +31,23 @@ else:
     from pipeline.transforms.augmentation import get_extracted_data
 
 
+@functools.cache
+def get_extraction_cache():
+    """LLM extraction cache from EXTRACTION_CACHE_INDEX or EXTRACTION_CACHE_DIR, if set."""
+    if index := os.getenv("EXTRACTION_CACHE_INDEX"):
+        return OpensearchExtractionCache(get_client(), index)
+    if directory := os.getenv("EXTRACTION_CACHE_DIR"):
+        return LocalExtractionCache(directory)
+    return None
+
+
 async def augment_doc(doc: DecisionRaw):
     if doc.document_type == DocumentType.derecognition_decision.value:
         return doc.model_dump(by_alias=True)
 
-    extracted_data = await get_extracted_data(doc.document_type, doc.document_content)
+    extracted_data = await get_extracted_data(
+        doc.document_type, doc.document_content, cache=get_extraction_cache()
+    )
     model = DecisionAugmented.from_raw(doc, extracted_data)
     return model.model_dump(by_alias=True)
 
@@ -48,7 +70,7 @@ def transform_for_next_step(transformed_doc):
 
 
 async def process_ref(ref: DocumentRef):
-    src = await client.get(index=ref.index, id=ref.id)
+    src = await get_client().get(index=ref.index, id=ref.id)
     decision = DecisionRaw.model_validate(src["_source"])
     return await map_doc(
         decision,
@@ -60,6 +82,59 @@ async def process_ref(ref: DocumentRef):
     )
 
 
+async def process_batch(event: RefBatchEvent):
+    """Augment many decisions at once: one mget for the sources, concurrent
+    extraction and one bulk write. Returns one result per ref, in order, with an
+    ``error_result`` for any ref that couldn't be read, augmented or written.
+    """
+    source_refs = [ref for ref in event.refs if not ref.passthrough]
+    sources = {}
+    if source_refs:
+        res = await get_client().mget(
+            body={"docs": [{"_index": ref.index, "_id": ref.id} for ref in source_refs]}
+        )
+        # mget answers in request order, with the concrete index rather than
+        # the alias a ref may name
+        for ref, doc in zip(source_refs, res["docs"]):
+            if doc.get("found"):
+                sources[(ref.index, ref.id)] = doc["_source"]
+
+    def found(ref):
+        return ref.passthrough or (ref.index, ref.id) in sources
+
+    async def augment_source(source):
+        # Validated here so an invalid source only fails its own ref
+        return await augment_doc(DecisionRaw.model_validate(source))
+
+    written = await map_docs(
+        [(sources.get((ref.index, ref.id)), ref) for ref in event.refs if found(ref)],
+        transform=augment_source,
+        dest_namespace="outcomes-augmented",
+        dest_mapping={"dynamic": "strict", "properties": decision_augmented_mapping},
+        result_transform=transform_for_next_step,
+        concurrency=int(os.getenv("AUGMENTER_CONCURRENCY", 8)),
+    )
+    logging.info(prompt_savings.report())
+
+    written = iter(written)
+    results = []
+    for ref in event.refs:
+        result = (
+            next(written)
+            if found(ref)
+            else ValueError(f"Decision not found: {ref.index}/{ref.id}")
+        )
+        results.append(
+            error_result(result) if isinstance(result, Exception) else result
+        )
+    return results
+
+
 def handler(event, context):
     augmenter_event = RefEvent.model_validate(event)
     return lambda_friendly_run_async(process_ref(augmenter_event.ref))
+
+
+def batch_handler(event, context):
+    augmenter_event = RefBatchEvent.model_validate(event)
+    return lambda_friendly_run_async(process_batch(augmenter_event))
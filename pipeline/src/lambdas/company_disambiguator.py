@@ -1,11 +1,22 @@
+import functools
 import os
 from opensearchpy.exceptions import NotFoundError
 
 from pipeline.services.opensearch_utils import (
     ensure_index_mapping,
     get_mapping_from_path,
+    refresh_policy_from_env,
 )
 from company_disambiguator.companies_house import CompaniesHouseClient
+from company_disambiguator.response_cache import (
+    DiskCacheTier,
+    OpensearchCacheTier,
+    ResponseCache,
+)
+from company_disambiguator.rate_limit import (
+    FileLockTokenBucket,
+    OpensearchTokenBucket,
+)
 from company_disambiguator.model import (
     DisambiguateCompanyLambdaEvent,
     StoredResult,
@@ -15,12 +26,46 @@ from company_disambiguator.pipeline import (
     disambiguate_company,
     upsert_stored_result,
 )
-from . import lambda_friendly_run_async, client, DocumentRef
+from . import lambda_friendly_run_async, get_client, DocumentRef
 
 
 OPENSEARCH_INDEX = "disambiguated-companies"
 
-companies_house_client = CompaniesHouseClient(base_url=os.getenv("CH_API_BASE"))
+
+def companies_house_cache_tier():
+    if index := os.getenv("CH_CACHE_INDEX"):
+        return OpensearchCacheTier(get_client(), index)
+    if directory := os.getenv("CH_CACHE_DIR"):
+        return DiskCacheTier(directory)
+    return None
+
+
+def companies_house_rate_limit():
+    # Every concurrent disambiguator shares one API key, so share one bucket
+    if index := os.getenv("CH_RATE_LIMIT_INDEX"):
+        return OpensearchTokenBucket(get_client(), index, "companies-house")
+    if path := os.getenv("CH_RATE_LIMIT_FILE"):
+        return FileLockTokenBucket(path)
+    return None
+
+
+@functools.cache
+def get_companies_house_client() -> CompaniesHouseClient:
+    backing = companies_house_cache_tier()
+    return CompaniesHouseClient(
+        base_url=os.getenv("CH_API_BASE"),
+        search_cache=ResponseCache(
+            "search",
+            float(os.getenv("CH_SEARCH_CACHE_TTL_SECONDS", 24 * 60 * 60)),
+            backing=backing,
+        ),
+        profile_cache=ResponseCache(
+            "profile",
+            float(os.getenv("CH_PROFILE_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60)),
+            backing=backing,
+        ),
+        rate_limit=companies_house_rate_limit(),
+    )
 
 
 def stored_result_to_ref(stored: StoredResult) -> DocumentRef:
@@ -31,6 +76,7 @@ def stored_result_to_ref(stored: StoredResult) -> DocumentRef:
 
 
 async def process_request(event: DisambiguateCompanyLambdaEvent):
+    client = get_client()
     index_mapping = get_mapping_from_path(
         "./index_mappings/disambiguated_companies.json"
     )
@@ -47,7 +93,9 @@ async def process_request(event: DisambiguateCompanyLambdaEvent):
         except NotFoundError:
             pass
 
+    companies_house_client = get_companies_house_client()
     disambiguated, debug = await disambiguate_company(request, companies_house_client)
+    print(f"Companies House cache: {companies_house_client.cache_stats()}")
     stored = await upsert_stored_result(
         client,
         OPENSEARCH_INDEX,
@@ -57,6 +105,7 @@ async def process_request(event: DisambiguateCompanyLambdaEvent):
             input=request,
             debug=debug,
         ),
+        refresh=refresh_policy_from_env(),
     )
     return stored_result_to_ref(stored)
 
@@ -1,9 +1,21 @@
-from pipeline.decisions_to_outcomes import merge_decisions_to_outcome
+from pipeline.decisions_to_outcomes import (
+    merge_decisions_to_outcome,
+    merge_decisions_to_outcomes,
+)
 from pipeline.services.opensearch_utils import get_mapping_from_path
 from pipeline.transforms import transform_for_index
 from pipeline.transforms.events import InvalidEventError
 
-from . import RefEvent, client, DocumentRef, lambda_friendly_run_async, map_doc
+from . import (
+    RefEvent,
+    RefBatchEvent,
+    get_client,
+    DocumentRef,
+    error_result,
+    lambda_friendly_run_async,
+    map_doc,
+    map_docs,
+)
 
 
 def transform_if_possible(outcome):
@@ -23,7 +35,7 @@ async def process_event(event: RefEvent):
     decision_ref = event.ref
     outcome_reference = reference_from_id(decision_ref.id)
     outcome = await merge_decisions_to_outcome(
-        client,
+        get_client(),
         index=decision_ref.index,
         non_pipeline_indices={"application-withdrawals"},
         reference=outcome_reference,
@@ -48,6 +60,63 @@ async def process_event(event: RefEvent):
     )
 
 
+async def process_batch(event: RefBatchEvent):
+    """Index the outcomes for many decision refs, one result per distinct reference.
+
+    A reference whose outcome can't be merged, transformed or written gets an
+    ``error_result`` and the rest are indexed regardless.
+    """
+    refs_by_reference: dict[str, DocumentRef] = {}
+    for decision_ref in event.refs:
+        refs_by_reference.setdefault(reference_from_id(decision_ref.id), decision_ref)
+
+    references_by_index: dict[str, list[str]] = {}
+    for outcome_reference, decision_ref in refs_by_reference.items():
+        references_by_index.setdefault(decision_ref.index, []).append(outcome_reference)
+
+    results = {}
+    dest_mapping = get_mapping_from_path("./index_mappings/outcomes_indexed.json")
+    for index, references in references_by_index.items():
+        outcomes = await merge_decisions_to_outcomes(
+            get_client(),
+            index=index,
+            non_pipeline_indices={"application-withdrawals"},
+            references=references,
+        )
+        merged = []
+        for outcome_reference, outcome in outcomes.items():
+            if outcome is None:
+                print(f"No merged outcome for reference {outcome_reference!r}")
+                continue
+            if isinstance(outcome, Exception):
+                results[outcome_reference] = error_result(outcome)
+                continue
+            merged.append(
+                (
+                    outcome_reference,
+                    outcome,
+                    DocumentRef(_id=outcome.id, _index=index, passthrough=False),
+                )
+            )
+        written = await map_docs(
+            [(outcome, write_ref) for _, outcome, write_ref in merged],
+            transform=transform_if_possible,
+            dest_namespace="outcomes-indexed",
+            dest_mapping=dest_mapping,
+        )
+        for (outcome_reference, _, _), result in zip(merged, written):
+            results[outcome_reference] = (
+                error_result(result) if isinstance(result, Exception) else result
+            )
+
+    return [results.get(reference) for reference in refs_by_reference]
+
+
 def handler(event, context):
     indexer_event = RefEvent.model_validate(event)
     return lambda_friendly_run_async(process_event(indexer_event))
+
+
+def batch_handler(event, context):
+    indexer_event = RefBatchEvent.model_validate(event)
+    return lambda_friendly_run_async(process_batch(indexer_event))
@@ -0,0 +1,260 @@
+"""Runs the whole pipeline in one process, without Step Functions.
+
+Mirrors ``terraform/state-machine/pipeline.asl.json``: scraped (or redriven)
+refs are augmented, acceptance decisions have their company disambiguated,
+and every decision's outcome is indexed. Rather than invoking a lambda per
+ref, each step's handler logic runs as an asyncio stage with its own
+concurrency, connected to the next by a bounded queue so that a slow stage
+holds back the ones before it instead of buffering everything in memory.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import AsyncIterable, Awaitable, Callable, Optional
+
+from company_disambiguator.model import DisambiguateCompanyLambdaEvent
+from pipeline.services.opensearch_utils import pit_search_after
+
+from . import DocumentRef, RefEvent, augmenter, company_disambiguator, get_client
+from . import indexer, scraper
+
+# Tells a stage's workers that nothing more is coming
+_done = object()
+
+
+@dataclass
+class StageStats:
+    name: str
+    concurrency: int
+    processed: int = 0
+    failed: int = 0
+    # Time workers spent processing, excluding waiting on either queue
+    busy_seconds: float = 0.0
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    @property
+    def throughput(self) -> float:
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def utilization(self) -> float:
+        capacity = self.elapsed * self.concurrency
+        return self.busy_seconds / capacity if capacity else 0.0
+
+
+def report(stats: list[StageStats]) -> str:
+    lines = [
+        f"{'stage':<14} {'workers':>7} {'done':>6} {'failed':>6} "
+        f"{'secs':>8} {'items/s':>8} {'busy%':>6}"
+    ]
+    for stage in stats:
+        lines.append(
+            f"{stage.name:<14} {stage.concurrency:>7} {stage.processed:>6} "
+            f"{stage.failed:>6} {stage.elapsed:>8.1f} {stage.throughput:>8.2f} "
+            f"{100 * stage.utilization:>5.0f}%"
+        )
+    return "\n".join(lines)
+
+
+@dataclass
+class PipelineSteps:
+    """The handler logic each stage runs, replaceable for testing."""
+
+    augment: Callable[[DocumentRef], Awaitable[Optional[dict]]] = augmenter.process_ref
+    disambiguate: Callable[[DisambiguateCompanyLambdaEvent], Awaitable[dict]] = (
+        company_disambiguator.process_request
+    )
+    index: Callable[[RefEvent], Awaitable[Optional[dict]]] = indexer.process_event
+
+
+def needs_disambiguation(augmented: dict) -> bool:
+    # The augmenter only adds the company fields for acceptance decisions with
+    # extracted data, which is what the state machine's choice relies on
+    return "name" in augmented
+
+
+class LocalPipeline:
+    """Scrape → augment → (disambiguate →) index, as concurrent asyncio stages.
+
+    Args:
+        steps: Handler logic for each stage
+        augment_concurrency: Decisions augmented at once
+        disambiguate_concurrency: Companies disambiguated at once
+        index_concurrency: Outcomes indexed at once
+        queue_size: Items buffered between each pair of stages
+    """
+
+    def __init__(
+        self,
+        *,
+        steps: Optional[PipelineSteps] = None,
+        augment_concurrency: int = 8,
+        disambiguate_concurrency: int = 4,
+        index_concurrency: int = 8,
+        queue_size: int = 100,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.steps = steps or PipelineSteps()
+        self.clock = clock
+        self.source = StageStats("source", 1)
+        self.augment = StageStats("augment", augment_concurrency)
+        self.disambiguate = StageStats("disambiguate", disambiguate_concurrency)
+        self.index = StageStats("index", index_concurrency)
+        self.augment_queue = asyncio.Queue(maxsize=queue_size)
+        self.disambiguate_queue = asyncio.Queue(maxsize=queue_size)
+        self.index_queue = asyncio.Queue(maxsize=queue_size)
+
+    @property
+    def stats(self) -> list[StageStats]:
+        return [self.source, self.augment, self.disambiguate, self.index]
+
+    async def _augment(self, ref: dict):
+        augmented = await self.steps.augment(DocumentRef.model_validate(ref))
+        if not augmented:
+            return []
+        if needs_disambiguation(augmented):
+            return [(self.disambiguate_queue, augmented)]
+        return [(self.index_queue, augmented)]
+
+    async def _disambiguate(self, augmented: dict):
+        await self.steps.disambiguate(
+            DisambiguateCompanyLambdaEvent(
+                name=augmented["name"],
+                unions=augmented["unions"],
+                application_date=augmented["application_date"],
+                bargaining_unit=augmented["bargaining_unit"],
+                locations=augmented["locations"],
+                force=False,
+            )
+        )
+        return [(self.index_queue, {"ref": augmented["ref"]})]
+
+    async def _index(self, payload: dict):
+        await self.steps.index(RefEvent.model_validate(payload))
+        return []
+
+    async def _feed(self, refs: AsyncIterable[dict]):
+        self.source.started = self.clock()
+        try:
+            async for ref in refs:
+                self.source.processed += 1
+                await self.augment_queue.put(ref)
+        finally:
+            self.source.finished = self.clock()
+
+    async def _worker(self, stats: StageStats, inbox: asyncio.Queue, process):
+        while (item := await inbox.get()) is not _done:
+            start = self.clock()
+            if stats.started is None:
+                stats.started = start
+            outputs = []
+            try:
+                outputs = await process(item)
+            except Exception as e:
+                stats.failed += 1
+                logging.exception(f"{stats.name} failed for {item}: {e!r}")
+            else:
+                stats.processed += 1
+            finally:
+                stats.finished = self.clock()
+                stats.busy_seconds += stats.finished - start
+            for queue, output in outputs:
+                await queue.put(output)
+
+    def _workers(self, stats: StageStats, inbox: asyncio.Queue, process):
+        return [
+            asyncio.create_task(self._worker(stats, inbox, process))
+            for _ in range(stats.concurrency)
+        ]
+
+    @staticmethod
+    async def _close(queue: asyncio.Queue, workers: list[asyncio.Task]):
+        for _ in workers:
+            await queue.put(_done)
+        await asyncio.gather(*workers)
+
+    async def run(self, refs: AsyncIterable[dict]) -> list[StageStats]:
+        """Run every ref from ``refs`` through the pipeline, returning stage stats.
+
+        Failures are logged and counted against their stage rather than
+        stopping the run; an error from the source is raised once everything
+        it produced has been processed.
+        """
+        augmenters = self._workers(self.augment, self.augment_queue, self._augment)
+        disambiguators = self._workers(
+            self.disambiguate, self.disambiguate_queue, self._disambiguate
+        )
+        indexers = self._workers(self.index, self.index_queue, self._index)
+        try:
+            await self._feed(refs)
+        finally:
+            # Each stage is finished once everything upstream of it is
+            await self._close(self.augment_queue, augmenters)
+            await self._close(self.disambiguate_queue, disambiguators)
+            await self._close(self.index_queue, indexers)
+        return self.stats
+
+
+async def scraped_refs(
+    scraper_event: scraper.ScraperEvent, queue_size: int = 100
+) -> AsyncIterable[dict]:
+    """Refs from a crawl, yielded as each decision is stored.
+
+    The crawl runs in the crawler's reactor thread, which blocks when
+    ``queue_size`` refs are waiting so that the crawl can't outrun the pipeline.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=queue_size)
+    closed = False
+
+    def on_ref(ref):
+        if not closed:
+            asyncio.run_coroutine_threadsafe(queue.put(ref), loop).result()
+
+    async def crawl():
+        try:
+            await asyncio.to_thread(scraper.scrape, scraper_event, on_ref=on_ref)
+        finally:
+            await queue.put(_done)
+
+    crawl_task = asyncio.create_task(crawl())
+    try:
+        while (ref := await queue.get()) is not _done:
+            yield ref
+        await crawl_task  # Raises if the crawl failed
+    finally:
+        closed = True
+        # Unblock the crawler if it's waiting to put a ref
+        while not queue.empty():
+            queue.get_nowait()
+
+
+async def redrive_refs(
+    redrive: scraper.Redrive, index: str, page_size: int = 1000
+) -> AsyncIterable[dict]:
+    """Refs for a redrive, streamed from the raw index rather than collected first."""
+    if redrive.ids and not redrive.complete:
+        for id in redrive.ids:
+            yield {"_id": id, "_index": index, "passthrough": not redrive.augment}
+        return
+    async for hit in pit_search_after(
+        get_client(),
+        index,
+        sort=[{"id": "asc"}],
+        page_size=page_size,
+        _source=False,
+    ):
+        yield {
+            "_id": hit["_id"],
+            "_index": hit["_index"],
+            "passthrough": not redrive.augment,
+        }
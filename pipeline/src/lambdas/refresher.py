@@ -0,0 +1,30 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from . import destination_index, get_client, lambda_friendly_run_async
+
+
+class RefresherEvent(BaseModel):
+    indexSuffix: Optional[str] = None
+    namespaces: list[str] = ["outcomes-augmented", "outcomes-indexed"]
+
+
+async def refresh_indices(event: RefresherEvent):
+    """Single coalesced refresh at the end of a map run (RefreshPolicy.deferred)."""
+    source_index = (
+        f"outcomes-raw-{event.indexSuffix}" if event.indexSuffix else "outcomes-raw"
+    )
+    indices = [
+        destination_index(source_index=source_index, dest_namespace=namespace)
+        for namespace in event.namespaces
+    ]
+    await get_client().indices.refresh(
+        index=",".join(indices), params={"ignore_unavailable": "true"}
+    )
+    return {"refreshed": indices}
+
+
+def handler(event, context):
+    refresher_event = RefresherEvent.model_validate(event or {})
+    return lambda_friendly_run_async(refresh_indices(refresher_event))
@@ -1,39 +1,48 @@
+import functools
 import logging
 import os
-from datetime import timedelta
+import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-import crochet
 from pydantic import BaseModel
 from opensearchpy import helpers
-from scrapy.crawler import CrawlerRunner, Crawler
-from scrapy.utils.reactor import install_reactor
-from scrapy.utils.log import configure_logging
-from scrapy import signals
 
-from pipeline.spider import QuietDroppedLogFormatter
-from pipeline.spider.updated_outcomes import UpdatedOutcomesSpider
-from pipeline.spider.cac_outcome_spider import CacOutcomeOpensearchPipeline
-from pipeline.types.decisions import decision_raw_mapping
+from pipeline.services.manifests import manifest_store_from_uri, write_jsonl_manifest
+from pipeline.services.opensearch_utils import pit_search_after
 
-from . import client, lambda_friendly_run_async
+from . import get_client, lambda_friendly_run_async
 
-# Install the asyncio reactor for Lambda compatibility
-install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
-crochet.setup()
 
-logging.getLogger().handlers.clear()
-log_settings = {
-    "LOG_LEVEL": "INFO",
-    "LOG_FORMATTER": QuietDroppedLogFormatter,
-}
-configure_logging(log_settings)
+@functools.cache
+def crawler_runtime():
+    """Import scrapy/twisted and install the reactor only when a crawl is needed,
+    so redrive-only invocations skip them entirely."""
+    import crochet
+    from scrapy.utils.reactor import install_reactor
+    from scrapy.utils.log import configure_logging
+
+    from pipeline.spider import QuietDroppedLogFormatter
+
+    # Install the asyncio reactor for Lambda compatibility
+    install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
+    crochet.setup()
+
+    logging.getLogger().handlers.clear()
+    log_settings = {
+        "LOG_LEVEL": "INFO",
+        "LOG_FORMATTER": QuietDroppedLogFormatter,
+    }
+    configure_logging(log_settings)
+    return log_settings
 
 
 class Redrive(BaseModel):
     complete: bool = False
     augment: bool = True
     ids: Optional[list[str]] = None
+    # Write refs to a JSONL manifest and return its Bucket/Prefix instead of the refs
+    stream: bool = False
 
 
 class ScraperEvent(BaseModel):
@@ -41,6 +50,11 @@ class ScraperEvent(BaseModel):
     limitItems: Optional[int] = None
     forceLastEvent: Optional[str] = None
     redrive: Optional[Redrive] = None
+    # Re-download every document even if its fingerprint is unchanged
+    ignoreFingerprints: bool = False
+    # Load the raw index with large concurrent bulks and relaxed refreshes,
+    # for full scrapes (see BulkLoadConfig)
+    bulkLoad: bool = False
 
 
 def int_env(name, default=None):
@@ -50,17 +64,30 @@ def int_env(name, default=None):
     return int(value)
 
 
+def bulk_load_settings(scraper_event: ScraperEvent) -> Optional[dict]:
+    if not scraper_event.bulkLoad:
+        return None
+    return {
+        "MAX_BYTES": int_env("OPENSEARCH_BULK_MAX_BYTES"),
+        "MAX_ITEMS": int_env("OPENSEARCH_BULK_MAX_ITEMS"),
+        "CONCURRENCY": int_env("OPENSEARCH_BULK_CONCURRENCY"),
+        "REFRESH_INTERVAL": os.getenv("OPENSEARCH_BULK_REFRESH_INTERVAL"),
+    }
+
+
 def do_redrive(redrive: Redrive, index: str):
     if redrive.ids and not redrive.complete:
         return [
             {"_id": id, "_index": index, "passthrough": not redrive.augment}
             for id in redrive.ids
         ]
+    if redrive.complete and redrive.stream:
+        return lambda_friendly_run_async(write_redrive_manifest(redrive, index))
     if redrive.complete:
 
         async def get_all_refs():
             refs = []
-            async for doc in helpers.async_scan(client, index=index, size=20):
+            async for doc in helpers.async_scan(get_client(), index=index, size=20):
                 refs.append(
                     {
                         "_id": doc["_id"],
@@ -73,24 +100,67 @@ def do_redrive(redrive: Redrive, index: str):
         return lambda_friendly_run_async(get_all_refs())
 
 
-def handler(event, context):
-    scraper_event = ScraperEvent.model_validate(event)
+async def write_redrive_manifest(redrive: Redrive, index: str):
+    """Stream every ref in the index into a manifest, without holding them in memory."""
+
+    async def refs():
+        async for hit in pit_search_after(
+            get_client(),
+            index,
+            sort=[{"id": "asc"}],
+            page_size=int_env("REDRIVE_PAGE_SIZE", 1000),
+            _source=False,
+        ):
+            yield {
+                "_id": hit["_id"],
+                "_index": hit["_index"],
+                "passthrough": not redrive.augment,
+            }
+
+    store = manifest_store_from_uri(
+        os.getenv("REDRIVE_MANIFEST_URI", "/tmp/redrive-manifests")
+    )
+    run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:8]}"
+    manifest = await write_jsonl_manifest(store, f"{index}/{run_id}", refs())
+    logging.info(f"Wrote {manifest['count']} refs to redrive manifest")
+    return {"manifest": manifest}
+
+
+def raw_index(scraper_event: ScraperEvent) -> str:
     index_suffix = scraper_event.indexSuffix
-    index = f"outcomes-raw-{index_suffix}" if index_suffix else "outcomes-raw"
+    return f"outcomes-raw-{index_suffix}" if index_suffix else "outcomes-raw"
 
-    if scraper_event.redrive:
-        return do_redrive(scraper_event.redrive, index)
+
+def scrape(scraper_event: ScraperEvent, on_ref=None):
+    """Crawl updated outcomes into the raw index, returning a ref per decision.
+
+    ``on_ref`` is called with each ref as soon as its decision is stored, from
+    the crawler's thread.
+    """
+    index_suffix = scraper_event.indexSuffix
+    index = raw_index(scraper_event)
+    log_settings = crawler_runtime()
+
+    import crochet
+    from scrapy import signals
+    from scrapy.crawler import CrawlerRunner, Crawler
+
+    from pipeline.spider import http_cache_settings
+    from pipeline.spider.updated_outcomes import UpdatedOutcomesSpider
+    from pipeline.spider.cac_outcome_spider import CacOutcomeOpensearchPipeline
+    from pipeline.types.decisions import decision_raw_mapping
 
     references = []
 
     def add_ref(item):
         id = CacOutcomeOpensearchPipeline.id(None, item)
-        references.append(
-            {
-                "_id": id,
-                "_index": index,
-            }
-        )
+        ref = {
+            "_id": id,
+            "_index": index,
+        }
+        references.append(ref)
+        if on_ref:
+            on_ref(ref)
 
     @crochet.wait_for(timeout=60 * 60)  # More than the maximum possible lambda timeout
     def run_spider():
@@ -111,13 +181,30 @@ def handler(event, context):
                 "INDEX": index,
                 "MAPPING": {"dynamic": "strict", "properties": decision_raw_mapping},
                 "BATCH_SIZE": int_env("OPENSEARCH_BATCH_SIZE", 15),
+                "BULK_LOAD": bulk_load_settings(scraper_event),
+                "CONTENT_CACHE_INDEX": os.getenv("CONTENT_CACHE_INDEX"),
+                "FINGERPRINT_INDEX": (
+                    None
+                    if scraper_event.ignoreFingerprints
+                    else (
+                        f"outcomes-fingerprints-{index_suffix}"
+                        if index_suffix
+                        else "outcomes-fingerprints"
+                    )
+                ),
                 "CREDENTIALS_SECRET": os.getenv("OPENSEARCH_CREDENTIALS_SECRET"),
             },
             "EXTENSIONS": {
                 "scrapy.extensions.closespider.CloseSpider": 100,
             },
+            "PDF": {
+                "WORKERS": int_env("PDF_WORKERS"),
+                "TIMEOUT": int_env("PDF_TIMEOUT_SECONDS", 300),
+            },
             "CLOSESPIDER_ITEMCOUNT": scraper_event.limitItems,
             "CLOSESPIDER_ERRORCOUNT": 5,
+            **http_cache_settings(),
+            "CONTENT_CACHE_DIR": os.getenv("CONTENT_CACHE_DIR"),
             **log_settings,
         }
         crawler = Crawler(UpdatedOutcomesSpider, settings)
@@ -128,3 +215,12 @@ def handler(event, context):
     run_spider()
     logging.info(f"Scraped {len(references)} decisions")
     return references
+
+
+def handler(event, context):
+    scraper_event = ScraperEvent.model_validate(event)
+
+    if scraper_event.redrive:
+        return do_redrive(scraper_event.redrive, raw_index(scraper_event))
+
+    return scrape(scraper_event)
@@ -60,49 +60,46 @@ def merge_decisions(accumulator, decision):
     }
 
 
-async def merge_decisions_to_outcome(client, *, index, non_pipeline_indices, reference):
-    # It makes sense to do this all in one function because it relies on the sort
-    # order to merge in a simple way.
-    index_names = sorted({index} | set(non_pipeline_indices))
-    res = await client.search(
-        index=",".join(index_names),
-        body={
-            "size": len(DocumentType),  # Max possible
-            "query": {
-                "term": {"reference": reference},
-            },
-            "sort": [
-                {"reference": {"order": "asc"}},
-                {"last_updated": {"missing": "_first"}},
-                {"document_type": {"order": "asc"}},
-            ],
-        },
+COMPANIES_INDEX = "disambiguated-companies"
+REFERENCE_BATCH_SIZE = 500
+
+decisions_sort = [
+    {"reference": {"order": "asc"}},
+    {"last_updated": {"missing": "_first"}},
+    {"document_type": {"order": "asc"}},
+]
+
+
+def company_doc_id(acceptance_decision: dict) -> str:
+    parties = get_parties(acceptance_decision.get("outcome_title"))
+    extracted_data = acceptance_decision.get("extracted_data", {})
+    bargaining_unit = extracted_data.get("bargaining_unit", {})
+    disambiguate_company_request = DisambiguateCompanyRequest(
+        name=parties.get("employer"),
+        unions=parties.get("unions"),
+        application_date=extracted_data.get("decision_date"),
+        bargaining_unit=bargaining_unit.get("description"),
+        locations=bargaining_unit.get("locations", None),
     )
+    return request_to_doc_id(disambiguate_company_request)
 
-    hits = res["hits"]["hits"]
+
+def is_acceptance_decision(decision: dict) -> bool:
+    return decision.get("document_type") == DocumentType.acceptance_decision.value
+
+
+def merge_hits_to_outcome(hits, companies: dict[str, dict]):
+    """Merge sorted decision hits, taking companies from a doc ID -> source lookup."""
     maybe_outcome = {"entities": {"company": None}}
 
     for hit in hits:
-        index = hit["_index"]
         decision = hit["_source"]
 
-        if decision.get("document_type") == DocumentType.acceptance_decision.value:
-            parties = get_parties(decision.get("outcome_title"))
-            extracted_data = decision.get("extracted_data", {})
-            bargaining_unit = extracted_data.get("bargaining_unit", {})
-            disambiguate_company_request = DisambiguateCompanyRequest(
-                name=parties.get("employer"),
-                unions=parties.get("unions"),
-                application_date=extracted_data.get("decision_date"),
-                bargaining_unit=bargaining_unit.get("description"),
-                locations=bargaining_unit.get("locations", None),
-            )
-            company_id = request_to_doc_id(disambiguate_company_request)
-            company = await client.get(index="disambiguated-companies", id=company_id)
-            company = DisambiguatedCompany.model_validate(
-                company["_source"]["disambiguated_company"]
+        if is_acceptance_decision(decision):
+            company = companies[company_doc_id(decision)]
+            maybe_outcome["entities"]["company"] = DisambiguatedCompany.model_validate(
+                company["disambiguated_company"]
             )
-            maybe_outcome["entities"]["company"] = company
 
         maybe_outcome = merge_decisions(maybe_outcome, decision)
 
@@ -117,3 +114,105 @@ async def merge_decisions_to_outcome(client, *, index, non_pipeline_indices, ref
             )
             return None
         raise
+
+
+async def merge_decisions_to_outcome(client, *, index, non_pipeline_indices, reference):
+    # It makes sense to do this all in one function because it relies on the sort
+    # order to merge in a simple way.
+    index_names = sorted({index} | set(non_pipeline_indices))
+    res = await client.search(
+        index=",".join(index_names),
+        body={
+            "size": len(DocumentType),  # Max possible
+            "query": {
+                "term": {"reference": reference},
+            },
+            "sort": decisions_sort,
+        },
+    )
+
+    hits = res["hits"]["hits"]
+    companies = {}
+    for hit in hits:
+        if is_acceptance_decision(hit["_source"]):
+            company_id = company_doc_id(hit["_source"])
+            company = await client.get(index=COMPANIES_INDEX, id=company_id)
+            companies[company_id] = company["_source"]
+
+    return merge_hits_to_outcome(hits, companies)
+
+
+async def get_companies(client, hit_groups) -> dict[str, dict]:
+    """One ``mget`` for the disambiguated companies of every acceptance decision
+    in ``hit_groups``, as a doc ID -> source lookup (missing companies absent).
+    """
+    company_ids = list(
+        dict.fromkeys(
+            company_doc_id(hit["_source"])
+            for hits in hit_groups
+            for hit in hits
+            if is_acceptance_decision(hit["_source"])
+        )
+    )
+    if not company_ids:
+        return {}
+    res = await client.mget(index=COMPANIES_INDEX, body={"ids": company_ids})
+    return {doc["_id"]: doc["_source"] for doc in res["docs"] if doc.get("found")}
+
+
+def missing_companies(hits, companies: dict[str, dict]) -> list[str]:
+    return [
+        company_doc_id(hit["_source"])
+        for hit in hits
+        if is_acceptance_decision(hit["_source"])
+        and company_doc_id(hit["_source"]) not in companies
+    ]
+
+
+async def merge_decisions_to_outcomes(
+    client, *, index, non_pipeline_indices, references
+):
+    """Batched ``merge_decisions_to_outcome``: one search and one company ``mget``
+    per chunk of references.
+
+    Returns a dict of reference -> outcome (or None, as for a single reference).
+    Outcomes whose disambiguated company is missing are logged and returned as None;
+    an error merging one reference's decisions is returned in place of its
+    outcome rather than raised, so the rest of the batch can still be indexed.
+    """
+    index_names = sorted({index} | set(non_pipeline_indices))
+    references = list(dict.fromkeys(references))
+    outcomes = {}
+
+    for offset in range(0, len(references), REFERENCE_BATCH_SIZE):
+        batch = references[offset : offset + REFERENCE_BATCH_SIZE]
+        res = await client.search(
+            index=",".join(index_names),
+            body={
+                "size": len(DocumentType) * len(batch),  # Max possible
+                "query": {
+                    "terms": {"reference": batch},
+                },
+                "sort": decisions_sort,
+            },
+        )
+
+        hits_by_reference = {reference: [] for reference in batch}
+        for hit in res["hits"]["hits"]:
+            hits_by_reference.setdefault(hit["_source"]["reference"], []).append(hit)
+
+        companies = await get_companies(client, hits_by_reference.values())
+
+        for reference, hits in hits_by_reference.items():
+            missing = missing_companies(hits, companies)
+            if missing:
+                print(f"No disambiguated company {missing} for reference {reference!r}")
+                outcomes[reference] = None
+                continue
+            try:
+                outcomes[reference] = merge_hits_to_outcome(hits, companies)
+            except Exception as e:
+                print(f"Failed to merge outcome for reference {reference!r}: {e!r}")
+                outcomes[reference] = e
+
+    return outcomes
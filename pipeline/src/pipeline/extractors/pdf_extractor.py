@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+
+def pdf_to_markdown(body: bytes) -> str:
+    # Imported in the worker: pymupdf is slow to import and only needed here
+    import pymupdf
+    import pymupdf4llm
+
+    pdf = pymupdf.open(stream=body)
+    return pymupdf4llm.to_markdown(pdf)
+
+
+class PdfExtractorPool:
+    """Bounded pool for PDF-to-markdown conversion off the reactor thread.
+
+    Uses worker processes so PDFs convert in parallel across cores. Where process
+    pools aren't available (AWS Lambda has no /dev/shm for semaphores) it falls back
+    to a single thread, which still keeps the reactor free while converting.
+    """
+
+    def __init__(self, workers: Optional[int] = None, timeout: float = 300):
+        self.workers = workers
+        self.timeout = timeout
+        self.processes = True
+        self.executor: Executor = self._new_executor()
+
+    def _new_executor(self) -> Executor:
+        if self.processes:
+            try:
+                # spawn rather than fork: the crawler runs its reactor in another thread
+                return ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except OSError as e:
+                logging.warning(
+                    f"Process pool unavailable ({e}), converting PDFs in a thread"
+                )
+                self.processes = False
+        # PyMuPDF isn't thread-safe, so only one conversion may run at a time
+        return ThreadPoolExecutor(max_workers=1)
+
+    async def to_markdown(self, body: bytes) -> str:
+        """Convert one PDF, raising TimeoutError after ``timeout`` seconds.
+
+        A timed-out conversion can't be interrupted, so it keeps its worker until
+        done. With processes, later PDFs go to a fresh pool instead, and the old
+        one shuts down once its conversions finish. The single thread can't be
+        replaced without converting two PDFs at once, so there later PDFs wait
+        for the stuck one (and may time out themselves meanwhile).
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(executor, pdf_to_markdown, body),
+                self.timeout,
+            )
+        except TimeoutError:
+            if self.processes and self.executor is executor:
+                logging.warning("PDF conversion timed out, replacing the worker pool")
+                self.executor = self._new_executor()
+                executor.shutdown(wait=False)
+            raise
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
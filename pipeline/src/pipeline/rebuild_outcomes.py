@@ -0,0 +1,249 @@
+"""Rebuild outcomes-indexed from the augmented decisions already stored.
+
+When the index transform or mapping changes, every outcome needs
+re-transforming, but nothing upstream of the indexer does: the augmented
+decisions and disambiguated companies are already in OpenSearch. This
+streams the augmented decisions sorted by reference, merges each outcome's
+decisions as they arrive, transforms outcomes in a process pool and bulk
+loads them into a fresh versioned index (see ``versioned_index``), which then
+replaces the old one behind the outcomes-indexed alias. No LLM or lambda is involved.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, Optional, Sequence
+
+from opensearchpy import AsyncOpenSearch, helpers
+
+from .decisions_to_outcomes import (
+    decisions_sort,
+    get_companies,
+    merge_hits_to_outcome,
+    missing_companies,
+)
+from .services.opensearch_utils import pit_search_after, versioned_index
+from .transforms import transform_for_index
+from .transforms.events import InvalidEventError
+
+NON_PIPELINE_INDICES = {"application-withdrawals"}
+
+
+@dataclass
+class RebuildStats:
+    index: str
+    decisions: int = 0
+    outcomes: int = 0
+    indexed: int = 0
+    skipped: int = 0
+    # Outcomes that couldn't be merged or transformed, left out of the index
+    failed: int = 0
+    # Outcomes the bulk load couldn't write, which abandon the rebuild
+    write_failed: int = 0
+
+    def report(self) -> str:
+        return (
+            f"Rebuilt {self.index}: {self.indexed} of {self.outcomes} outcomes "
+            f"indexed from {self.decisions} decisions ({self.skipped} skipped, "
+            f"{self.failed} failed to transform, {self.write_failed} failed to index)"
+        )
+
+
+async def reference_groups(
+    client: AsyncOpenSearch, indices: Iterable[str], page_size: int = 1000
+) -> AsyncIterator[list[dict]]:
+    """Decision hits grouped by reference, each group in merge order."""
+    group: list[dict] = []
+    async for hit in pit_search_after(
+        client,
+        ",".join(sorted(indices)),
+        # decisions_sort orders each outcome's decisions for merging; id makes
+        # the sort unique, as search_after needs
+        sort=[*decisions_sort, {"id": "asc"}],
+        page_size=page_size,
+    ):
+        if group and hit["_source"]["reference"] != group[0]["_source"]["reference"]:
+            yield group
+            group = []
+        group.append(hit)
+    if group:
+        yield group
+
+
+def transform_groups(
+    groups: list[list[dict]], companies: dict[str, dict]
+) -> tuple[list[tuple[Optional[str], Optional[dict]]], list[str]]:
+    """Merge and transform each group of decision hits, in a worker process.
+
+    Returns (outcome id, indexed document) per group, with None for the
+    document where the outcome can't be indexed, and the references of the
+    outcomes among those that failed with an error.
+    """
+    results = []
+    failed = []
+    for hits in groups:
+        reference = hits[0]["_source"]["reference"]
+        try:
+            outcome = merge_hits_to_outcome(hits, companies)
+            if outcome is None:
+                results.append((reference, None))
+                continue
+            results.append((outcome.id, transform_for_index(outcome)))
+        except InvalidEventError as e:
+            print(f"Invalid event error: {e}")
+            results.append((reference, None))
+        except Exception as e:
+            print(f"Failed to transform outcome {reference!r}: {e!r}")
+            results.append((reference, None))
+            failed.append(reference)
+    return results, failed
+
+
+async def pipeline_groups(groups: AsyncIterator[list[dict]]):
+    """Drop references with only non-pipeline decisions, which the indexer
+    never sees either."""
+    async for hits in groups:
+        if any(hit["_index"] not in NON_PIPELINE_INDICES for hit in hits):
+            yield hits
+
+
+async def _chunks(groups: AsyncIterator[list[dict]], size: int):
+    chunk = []
+    async for group in groups:
+        chunk.append(group)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def index_actions(
+    client: AsyncOpenSearch,
+    groups: AsyncIterator[list[dict]],
+    *,
+    index: str,
+    executor: Executor,
+    stats: RebuildStats,
+    chunk_size: int = 100,
+    max_pending: int = 8,
+) -> AsyncIterator[dict]:
+    """Bulk index actions for every outcome, transformed in ``executor``.
+
+    At most ``max_pending`` chunks of ``chunk_size`` outcomes are being
+    transformed at once, so reading from OpenSearch stays only a little
+    ahead of the workers.
+    """
+    loop = asyncio.get_running_loop()
+    pending = deque()
+
+    def actions(transformed):
+        results, failed = transformed
+        stats.failed += len(failed)
+        for outcome_id, doc in results:
+            if doc is None:
+                # Failed outcomes have no document either, but aren't skips
+                stats.skipped += outcome_id not in failed
+                continue
+            yield {
+                "_op_type": "index",
+                "_index": index,
+                "_id": outcome_id,
+                "_source": doc,
+            }
+
+    async for chunk in _chunks(pipeline_groups(groups), chunk_size):
+        stats.outcomes += len(chunk)
+        stats.decisions += sum(len(hits) for hits in chunk)
+        companies = await get_companies(client, chunk)
+        ready = []
+        for hits in chunk:
+            if missing := missing_companies(hits, companies):
+                reference = hits[0]["_source"]["reference"]
+                print(f"No disambiguated company {missing} for reference {reference!r}")
+                stats.skipped += 1
+            else:
+                ready.append(hits)
+        pending.append(
+            loop.run_in_executor(executor, transform_groups, ready, companies)
+        )
+        while len(pending) >= max_pending:
+            for action in actions(await pending.popleft()):
+                yield action
+
+    while pending:
+        for action in actions(await pending.popleft()):
+            yield action
+
+
+async def rebuild_outcomes_indexed(
+    client: AsyncOpenSearch,
+    *,
+    source_index: str,
+    alias: str,
+    mapping: dict,
+    executor: Executor,
+    page_size: int = 1000,
+    chunk_size: int = 100,
+    bulk_chunk_size: int = 500,
+    swap: bool = True,
+    replace_index: bool = False,
+    read_aliases: Sequence[str] = (),
+) -> RebuildStats:
+    """Rebuild ``alias`` from the augmented decisions in ``source_index``.
+
+    Args:
+        client: OpenSearch client
+        source_index: Augmented decisions, e.g. outcomes-augmented-1012
+        alias: Alias readers use, e.g. outcomes-indexed-1012
+        mapping: Mapping for the new index
+        executor: Where outcomes are transformed, normally a process pool
+        page_size: Decisions read per search page
+        chunk_size: Outcomes per company lookup and executor task
+        bulk_chunk_size: Documents per bulk request
+        swap: Point ``alias`` at the new index once it is loaded
+        replace_index: Allow ``alias`` to replace a concrete index of that name
+        read_aliases: Further aliases to flip with ``alias``, e.g. the
+            unsuffixed outcomes-indexed the webapp reads
+
+    Returns:
+        Counts for the rebuild, including the new index's name
+    """
+    async with versioned_index(
+        client,
+        alias,
+        mapping,
+        read_aliases=read_aliases,
+        replace_index=replace_index,
+        swap=swap,
+    ) as index:
+        stats = RebuildStats(index=index)
+        groups = reference_groups(
+            client, {source_index, *NON_PIPELINE_INDICES}, page_size=page_size
+        )
+        actions = index_actions(
+            client,
+            groups,
+            index=index,
+            executor=executor,
+            stats=stats,
+            chunk_size=chunk_size,
+        )
+        async for ok, result in helpers.async_streaming_bulk(
+            client,
+            actions,
+            chunk_size=bulk_chunk_size,
+            max_retries=3,
+            raise_on_error=False,
+        ):
+            if ok:
+                stats.indexed += 1
+            else:
+                stats.write_failed += 1
+                print(f"Failed to index outcome: {result}")
+
+        if stats.write_failed:
+            # Discards the new index rather than putting an incomplete one live
+            raise RuntimeError(f"Abandoning {index}: {stats.report()}")
+    return stats
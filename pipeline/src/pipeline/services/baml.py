@@ -1,14 +1,12 @@
+import functools
 import os
-from baml_client import b
-from baml_py.errors import BamlValidationError
-from baml_py import ClientRegistry
 from tenacity import (
     stop_after_attempt,
     wait_fixed,
     retry_if_exception_type,
     AsyncRetrying,
 )
-from .secrets import secrets_store
+from .secrets import get_secrets_store
 
 env_key = os.getenv("GOOGLE_API_KEY")
 secret_name = os.getenv("GOOGLE_API_KEY_SECRET")
@@ -18,18 +16,70 @@ def _get_api_key():
     if env_key:
         return env_key
     if secret_name:
-        return secrets_store.get_secret_string(secret_name)
+        return get_secrets_store().get_secret_string(secret_name)
     return None
 
 
-authenticated_client = b.with_options(env={"GOOGLE_API_KEY": _get_api_key()})
+# Set by override_clients, e.g. to replay recorded responses offline
+_client_overrides = {}
 
-large_client_registry = ClientRegistry()
-large_client_registry.set_primary("LargeClient")
-large_client = authenticated_client.with_options(client_registry=large_client_registry)
+
+def override_clients(*, authenticated_client, large_client):
+    """Serve these objects in place of the BAML clients from now on.
+
+    Must be called before the first LLM call, since callers may hold on to the
+    clients they were given.
+    """
+    _client_overrides["authenticated_client"] = authenticated_client
+    _client_overrides["large_client"] = large_client
+
+
+def get_authenticated_client():
+    if "authenticated_client" in _client_overrides:
+        return _client_overrides["authenticated_client"]
+    return _build_authenticated_client()
+
+
+def get_large_client():
+    if "large_client" in _client_overrides:
+        return _client_overrides["large_client"]
+    return _build_large_client()
+
+
+@functools.cache
+def _build_authenticated_client():
+    from baml_client import b
+
+    return b.with_options(env={"GOOGLE_API_KEY": _get_api_key()})
+
+
+@functools.cache
+def _build_large_client():
+    from baml_py import ClientRegistry
+
+    large_client_registry = ClientRegistry()
+    large_client_registry.set_primary("LargeClient")
+    return _build_authenticated_client().with_options(
+        client_registry=large_client_registry
+    )
+
+
+# The clients are built (and the API key fetched) on first access rather than import
+_lazy_clients = {
+    "authenticated_client": get_authenticated_client,
+    "large_client": get_large_client,
+}
+
+
+def __getattr__(name):
+    if name in _lazy_clients:
+        return _lazy_clients[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def with_retry_client(default_client, retry_client, wait=wait_fixed(3), max_attempts=2):
+    from baml_py.errors import BamlValidationError
+
     def decorator(func):
         async def async_wrapper(*args, **kwargs):
             async for attempt_ctx in AsyncRetrying(
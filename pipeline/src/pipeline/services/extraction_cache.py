@@ -0,0 +1,110 @@
+import asyncio
+import functools
+import hashlib
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from opensearchpy.exceptions import NotFoundError
+
+from .opensearch_utils import ensure_index_mapping
+
+extraction_cache_mapping = {
+    "dynamic": "strict",
+    "properties": {
+        "function": {"type": "keyword"},
+        "client": {"type": "keyword"},
+        "result": {"type": "object", "enabled": False},
+    },
+}
+
+
+@functools.cache
+def baml_src_hash() -> str:
+    """Hash of every BAML source file the generated client was built from.
+
+    Covers prompts, output schemas and client definitions, so editing any of
+    them (and regenerating) invalidates previously cached extractions.
+    """
+    from baml_client.inlinedbaml import get_baml_files
+
+    digest = hashlib.sha256()
+    for name, source in sorted(get_baml_files().items()):
+        digest.update(name.encode())
+        digest.update(b"\0")
+        digest.update(source.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def extraction_key(
+    document_type: str, content: str, function_name: str, client_name: str
+) -> str:
+    content_hash = hashlib.sha256(content.encode()).hexdigest()
+    parts = [document_type, content_hash, function_name, baml_src_hash(), client_name]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+class ExtractionCache(ABC):
+    """Persistent store of LLM extraction results, keyed by `extraction_key`."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    async def put(
+        self, key: str, result: dict, *, function_name: str, client_name: str
+    ) -> None:
+        pass
+
+
+class LocalExtractionCache(ExtractionCache):
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _read(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)["result"]
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path, entry):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    async def get(self, key):
+        return await asyncio.to_thread(self._read, self.path(key))
+
+    async def put(self, key, result, *, function_name, client_name):
+        entry = {"function": function_name, "client": client_name, "result": result}
+        await asyncio.to_thread(self._write, self.path(key), entry)
+
+
+class OpensearchExtractionCache(ExtractionCache):
+    def __init__(self, client, index: str):
+        self.client = client
+        self.index = index
+
+    async def get(self, key):
+        await ensure_index_mapping(self.client, self.index, extraction_cache_mapping)
+        try:
+            res = await self.client.get(index=self.index, id=key)
+        except NotFoundError:
+            return None
+        return res["_source"]["result"]
+
+    async def put(self, key, result, *, function_name, client_name):
+        await self.client.index(
+            index=self.index,
+            id=key,
+            body={"function": function_name, "client": client_name, "result": result},
+        )
@@ -0,0 +1,213 @@
+"""Record and replay LLM (and other async API) calls for offline benchmarking.
+
+`RecordingClient` wraps a real client and appends every call and its result to
+a JSONL file. `ReplayClient` serves those results back without the network,
+with configurable latency and injected failures, so the augmentation and
+disambiguation paths can be driven at scale without live Gemini.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from contextvars import ContextVar
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from .llm_scheduler import estimate_tokens
+
+
+# Calls made by the current task as (function, client, tokens), if being traced
+call_trace: ContextVar[Optional[list]] = ContextVar("call_trace", default=None)
+
+
+def call_key(function_name: str, args: tuple, kwargs: dict) -> str:
+    kwargs = {k: v for k, v in kwargs.items() if k != "baml_options"}
+    payload = json.dumps([function_name, args, kwargs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _dump(result):
+    if hasattr(result, "model_dump"):
+        return type(result).__name__, result.model_dump(mode="json")
+    return None, result
+
+
+def _prompt_tokens(args: tuple, kwargs: dict) -> int:
+    return estimate_tokens(
+        *(json.dumps(value, default=str) for value in [*args, *kwargs.values()])
+    )
+
+
+@dataclass
+class CallStats:
+    """Per-function and per-client call counts, latencies and estimated tokens."""
+
+    calls: Counter = field(default_factory=Counter)
+    client_calls: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    tokens: Counter = field(default_factory=Counter)
+
+    def record(self, function_name, client_name, latency, tokens, error=None):
+        trace = call_trace.get()
+        if trace is not None:
+            trace.append((function_name, client_name, tokens))
+        self.calls[function_name] += 1
+        self.client_calls[client_name] += 1
+        self.latencies[function_name].append(latency)
+        self.tokens[function_name] += tokens
+        if error is not None:
+            self.errors[type(error).__name__] += 1
+
+
+class RecordingClient:
+    """Proxies async method calls to `inner`, appending each result to `path`."""
+
+    def __init__(self, inner, client_name: str, path: str, stats=None):
+        self.inner = inner
+        self.client_name = client_name
+        self.path = path
+        self.stats = stats or CallStats()
+
+    def __getattr__(self, function_name):
+        if function_name.startswith("_"):
+            raise AttributeError(function_name)
+        method = getattr(self.inner, function_name)
+
+        async def record(*args, **kwargs):
+            start = time.perf_counter()
+            result = await method(*args, **kwargs)
+            latency = time.perf_counter() - start
+            result_type, result_json = _dump(result)
+            tokens = _prompt_tokens(args, kwargs) + estimate_tokens(
+                json.dumps(result_json, default=str)
+            )
+            self.stats.record(function_name, self.client_name, latency, tokens)
+            with open(self.path, "a") as f:
+                f.write(
+                    json.dumps(
+                        {
+                            "key": call_key(function_name, args, kwargs),
+                            "function": function_name,
+                            "client": self.client_name,
+                            "result_type": result_type,
+                            "result": result_json,
+                            "latency": latency,
+                            "tokens": tokens,
+                        },
+                        default=str,
+                    )
+                    + "\n"
+                )
+            return result
+
+        return record
+
+
+def load_recordings(path: str) -> dict[str, list[dict]]:
+    """Recordings by call key, in recorded order (one per client that answered)."""
+    recordings = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                recording = json.loads(line)
+                recordings[recording["key"]].append(recording)
+    return recordings
+
+
+class ThrottledError(Exception):
+    """Injected provider throttling, shaped like BamlClientHttpError."""
+
+    status_code = 429
+
+
+class ReplayClient:
+    """Serves recorded results in place of a BAML (or other async API) client.
+
+    Args:
+        recordings: Output of `load_recordings`
+        client_name: Name recorded for calls through this client
+        latency: Seconds to sleep per call; None replays the recorded latency
+        throttle_rate: Fraction of calls failing as if throttled (429)
+        invalid_rate: Fraction of calls failing with BamlValidationError,
+            which exercises the retry client
+        result_types: Module holding the recorded result types
+            (defaults to baml_client.types)
+        seed: Seed for the injected failures
+    """
+
+    def __init__(
+        self,
+        recordings: dict[str, list[dict]],
+        client_name: str,
+        *,
+        latency: Optional[float] = None,
+        throttle_rate: float = 0.0,
+        invalid_rate: float = 0.0,
+        result_types: Any = None,
+        stats: Optional[CallStats] = None,
+        seed: Optional[int] = None,
+    ):
+        self.recordings = recordings
+        self.client_name = client_name
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.invalid_rate = invalid_rate
+        self.result_types = result_types
+        self.stats = stats or CallStats()
+        self.random = random.Random(seed)
+
+    def _recording(self, key, function_name):
+        candidates = self.recordings.get(key)
+        if not candidates:
+            raise KeyError(f"No recording for {function_name} call {key}")
+        # Prefer what this client answered, else whatever was recorded
+        for candidate in candidates:
+            if candidate["client"] == self.client_name:
+                return candidate
+        return candidates[0]
+
+    def _result(self, recording):
+        if recording["result_type"] is None:
+            return recording["result"]
+        result_types = self.result_types
+        if result_types is None:
+            from baml_client import types as result_types
+        return getattr(result_types, recording["result_type"]).model_validate(
+            recording["result"]
+        )
+
+    def _injected_error(self, function_name):
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            return ThrottledError(f"Injected throttling for {function_name}")
+        if roll < self.throttle_rate + self.invalid_rate:
+            from baml_py.errors import BamlValidationError
+
+            return BamlValidationError(
+                "", f"Injected validation error for {function_name}", "", ""
+            )
+        return None
+
+    def __getattr__(self, function_name):
+        if function_name.startswith("_"):
+            raise AttributeError(function_name)
+
+        async def replay(*args, **kwargs):
+            recording = self._recording(
+                call_key(function_name, args, kwargs), function_name
+            )
+            latency = self.latency if self.latency is not None else recording["latency"]
+            await asyncio.sleep(latency)
+            error = self._injected_error(function_name)
+            self.stats.record(
+                function_name, self.client_name, latency, recording["tokens"], error
+            )
+            if error is not None:
+                raise error
+            return self._result(recording)
+
+        return replay
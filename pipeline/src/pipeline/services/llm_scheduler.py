@@ -0,0 +1,209 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Provider responses that mean "slow down" rather than "this request is bad"
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class Priority(IntEnum):
+    """Lower values are dispatched first."""
+
+    high = 0
+    normal = 1
+    low = 2
+
+
+def estimate_tokens(*texts: Optional[str]) -> int:
+    """Rough prompt size (~4 characters per token), for rate limiting only."""
+    return max(1, sum(len(text) for text in texts if text) // 4)
+
+
+def is_throttled(error: BaseException) -> bool:
+    return getattr(error, "status_code", None) in THROTTLE_STATUS_CODES
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `per_minute / 60` per second."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if it can be taken now)."""
+        self._refill()
+        # A single request bigger than the bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    event: asyncio.Event = field(compare=False, default_factory=asyncio.Event)
+
+
+class LlmScheduler:
+    """In-process scheduler for LLM calls.
+
+    Calls are dispatched in priority order (FIFO within a priority) subject to a
+    concurrency cap and optional requests/minute and tokens/minute buckets.
+    Throttling responses (429/503) pause all dispatch with exponential backoff
+    and the throttled call is retried, so callers only see throttling errors once
+    `max_retries` is exhausted.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 120.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrency = max_concurrency
+        self.requests = (
+            TokenBucket(requests_per_minute, clock) if requests_per_minute else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute, clock) if tokens_per_minute else None
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+
+        self.active = 0
+        self.throttled = 0
+        self.consecutive_throttles = 0
+        self.backoff_until = 0.0
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+
+    def _delay(self, tokens: int) -> float:
+        delays = [self.backoff_until - self.clock()]
+        if self.requests:
+            delays.append(self.requests.delay(1))
+        if self.tokens:
+            delays.append(self.tokens.delay(tokens))
+        return max(delays)
+
+    def _wake_head(self):
+        if self._queue:
+            self._queue[0].event.set()
+
+    async def _acquire(self, tokens: int, priority: int):
+        waiter = _Waiter(priority, next(self._seq), tokens)
+        heapq.heappush(self._queue, waiter)
+        try:
+            while True:
+                timeout = None
+                if self._queue[0] is waiter and self.active < self.max_concurrency:
+                    timeout = self._delay(tokens)
+                    if timeout <= 0:
+                        heapq.heappop(self._queue)
+                        if self.requests:
+                            self.requests.take(1)
+                        if self.tokens:
+                            self.tokens.take(tokens)
+                        self.active += 1
+                        self._wake_head()
+                        return
+                waiter.event.clear()
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), timeout)
+                except TimeoutError:
+                    pass
+        except BaseException:
+            if waiter in self._queue:
+                self._queue.remove(waiter)
+                heapq.heapify(self._queue)
+                self._wake_head()
+            raise
+
+    def _release(self):
+        self.active -= 1
+        self._wake_head()
+
+    def _on_throttled(self):
+        self.throttled += 1
+        backoff = min(
+            self.backoff_max, self.backoff_base * 2**self.consecutive_throttles
+        )
+        self.consecutive_throttles += 1
+        self.backoff_until = max(self.backoff_until, self.clock() + backoff)
+        logging.warning(f"LLM provider throttled us, backing off for {backoff:.1f}s")
+
+    async def submit(
+        self,
+        call: Callable[[], Awaitable[T]],
+        *,
+        tokens: int = 1,
+        priority: int = Priority.normal,
+    ) -> T:
+        """Run `call` once a slot is available.
+
+        Args:
+            call: Zero-argument function returning the LLM call's awaitable
+            tokens: Estimated token cost of the call (see `estimate_tokens`)
+            priority: Dispatch priority, lower first
+
+        Returns:
+            The result of the call
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(tokens, priority)
+            try:
+                result = await call()
+            except Exception as e:
+                if not is_throttled(e) or attempt == self.max_retries:
+                    raise
+                self._on_throttled()
+                continue
+            finally:
+                self._release()
+            self.consecutive_throttles = 0
+            return result
+
+
+def _float_env(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+@functools.cache
+def get_llm_scheduler() -> LlmScheduler:
+    """Process-wide scheduler shared by every LLM call site."""
+    return LlmScheduler(
+        max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 8)),
+        requests_per_minute=_float_env("LLM_REQUESTS_PER_MINUTE"),
+        tokens_per_minute=_float_env("LLM_TOKENS_PER_MINUTE"),
+    )
@@ -0,0 +1,109 @@
+"""JSONL manifests of document refs, written in chunks to a local directory or S3.
+
+Chunks are plain JSONL objects under a common prefix, so a Step Functions
+Distributed Map can list and read them with an ItemReader (``s3:listObjectsV2``
+on the pointer's Bucket and Prefix) rather than the refs passing through the
+state payload.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import AsyncIterable
+from urllib.parse import urlparse
+
+
+class ManifestStore(ABC):
+    @abstractmethod
+    def put(self, name: str, body: bytes) -> dict:
+        """Store one chunk and return a pointer to it."""
+        pass
+
+    @abstractmethod
+    def pointer(self, name: str) -> dict:
+        """Pointer to a whole manifest: the prefix all its chunks are under."""
+        pass
+
+
+class LocalManifestStore(ManifestStore):
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def put(self, name, body):
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(body)
+        return {"path": path}
+
+    def pointer(self, name):
+        return {"directory": os.path.join(self.directory, name, "")}
+
+
+class S3ManifestStore(ManifestStore):
+    """Works with any S3-compatible store; boto3 honours AWS_ENDPOINT_URL_S3."""
+
+    def __init__(self, bucket: str, prefix: str = ""):
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.s3 = boto3.client("s3")
+
+    def key(self, name):
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+    def put(self, name, body):
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=self.key(name),
+            Body=body,
+            ContentType="application/jsonl",
+        )
+        return {"Bucket": self.bucket, "Key": self.key(name)}
+
+    def pointer(self, name):
+        return {"Bucket": self.bucket, "Prefix": self.key(f"{name}/")}
+
+
+def manifest_store_from_uri(uri: str) -> ManifestStore:
+    """``s3://bucket/prefix`` or a local path (optionally ``file://``)."""
+    parsed = urlparse(uri)
+    if parsed.scheme == "s3":
+        return S3ManifestStore(parsed.netloc, parsed.path)
+    if parsed.scheme in ("", "file"):
+        return LocalManifestStore(parsed.path if parsed.scheme else uri)
+    raise ValueError(f"Unsupported manifest store: {uri}")
+
+
+async def write_jsonl_manifest(
+    store: ManifestStore,
+    name: str,
+    items: AsyncIterable[dict],
+    *,
+    chunk_size: int = 10_000,
+) -> dict:
+    """Stream items into ``<name>/part-NNNNN.jsonl`` chunks of at most chunk_size lines.
+
+    Returns the manifest pointer plus the total item count. Nothing else should
+    be written under ``<name>/``, since the pointer is only a prefix.
+    """
+    names = []
+    lines = []
+    count = 0
+
+    def flush():
+        chunk_name = f"{name}/part-{len(names):05d}.jsonl"
+        store.put(chunk_name, "".join(lines).encode())
+        names.append(chunk_name)
+        lines.clear()
+
+    async for item in items:
+        lines.append(json.dumps(item, separators=(",", ":")) + "\n")
+        count += 1
+        if len(lines) >= chunk_size:
+            flush()
+    if lines or not names:
+        flush()
+
+    return {**store.pointer(name), "count": count}
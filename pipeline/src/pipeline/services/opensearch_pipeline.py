@@ -2,6 +2,11 @@ import asyncio
 from abc import ABC, abstractmethod
 import os
 import logging
+import sys
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Optional
 import scrapy
 from twisted.internet.defer import Deferred
 from async_batcher.batcher import AsyncBatcher
@@ -15,10 +20,111 @@ def deferred(coroutine):
     return Deferred.fromFuture(loop.create_task(coroutine))
 
 
+@dataclass
+class BulkLoadConfig:
+    """Settings for loading a lot of documents at once, e.g. a full scrape.
+
+    Batches are cut into bulk requests of at most ``max_bytes`` (rather than a
+    fixed number of documents, which vary from a few hundred bytes to a whole
+    PDF's text), ``concurrency`` of which may be in flight at once. The
+    index's refresh_interval is relaxed for the duration; it isn't disabled
+    outright, since a crawl that is killed (e.g. by the lambda timeout) never
+    gets to restore it.
+    """
+
+    max_bytes: int = 5 * 1024 * 1024
+    max_items: int = 500
+    concurrency: int = 4
+    max_queue_time: float = 0.5
+    refresh_interval: str = "30s"
+    max_retries: int = 3
+
+    @classmethod
+    def from_settings(cls, settings: Optional[dict]) -> Optional["BulkLoadConfig"]:
+        if not settings:
+            return None
+        return cls(
+            **{
+                key: settings[key.upper()]
+                for key in cls.__dataclass_fields__
+                if settings.get(key.upper()) is not None
+            }
+        )
+
+
+@dataclass
+class BulkStats:
+    requests: int = 0
+    items: int = 0
+    bytes: int = 0
+    # Items the cluster still turned away with a 429 once retries ran out
+    rejected: int = 0
+    failed: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+    def latency(self, quantile: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    def report(self) -> str:
+        return (
+            f"{self.requests} bulk requests of {self.items} items "
+            f"({self.bytes / 1024 / 1024:.1f} MiB), {self.rejected} rejected, "
+            f"{self.failed} failed; latency p50 {self.latency(0.5):.2f}s, "
+            f"p95 {self.latency(0.95):.2f}s, max {self.latency(1):.2f}s"
+        )
+
+
+def action_size(action: dict, serializer) -> int:
+    """Bytes ``action`` takes up in a bulk request body."""
+    meta, data = helpers.expand_action(action)
+    size = len(serializer.dumps(meta).encode("utf-8")) + 1
+    if data is not None:
+        size += len(serializer.dumps(data).encode("utf-8")) + 1
+    return size
+
+
+def byte_chunks(sizes: list[int], max_bytes: int) -> list[list[int]]:
+    """Split actions of ``sizes`` into runs of indices totalling at most
+    ``max_bytes``, keeping any action bigger than that in a chunk of its own."""
+    chunks, chunk, chunk_bytes = [], [], 0
+    for i, size in enumerate(sizes):
+        if chunk and chunk_bytes + size > max_bytes:
+            chunks.append(chunk)
+            chunk, chunk_bytes = [], 0
+        chunk.append(i)
+        chunk_bytes += size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def result_status(result: dict) -> Optional[int]:
+    return next(iter(result.values())).get("status")
+
+
+def result_id(result: dict) -> str:
+    return next(iter(result.values()))["_id"]
+
+
 class OpensearchAsyncBatcher(AsyncBatcher):
-    def __init__(self, client, *args, **kwargs):
+    def __init__(
+        self,
+        client,
+        *args,
+        max_bytes=None,
+        max_retries=0,
+        initial_backoff=2,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.client = client
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.stats = BulkStats()
 
     def handle_result(self, ok, result):
         if not ok:
@@ -29,11 +135,54 @@ class OpensearchAsyncBatcher(AsyncBatcher):
             )
         return None
 
+    async def bulk(self, actions, size):
+        """Send ``actions`` as one bulk request, letting the client resend any
+        the cluster rejects (429) with exponential backoff up to
+        ``max_retries`` times."""
+        # Retried items come back after the rest, so match results up by id
+        positions = defaultdict(deque)
+        for i, action in enumerate(actions):
+            positions[action["_id"]].append(i)
+        results = [None] * len(actions)
+        start = time.perf_counter()
+        async for ok, result in helpers.async_streaming_bulk(
+            client=self.client,
+            actions=actions,
+            chunk_size=len(actions),
+            # Already sized by the caller, so always one request
+            max_chunk_bytes=sys.maxsize,
+            raise_on_error=False,
+            raise_on_exception=False,
+            max_retries=self.max_retries,
+            initial_backoff=self.initial_backoff,
+        ):
+            results[positions[result_id(result)].popleft()] = (ok, result)
+        self.stats.latencies.append(time.perf_counter() - start)
+        self.stats.requests += 1
+        self.stats.items += len(actions)
+        self.stats.bytes += size
+        self.stats.rejected += sum(
+            not ok and result_status(result) == 429 for ok, result in results
+        )
+        self.stats.failed += sum(not ok for ok, _ in results)
+        return results
+
     async def process_batch(self, batch):
         if not self.client:
             raise Exception("Client not initialized")
-        results_stream = helpers.async_streaming_bulk(client=self.client, actions=batch)
-        return [self.handle_result(ok, result) async for ok, result in results_stream]
+        serializer = self.client.transport.serializer
+        sizes = [action_size(action, serializer) for action in batch]
+        chunks = (
+            byte_chunks(sizes, self.max_bytes)
+            if self.max_bytes
+            else [list(range(len(batch)))]
+        )
+        results = []
+        for chunk in chunks:
+            results += await self.bulk(
+                [batch[i] for i in chunk], sum(sizes[i] for i in chunk)
+            )
+        return [self.handle_result(ok, result) for ok, result in results]
 
 
 class OpensearchPipeline(ABC):
@@ -55,12 +204,15 @@ class OpensearchPipeline(ABC):
         index,
         mapping=None,
         batch_size=15,
+        bulk_load: Optional[BulkLoadConfig] = None,
     ):
         self.cluster_host = cluster_host
         self.auth = auth
         self.index = index
         self.mapping = mapping
         self.batch_size = batch_size
+        self.bulk_load = bulk_load
+        self.restore_refresh_interval = None
 
     @classmethod
     def from_crawler(cls, crawler):
@@ -76,6 +228,7 @@ class OpensearchPipeline(ABC):
             auth=auth,
             mapping=settings.get("MAPPING"),
             batch_size=settings.get("BATCH_SIZE"),
+            bulk_load=BulkLoadConfig.from_settings(settings.get("BULK_LOAD")),
         )
 
     async def open_spider(self):
@@ -91,16 +244,57 @@ class OpensearchPipeline(ABC):
             mapping=self.mapping,
         )
 
-        self.batcher = OpensearchAsyncBatcher(
-            client=self.client,
-            max_batch_size=self.batch_size,
-            max_queue_size=2 * self.batch_size,
-            max_queue_time=1,
-            concurrency=1,
+        if self.bulk_load:
+            await self.relax_refresh_interval()
+            self.batcher = OpensearchAsyncBatcher(
+                client=self.client,
+                max_bytes=self.bulk_load.max_bytes,
+                max_retries=self.bulk_load.max_retries,
+                max_batch_size=self.bulk_load.max_items,
+                # Unbounded, since a full queue raises rather than waits; each
+                # process_item awaits its write, so Scrapy's item concurrency
+                # already bounds how much can pile up here
+                max_queue_size=-1,
+                max_queue_time=self.bulk_load.max_queue_time,
+                concurrency=self.bulk_load.concurrency,
+            )
+        else:
+            self.batcher = OpensearchAsyncBatcher(
+                client=self.client,
+                max_batch_size=self.batch_size,
+                max_queue_size=2 * self.batch_size,
+                max_queue_time=1,
+                concurrency=1,
+            )
+
+    async def relax_refresh_interval(self):
+        res = await self.client.indices.get_settings(index=self.index)
+        index_settings = next(iter(res.values()))["settings"]["index"]
+        # None resets to the default if the index didn't set it explicitly
+        self.restore_refresh_interval = {
+            "refresh_interval": index_settings.get("refresh_interval")
+        }
+        await self.client.indices.put_settings(
+            index=self.index,
+            body={"index": {"refresh_interval": self.bulk_load.refresh_interval}},
         )
 
+    async def after_flush(self):
+        """Runs once every queued item has been written, before the client closes."""
+        pass
+
     async def close_spider(self):
-        await self.batcher.stop(force=False)
+        try:
+            await self.batcher.stop(force=False)
+            logging.info(f"Indexed into {self.index}: {self.batcher.stats.report()}")
+        finally:
+            if self.restore_refresh_interval:
+                await self.client.indices.put_settings(
+                    index=self.index, body={"index": self.restore_refresh_interval}
+                )
+                # Make the load visible now rather than on the next refresh
+                await self.client.indices.refresh(index=self.index)
+        await self.after_flush()
         await self.client.close()
 
     def action(self, item):
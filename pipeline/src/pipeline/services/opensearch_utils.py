@@ -1,7 +1,11 @@
+import hashlib
 import json
-from typing import Optional, Tuple, Union, Dict, Any
+import os
+from datetime import datetime, timezone
+from enum import StrEnum, auto
+from contextlib import asynccontextmanager
+from typing import Optional, Sequence, Tuple, Union, Dict, Any, AsyncIterator
 
-import boto3
 from opensearchpy import (
     AsyncOpenSearch,
     OpenSearch,
@@ -56,8 +60,6 @@ def get_auth(
     password: Optional[str] = None,
     credentials_secret: Optional[str] = None,
 ) -> Union[Tuple[str, str], Dict[str, Any]]:
-    from .secrets import secrets_store
-
     """Get authentication credentials for OpenSearch.
 
     Args:
@@ -71,13 +73,17 @@ def get_auth(
     if user:
         return (user, password)
     elif credentials_secret:
-        secret_string = secrets_store.get_secret_string(credentials_secret)
+        from .secrets import get_secrets_store
+
+        secret_string = get_secrets_store().get_secret_string(credentials_secret)
         secret_dict = json.loads(secret_string)
         return (
             secret_dict.get("username"),
             secret_dict.get("password"),
         )
     else:
+        import boto3
+
         session = boto3.Session()
         return {
             "credentials": session.get_credentials(),
@@ -131,25 +137,84 @@ def create_client(
     )
 
 
+class RefreshPolicy(StrEnum):
+    """How writes become visible to search.
+
+    - none: rely on the index's refresh_interval (realtime GETs still see writes)
+    - wait_for: each write waits for the next scheduled refresh before returning
+    - deferred: writes don't refresh; a single coalesced refresh runs at the end
+      of the map run (see ``lambdas.refresher``)
+    """
+
+    none = auto()
+    wait_for = auto()
+    deferred = auto()
+
+
+def refresh_policy_from_env(
+    default: RefreshPolicy = RefreshPolicy.wait_for,
+) -> RefreshPolicy:
+    value = os.getenv("OPENSEARCH_REFRESH_POLICY")
+    return RefreshPolicy(value) if value else default
+
+
+def refresh_params(policy: RefreshPolicy) -> dict:
+    """Write request params implementing the given refresh policy."""
+    if policy is RefreshPolicy.wait_for:
+        return {"refresh": "wait_for"}
+    return {}
+
+
 def get_mapping_from_path(mapping_path: str) -> dict:
+    from .resources import load_json_resource
+
     try:
-        with open(mapping_path) as f:
-            return json.load(f)
+        return load_json_resource(mapping_path)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print(f"Failed to load mapping from {mapping_path}: {e}")
         raise RuntimeError(f"Failed to load mapping from {mapping_path}: {e}") from e
 
 
+# (index, mapping hash) pairs already applied by this process, so warm lambdas
+# and long-running scripts don't re-put mappings on every document
+_applied_mappings: set[tuple[str, str]] = set()
+
+
+def mapping_cache_enabled() -> bool:
+    return os.getenv("OPENSEARCH_MAPPING_CACHE", "true").lower() != "false"
+
+
+def mapping_hash(mapping: dict) -> str:
+    return hashlib.sha256(json.dumps(mapping, sort_keys=True).encode()).hexdigest()
+
+
+def invalidate_index_mapping(index: Optional[str] = None) -> None:
+    """Forget applied mappings for an index (or every index), so the next
+    ensure_index_mapping call goes back to the cluster."""
+    if index is None:
+        _applied_mappings.clear()
+        return
+    for applied in [a for a in _applied_mappings if a[0] == index]:
+        _applied_mappings.discard(applied)
+
+
 async def ensure_index_mapping(
     client: AsyncOpenSearch, index: str, mapping: dict
 ) -> None:
     """Ensure an index exists with the specified mapping.
 
+    Memoized per process on (index, mapping hash); set OPENSEARCH_MAPPING_CACHE=false
+    where indices are deleted behind the process's back (e.g. e2e tests).
+
     Args:
         client: OpenSearch client
         index: Name of the index
         mapping: Mapping to use
     """
+    applied = (index, mapping_hash(mapping))
+    if mapping_cache_enabled() and applied in _applied_mappings:
+        return
+
     try:
         # Check if index exists
         exists = await client.indices.exists(index=index)
@@ -164,6 +229,234 @@ async def ensure_index_mapping(
     except exceptions.OpenSearchException as e:
         if "resource_already_exists_exception" in str(e):
             # This is due to a race condition where the index is created after the exists check
+            _applied_mappings.add(applied)
             return
+        invalidate_index_mapping(index)
         print(f"Failed to ensure index mapping: {e}")
         raise RuntimeError(f"Failed to ensure index mapping: {e}") from e
+
+    _applied_mappings.add(applied)
+
+
+async def pit_search_after(
+    client: AsyncOpenSearch,
+    index: str,
+    *,
+    sort: list,
+    page_size: int = 1000,
+    keep_alive: str = "2m",
+    **body,
+) -> AsyncIterator[dict]:
+    """Iterate every hit in an index with a point-in-time and search_after.
+
+    Unlike a scroll this holds no per-page server context beyond the PIT, and gives
+    a stable ordering; ``sort`` must be unique per document (e.g. a keyword id).
+
+    Args:
+        client: OpenSearch client
+        index: Index (or comma-separated indices) to read
+        sort: Sort clause used for search_after
+        page_size: Hits per page
+        keep_alive: PIT keep-alive between pages
+        **body: Extra search body, e.g. query or _source
+    """
+    pit = await client.create_pit(index=index, params={"keep_alive": keep_alive})
+    pit_id = pit["pit_id"]
+    try:
+        search_after = None
+        while True:
+            page_body = {
+                **body,
+                "size": page_size,
+                "sort": sort,
+                "pit": {"id": pit_id, "keep_alive": keep_alive},
+            }
+            if search_after is not None:
+                page_body["search_after"] = search_after
+            res = await client.search(body=page_body)
+            pit_id = res.get("pit_id", pit_id)
+            hits = res["hits"]["hits"]
+            for hit in hits:
+                yield hit
+            if len(hits) < page_size:
+                return
+            search_after = hits[-1]["sort"]
+    finally:
+        await client.delete_pit(body={"pit_id": [pit_id]})
+
+
+# Settings while a new index is loaded: no refreshes and no replicas to keep
+# in step, both restored (see finish_bulk_load) before the index goes live
+bulk_load_settings = {"refresh_interval": "-1", "number_of_replicas": 0}
+
+
+def versioned_index_name(alias: str, version: Optional[str] = None) -> str:
+    """Name for a new concrete index behind ``alias``, by default timestamped."""
+    version = version or f"{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+    return f"{alias}-v{version}"
+
+
+def alias_for_versioned_index(index: str) -> Optional[str]:
+    """The alias a ``versioned_index_name`` belongs to, if it is one."""
+    alias, sep, version = index.rpartition("-v")
+    return alias if sep and version.isdigit() else None
+
+
+async def alias_targets(client: AsyncOpenSearch, alias: str) -> list[str]:
+    """Indices ``alias`` currently points at (none if it isn't an alias)."""
+    try:
+        res = await client.indices.get_alias(name=alias)
+    except exceptions.NotFoundError:
+        return []
+    return sorted(res)
+
+
+async def live_index_settings(client: AsyncOpenSearch, alias: str) -> dict:
+    """The bulk-loaded settings as they are on the index ``alias`` points at now.
+
+    Settings it doesn't set explicitly are None, which resets them to the
+    cluster default when put.
+    """
+    targets = await alias_targets(client, alias)
+    if not targets and await client.indices.exists(index=alias):
+        targets = [alias]  # A concrete index from before versioning
+    live = {key: None for key in bulk_load_settings}
+    if targets:
+        res = await client.indices.get_settings(index=targets[0])
+        index_settings = res[targets[0]]["settings"]["index"]
+        live.update({key: index_settings.get(key) for key in bulk_load_settings})
+    return live
+
+
+async def create_bulk_load_index(
+    client: AsyncOpenSearch, alias: str, mapping: dict, version: Optional[str] = None
+) -> str:
+    """Create a new versioned index for ``alias`` with ``bulk_load_settings``."""
+    index = versioned_index_name(alias, version)
+    print(f"Creating index {index} for bulk load")
+    await client.indices.create(
+        index=index, body={"settings": bulk_load_settings, "mappings": mapping}
+    )
+    return index
+
+
+async def finish_bulk_load(
+    client: AsyncOpenSearch,
+    index: str,
+    settings: dict,
+    *,
+    max_num_segments: int = 1,
+) -> None:
+    """Restore ``settings`` on a bulk-loaded index, refresh and force-merge it.
+
+    A freshly loaded index will only be read (and lightly updated) from here,
+    so merging it down to few segments is worth doing before it goes live.
+    """
+    await client.indices.put_settings(index=index, body={"index": settings})
+    await client.indices.refresh(index=index)
+    await client.indices.forcemerge(
+        index=index,
+        params={"max_num_segments": max_num_segments},
+        request_timeout=60 * 60,
+    )
+
+
+async def flip_aliases(
+    client: AsyncOpenSearch,
+    index: str,
+    aliases: list[str],
+    *,
+    replace_index: bool = False,
+) -> dict[str, list[str]]:
+    """Atomically point every one of ``aliases`` at ``index`` alone.
+
+    Args:
+        client: OpenSearch client
+        index: Concrete index the aliases should now point at
+        aliases: Aliases that readers and writers use
+        replace_index: If an alias is currently a concrete index (from before
+            indices were versioned), delete it in the same atomic update. Any
+            other aliases on it move to ``index`` with it, rather than being
+            dropped along with the index.
+
+    Returns:
+        The indices each alias (including any moved off a replaced index)
+        previously pointed at, which are left in place
+    """
+    previous = {}
+    removed = set()
+    carried = {}
+    for alias in aliases:
+        previous[alias] = await alias_targets(client, alias)
+        if not previous[alias] and await client.indices.exists(index=alias):
+            if not replace_index:
+                raise RuntimeError(
+                    f"{alias} is a concrete index, not an alias; pass replace_index "
+                    "to delete it and replace it with the alias"
+                )
+            res = await client.indices.get_alias(index=alias)
+            for other, config in res[alias]["aliases"].items():
+                carried.setdefault(other, ([alias], config))
+            removed.add(alias)
+    for other, (replaced, config) in carried.items():
+        previous.setdefault(other, replaced)
+
+    actions = [{"remove_index": {"index": name}} for name in sorted(removed)]
+    for alias, targets in previous.items():
+        actions += [
+            {"remove": {"index": target, "alias": alias}}
+            for target in targets
+            # Aliases on a removed index go with it
+            if target != index and target not in removed
+        ]
+        config = carried[alias][1] if alias in carried else {}
+        actions.append({"add": {"index": index, "alias": alias, **config}})
+    await client.indices.update_aliases(body={"actions": actions})
+    return previous
+
+
+async def swap_alias(
+    client: AsyncOpenSearch, alias: str, index: str, *, replace_index: bool = False
+) -> list[str]:
+    """Atomically point ``alias`` at ``index`` alone (see ``flip_aliases``)."""
+    previous = await flip_aliases(client, index, [alias], replace_index=replace_index)
+    return previous[alias]
+
+
+@asynccontextmanager
+async def versioned_index(
+    client: AsyncOpenSearch,
+    alias: str,
+    mapping: dict,
+    *,
+    read_aliases: Sequence[str] = (),
+    replace_index: bool = False,
+    swap: bool = True,
+    version: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """Build a new version of the index behind ``alias`` without downtime.
+
+    Creates the new index with ``bulk_load_settings`` and yields its name to
+    load. When the block exits cleanly the live index's settings are
+    restored, the new index is force-merged, and ``alias`` (plus any
+    ``read_aliases``) is flipped to it in one atomic update. If the block
+    raises, the partially loaded index is deleted and the aliases are untouched.
+
+    Usage::
+
+        async with versioned_index(client, "outcomes-indexed-1012", mapping) as index:
+            await bulk_load(client, index)
+    """
+    settings = await live_index_settings(client, alias)
+    index = await create_bulk_load_index(client, alias, mapping, version)
+    try:
+        yield index
+    except BaseException:
+        await client.indices.delete(index=index)
+        raise
+    await finish_bulk_load(client, index, settings)
+    if swap:
+        previous = await flip_aliases(
+            client, index, [alias, *read_aliases], replace_index=replace_index
+        )
+        print(f"Pointed {', '.join(previous)} at {index}")
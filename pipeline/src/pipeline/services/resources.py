@@ -0,0 +1,58 @@
+"""Lazily loaded, per-process memoized static assets (index mappings, SIC codes).
+
+Assets are only read the first time they are asked for. For faster cold starts
+they can be precompiled to ``marshal`` sidecars at image build time:
+
+    python -m pipeline.services.resources index_mappings/*.json
+"""
+
+import functools
+import json
+import marshal
+import os
+import sys
+from typing import Any
+
+
+def compiled_path(path: str) -> str:
+    return f"{path}.marshal"
+
+
+def _load_compiled(path: str) -> Any:
+    compiled = compiled_path(path)
+    try:
+        compiled_mtime = os.path.getmtime(compiled)
+        if os.path.exists(path) and compiled_mtime < os.path.getmtime(path):
+            return None  # Stale: the JSON has been edited since compilation
+        with open(compiled, "rb") as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+@functools.cache
+def load_json_resource(path: str) -> Any:
+    """Load a JSON asset once per process.
+
+    Prefers an up-to-date precompiled sidecar if there is one. The returned object
+    is shared between callers, so treat it as read-only.
+    """
+    compiled = _load_compiled(path)
+    if compiled is not None:
+        return compiled
+    with open(path) as f:
+        return json.load(f)
+
+
+def compile_resources(*paths: str) -> None:
+    """Write a ``marshal`` sidecar next to each JSON asset."""
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        with open(compiled_path(path), "wb") as f:
+            marshal.dump(data, f)
+        print(f"Compiled {path} -> {compiled_path(path)}")
+
+
+if __name__ == "__main__":
+    compile_resources(*sys.argv[1:])
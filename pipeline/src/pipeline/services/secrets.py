@@ -1,6 +1,18 @@
-import boto3
-from aws_secretsmanager_caching import SecretCache
+import functools
 
-session = boto3.Session()
-secrets_client = session.client("secretsmanager")
-secrets_store = SecretCache(client=secrets_client)
+
+@functools.cache
+def get_secrets_store():
+    """Secrets Manager cache, created on first use to keep boto3 off the import path."""
+    import boto3
+    from aws_secretsmanager_caching import SecretCache
+
+    session = boto3.Session()
+    secrets_client = session.client("secretsmanager")
+    return SecretCache(client=secrets_client)
+
+
+def __getattr__(name):
+    if name == "secrets_store":
+        return get_secrets_store()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,7 @@
 import logging
 import os
+from typing import Optional
+
 from scrapy.exceptions import DropItem
 from scrapy.logformatter import LogFormatter
 
@@ -25,3 +27,32 @@ class QuietDroppedLogFormatter(LogFormatter):
             }
         else:
             return super().dropped(item, exception, response, spider)
+
+
+def http_cache_settings(
+    cache_dir: Optional[str] = None, expiration_secs: Optional[int] = None
+) -> dict:
+    """Settings for a persistent, gzip-compressed HTTP cache.
+
+    Stale entries are revalidated with conditional GETs (If-None-Match /
+    If-Modified-Since), so repeat runs mostly cost 304s. ``cache_dir`` (default
+    HTTP_CACHE_DIR) should be an absolute path on a persisted volume (e.g. EFS in
+    Lambda); no dir disables it. Entries older than ``expiration_secs`` (default
+    HTTP_CACHE_EXPIRATION_SECS, else never) are refetched in full.
+    """
+    cache_dir = cache_dir or os.getenv("HTTP_CACHE_DIR")
+    if not cache_dir:
+        return {}
+    if expiration_secs is None:
+        expiration_secs = int(os.getenv("HTTP_CACHE_EXPIRATION_SECS", 0))
+    return {
+        "HTTPCACHE_ENABLED": True,
+        "HTTPCACHE_DIR": cache_dir,
+        "HTTPCACHE_POLICY": "scrapy.extensions.httpcache.RFC2616Policy",
+        "HTTPCACHE_STORAGE": "scrapy.extensions.httpcache.FilesystemCacheStorage",
+        "HTTPCACHE_GZIP": True,
+        # Keep responses even with short max-age so they can be revalidated
+        "HTTPCACHE_ALWAYS_STORE": True,
+        "HTTPCACHE_EXPIRATION_SECS": expiration_secs,
+        "HTTPCACHE_IGNORE_HTTP_CODES": [500, 502, 503, 504, 429],
+    }
@@ -5,11 +5,8 @@ from abc import ABC, abstractmethod
 from itemadapter import ItemAdapter
 
 from ..types.documents import DocumentType
-import pymupdf
-import pymupdf4llm
 import scrapy
-from markdownify import markdownify
-from scrapy.exceptions import NotSupported
+from scrapy.exceptions import DropItem, NotSupported
 
 from ..transforms.document_classifier import (
     get_document_type,
@@ -18,9 +15,65 @@ from ..transforms.document_classifier import (
 from ..transforms import normalize_reference
 from ..services.opensearch_pipeline import OpensearchPipeline
 from ..types.decisions import DecisionRaw
+from ..extractors.pdf_extractor import PdfExtractorPool
+from .fingerprints import FingerprintIndex, content_hash
+from .content_cache import ContentCache, LocalContentCache, OpensearchContentCache
 
 
 class CacOutcomeOpensearchPipeline(OpensearchPipeline):
+    fingerprint_index = None
+    fingerprints = None
+    content_cache_index = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = super().from_crawler(crawler)
+        pipeline.crawler = crawler
+        pipeline.fingerprint_index = crawler.settings.get("OPENSEARCH").get(
+            "FINGERPRINT_INDEX"
+        )
+        pipeline.content_cache_index = crawler.settings.get("OPENSEARCH").get(
+            "CONTENT_CACHE_INDEX"
+        )
+        return pipeline
+
+    async def open_spider(self):
+        await super().open_spider()
+        if self.fingerprint_index:
+            self.fingerprints = await FingerprintIndex.load(
+                self.client, self.fingerprint_index
+            )
+            self.crawler.spider.fingerprints = self.fingerprints
+        if self.content_cache_index:
+            content_cache = OpensearchContentCache(
+                self.client, self.content_cache_index
+            )
+            await content_cache.ensure_index()
+            self.crawler.spider.content_cache = content_cache
+
+    async def after_flush(self):
+        if self.fingerprints:
+            await self.fingerprints.save(self.client, self.fingerprint_index)
+
+    def record_fingerprint(self, item):
+        if self.fingerprints:
+            self.fingerprints.record(
+                item["reference"],
+                item["document_type"],
+                document=item.get("fingerprint"),
+            )
+
+    async def process_item(self, item):
+        try:
+            item = await super().process_item(item)
+        except DropItem as e:
+            # Already stored, or never meant to be
+            if "duplicate" in str(e) or str(e) == "skip":
+                self.record_fingerprint(item)
+            raise
+        self.record_fingerprint(item)
+        return item
+
     async def skip_item(self, item):
         match ItemAdapter(item)["document_type"]:
             case DocumentType.derecognition_decision:
@@ -40,18 +93,50 @@ class CacOutcomeOpensearchPipeline(OpensearchPipeline):
 class CacOutcomeSpider(scrapy.Spider, ABC):
     outcome_url_prefix = "https://www.gov.uk/government/publications/cac-outcome"
     list_url_prefix = "https://www.gov.uk/government/collections/cac-outcomes-"
+    # Set by CacOutcomeOpensearchPipeline when a fingerprint index is configured
+    fingerprints: FingerprintIndex | None = None
+    # Local from CONTENT_CACHE_DIR, or set by the pipeline for an OpenSearch cache
+    content_cache: ContentCache | None = None
+    _pdf_pool: PdfExtractorPool | None = None
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        cache_dir = crawler.settings.get("CONTENT_CACHE_DIR")
+        if cache_dir:
+            spider.content_cache = LocalContentCache(cache_dir)
+        return spider
 
     @abstractmethod
     async def start(self):
         pass
 
-    def parse(self, response, **kwargs):
+    @property
+    def pdf_settings(self):
+        return self.settings.get("PDF", {})
+
+    @property
+    def pdf_pool(self):
+        if self._pdf_pool is None:
+            self._pdf_pool = PdfExtractorPool(
+                workers=self.pdf_settings.get("WORKERS"),
+                timeout=self.pdf_settings.get("TIMEOUT", 300),
+            )
+        return self._pdf_pool
+
+    def closed(self, reason):
+        if self._pdf_pool is not None:
+            self._pdf_pool.shutdown()
+
+    async def parse(self, response, **kwargs):
         if response.url.startswith(self.outcome_url_prefix) and os.path.basename(
             urlparse(response.url).path
         ).startswith("cac-outcome"):
-            yield from self.parse_outcome(response, **kwargs)
+            for result in self.parse_outcome(response, **kwargs):
+                yield result
         else:
-            yield from self.parse_document(response, **kwargs)
+            async for result in self.parse_document(response, **kwargs):
+                yield result
 
     def parse_outcome(self, response):
         outcome_last_updated = (
@@ -74,11 +159,25 @@ class CacOutcomeSpider(scrapy.Spider, ABC):
         else:
             reference = normalize_reference(reference)
 
+        if self.fingerprints and self.fingerprints.outcome_unchanged(
+            reference, outcome_last_updated
+        ):
+            self.logger.debug(f"Skipping unchanged outcome {reference}")
+            return
+
         decision_docs = response.css("section#documents > section")
-        for i, document in enumerate(decision_docs):
+        document_types = [
+            get_document_type(document.css("h3 a").css("*::text").get().strip())
+            for document in decision_docs
+        ]
+        if self.fingerprints:
+            self.fingerprints.expect_outcome(
+                reference, outcome_last_updated, document_types
+            )
+        for i, (document, document_type) in enumerate(
+            zip(decision_docs, document_types)
+        ):
             decision_link = document.css("h3 a")
-            document_title = decision_link.css("*::text").get().strip()
-            document_type = get_document_type(document_title)
             common_fields = {
                 "reference": reference,
                 "outcome_url": response.url,
@@ -92,41 +191,116 @@ class CacOutcomeSpider(scrapy.Spider, ABC):
                 common_fields["last_updated"] = outcome_last_updated
 
             if not should_get_content(document_type):
-                document_url = response.urljoin(decision_link.attrib["href"])
                 yield {
                     **common_fields,
-                    "document_url": document_url,
+                    "document_url": response.urljoin(decision_link.attrib["href"]),
                 }
             else:
+                headers = {}
+                # The last document carries last_updated so is always fetched
+                if self.fingerprints and "last_updated" not in common_fields:
+                    headers = self.fingerprints.conditional_headers(
+                        reference,
+                        document_type,
+                        response.urljoin(decision_link.attrib["href"]),
+                    )
                 yield from response.follow_all(
                     urls=decision_link,
                     cb_kwargs=common_fields,
+                    headers=headers,
+                    meta={"handle_httpstatus_list": [304]},
                 )
 
-    def parse_document(self, response, **kwargs):
-        try:
-            content = self.html_content(response)
-            # Bit of a hack, oops :)
-            if kwargs["document_type"] == DocumentType.method_agreed:
-                published_date = response.css(
-                    "meta[name='govuk:first-published-at']::attr(content)"
-                ).get()
-                content = f"First published at: {published_date}"
-        except NotSupported:
-            if response.headers.get("Content-Type").decode() == "application/pdf":
-                content = self.pdf_content(response)
-            else:
-                content = ""
+    async def parse_document(self, response, **kwargs):
+        if response.status == 304:
+            # Only asked for conditionally, when the document is fingerprinted
+            self.logger.debug(
+                f"Not modified: {kwargs['document_type']} for {kwargs['reference']}"
+            )
+            if self.fingerprints:
+                self.fingerprints.record(kwargs["reference"], kwargs["document_type"])
+            return
+
+        body_hash = content_hash(response.body)
+        # The last document carries the outcome's last_updated so must still be written
+        if (
+            self.fingerprints
+            and "last_updated" not in kwargs
+            and self.fingerprints.document_unchanged(
+                kwargs["reference"], kwargs["document_type"], body_hash
+            )
+        ):
+            self.logger.debug(
+                f"Skipping unchanged {kwargs['document_type']} for {kwargs['reference']}"
+            )
+            self.fingerprints.record(kwargs["reference"], kwargs["document_type"])
+            return
+
+        content = self.document_content(
+            response, await self.converted_content(response, body_hash), **kwargs
+        )
         yield {
             **kwargs,
             "document_content": content.strip(),
             "document_url": response.url,
+            "fingerprint": self.document_fingerprint(response, body_hash),
+        }
+
+    def document_fingerprint(self, response, body_hash):
+        """The content hash, plus the validators to fetch it conditionally next time."""
+        request = response.request
+        fingerprint = {
+            "content_hash": body_hash,
+            # As linked from the outcome, before any redirects
+            "url": (request.meta.get("redirect_urls") or [request.url])[0]
+            if request
+            else response.url,
         }
+        for field, header in (("etag", "ETag"), ("last_modified", "Last-Modified")):
+            if value := response.headers.get(header):
+                fingerprint[field] = value.decode()
+        return fingerprint
+
+    async def converted_content(self, response, body_hash):
+        """The response body as markdown, from the content cache if it's there.
+
+        Only the conversion is cached, since it depends on nothing but the body.
+        """
+        content = None
+        if self.content_cache:
+            content = await self.content_cache.get(body_hash)
+        if content is None:
+            content = await self.convert(response)
+            if self.content_cache:
+                await self.content_cache.put(body_hash, content)
+        return content
+
+    async def convert(self, response):
+        try:
+            return self.html_content(response)
+        except NotSupported:
+            if response.headers.get("Content-Type").decode() == "application/pdf":
+                return await self.pdf_content(response)
+            return ""
+
+    def document_content(self, response, content, **kwargs):
+        # Bit of a hack, oops :)
+        if kwargs["document_type"] == DocumentType.method_agreed:
+            try:
+                published_date = response.css(
+                    "meta[name='govuk:first-published-at']::attr(content)"
+                ).get()
+            except NotSupported:
+                return content
+            return f"First published at: {published_date}"
+        return content
 
     def html_content(self, response):
+        from markdownify import markdownify
+
         content = response.css("main#content div#contents div.govspeak").get().strip()
         return markdownify(content)
 
-    def pdf_content(self, response):
-        pdf = pymupdf.open(stream=response.body)
-        return pymupdf4llm.to_markdown(pdf)
+    async def pdf_content(self, response):
+        # Converted in the PDF pool so the reactor keeps downloading meanwhile
+        return await self.pdf_pool.to_markdown(response.body)
@@ -0,0 +1,89 @@
+import asyncio
+import gzip
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from opensearchpy.exceptions import NotFoundError
+
+from ..services.opensearch_utils import ensure_index_mapping
+
+# Increment me when document conversion changes, to invalidate cached content
+content_cache_version = 2
+
+content_cache_mapping = {
+    "dynamic": "strict",
+    "properties": {
+        "content": {"type": "text", "index": False},
+    },
+}
+
+
+def cache_key(body_hash: str) -> str:
+    return f"v{content_cache_version}-{body_hash}"
+
+
+class ContentCache(ABC):
+    """Converted document content keyed by the SHA-256 of the raw response body.
+
+    Holds the conversion alone, before any document-type-specific handling, so
+    the same body always has the same entry whatever document it belongs to.
+    """
+
+    @abstractmethod
+    async def get(self, body_hash: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def put(self, body_hash: str, content: str) -> None:
+        pass
+
+
+class LocalContentCache(ContentCache):
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, body_hash: str) -> str:
+        key = cache_key(body_hash)
+        return os.path.join(self.directory, body_hash[:2], f"{key}.md.gz")
+
+    def _read(self, path):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    async def get(self, body_hash):
+        return await asyncio.to_thread(self._read, self.path(body_hash))
+
+    async def put(self, body_hash, content):
+        await asyncio.to_thread(self._write, self.path(body_hash), content)
+
+
+class OpensearchContentCache(ContentCache):
+    def __init__(self, client, index: str):
+        self.client = client
+        self.index = index
+
+    async def ensure_index(self):
+        await ensure_index_mapping(self.client, self.index, content_cache_mapping)
+
+    async def get(self, body_hash):
+        try:
+            res = await self.client.get(index=self.index, id=cache_key(body_hash))
+        except NotFoundError:
+            return None
+        return res["_source"]["content"]
+
+    async def put(self, body_hash, content):
+        await self.client.index(
+            index=self.index, id=cache_key(body_hash), body={"content": content}
+        )
@@ -0,0 +1,136 @@
+import hashlib
+from collections import Counter
+from typing import Iterable, Optional
+
+from opensearchpy import helpers
+
+from ..services.opensearch_utils import ensure_index_mapping, pit_search_after
+
+fingerprint_mapping = {
+    "dynamic": "strict",
+    "properties": {
+        "reference": {"type": "keyword"},
+        # Raw govuk:public-updated-at string, compared verbatim
+        "last_updated": {"type": "keyword"},
+        # document_type -> {content_hash, url, etag, last_modified}
+        "documents": {"type": "object", "enabled": False},
+    },
+}
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class FingerprintIndex:
+    """Compact per-reference record of what was last scraped, so unchanged outcomes
+    and documents can be skipped before downloading or converting them.
+
+    Loaded into memory once per crawl (it's a few hundred bytes per outcome) and
+    written back at the end of the crawl.
+
+    An outcome's last_updated is only recorded once every one of its documents
+    has been stored (see ``expect_outcome``), so an outcome with a document that
+    failed, or that the crawl stopped before reaching, is fetched again next time.
+    """
+
+    def __init__(self, fingerprints: Optional[dict[str, dict]] = None):
+        self.fingerprints = fingerprints or {}
+        self.dirty: set[str] = set()
+        # reference -> (last_updated, document types not yet stored)
+        self.pending: dict[str, tuple[str, Counter]] = {}
+
+    @classmethod
+    async def load(cls, client, index: str) -> "FingerprintIndex":
+        await ensure_index_mapping(client, index, fingerprint_mapping)
+        fingerprints = {}
+        async for hit in pit_search_after(client, index, sort=[{"reference": "asc"}]):
+            fingerprints[hit["_source"]["reference"]] = hit["_source"]
+        return cls(fingerprints)
+
+    def outcome_unchanged(self, reference: str, last_updated: str) -> bool:
+        stored = self.fingerprints.get(reference)
+        return stored is not None and stored.get("last_updated") == last_updated
+
+    def document(self, reference: str, document_type: str) -> Optional[dict]:
+        stored = self.fingerprints.get(reference) or {}
+        return stored.get("documents", {}).get(document_type)
+
+    def conditional_headers(
+        self, reference: str, document_type: str, url: str
+    ) -> dict[str, str]:
+        """Validators for fetching a stored document again, so the server can
+        answer 304 Not Modified rather than send the whole body."""
+        stored = self.document(reference, document_type)
+        if not stored or stored.get("url") != url:
+            return {}
+        headers = {}
+        if stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+        if stored.get("last_modified"):
+            headers["If-Modified-Since"] = stored["last_modified"]
+        return headers
+
+    def document_unchanged(
+        self, reference: str, document_type: str, body_hash: str
+    ) -> bool:
+        stored = self.document(reference, document_type)
+        return stored is not None and stored.get("content_hash") == body_hash
+
+    def expect_outcome(
+        self, reference: str, last_updated: str, document_types: Iterable[str]
+    ):
+        """Record ``last_updated`` for the outcome once a document of each of
+        ``document_types`` has been stored."""
+        remaining = Counter(document_types)
+        if remaining:
+            self.pending[reference] = (last_updated, remaining)
+        else:
+            self._record_last_updated(reference, last_updated)
+
+    def record(
+        self,
+        reference: str,
+        document_type: str,
+        *,
+        document: Optional[dict] = None,
+    ):
+        """Note that a document of the outcome has been stored (or was already)."""
+        if document:
+            self._stored(reference)["documents"][document_type] = document
+            self.dirty.add(reference)
+        if reference not in self.pending:
+            return
+        last_updated, remaining = self.pending[reference]
+        remaining[document_type] -= 1
+        if remaining[document_type] <= 0:
+            del remaining[document_type]
+        if not remaining:
+            del self.pending[reference]
+            self._record_last_updated(reference, last_updated)
+
+    def _stored(self, reference: str) -> dict:
+        return self.fingerprints.setdefault(
+            reference, {"reference": reference, "documents": {}}
+        )
+
+    def _record_last_updated(self, reference: str, last_updated: str):
+        self._stored(reference)["last_updated"] = last_updated
+        self.dirty.add(reference)
+
+    async def save(self, client, index: str):
+        if not self.dirty:
+            return
+        await helpers.async_bulk(
+            client,
+            (
+                {
+                    "_op_type": "index",
+                    "_index": index,
+                    "_id": reference,
+                    "_source": self.fingerprints[reference],
+                }
+                for reference in sorted(self.dirty)
+            ),
+        )
+        self.dirty.clear()
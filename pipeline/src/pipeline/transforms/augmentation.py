@@ -1,38 +1,97 @@
+import functools
+
 from ..types.documents import DocumentType
-from ..services.baml import authenticated_client, large_client, with_retry_client
+from ..services import baml
+from ..services.extraction_cache import ExtractionCache, extraction_key
+from ..services.llm_scheduler import estimate_tokens, get_llm_scheduler
 from .document_classifier import should_get_content, should_skip
+from .prompt_preprocessing import prepare_prompt, preprocessing_enabled
 from ..extractors.date_extractor import extract_date
 from ..types.decisions import DateOnly
 
+# Document types extracted by an LLM, mapped to the BAML output type.
+# The BAML function for each is Extract<output type>.
+llm_extracted_types = {
+    DocumentType.para_35_decision: "Para35Decision",
+    DocumentType.acceptance_decision: "AcceptanceDecision",
+    DocumentType.bargaining_unit_decision: "BargainingUnitDecision",
+    DocumentType.bargaining_decision: "BargainingDecision",
+    DocumentType.form_of_ballot_decision: "FormOfBallotDecision",
+    DocumentType.whether_to_ballot_decision: "WhetherToBallotDecision",
+    DocumentType.validity_decision: "ValidityDecision",
+    DocumentType.recognition_decision: "RecognitionDecision",
+    DocumentType.access_decision_or_dispute: "AccessDecisionOrDispute",
+}
+
+# BAML client names, in the order with_retry_client tries them
+default_client_name = "DefaultClient"
+retry_client_name = "LargeClient"
+
+
+async def get_extracted_data(
+    doc_type_string, content, *, cache: ExtractionCache | None = None
+):
+    document_type = DocumentType[doc_type_string]
+    output_type = llm_extracted_types.get(document_type)
+    if output_type is not None and content and preprocessing_enabled():
+        # The cache is keyed on the prepared prompt, so rule changes invalidate it
+        content = prepare_prompt(document_type, content).content
+    if cache is None or output_type is None or should_skip(document_type):
+        return await _extract_with_retry_client()(doc_type_string, content)
+
+    from baml_client import types as baml_types
+
+    function_name = f"Extract{output_type}"
+    for client_name in (default_client_name, retry_client_name):
+        key = extraction_key(doc_type_string, content, function_name, client_name)
+        cached = await cache.get(key)
+        if cached is not None:
+            return getattr(baml_types, output_type).model_validate(cached)
+
+    used_client = []
+    result = await _extract_with_retry_client()(
+        doc_type_string, content, used_client=used_client
+    )
+    if result is not None:
+        client_name = used_client[-1]
+        await cache.put(
+            extraction_key(doc_type_string, content, function_name, client_name),
+            result.model_dump(mode="json"),
+            function_name=function_name,
+            client_name=client_name,
+        )
+    return result
+
+
+@functools.cache
+def _extract_with_retry_client():
+    # Decorated on first call so the BAML clients aren't built at import
+    return baml.with_retry_client(baml.authenticated_client, baml.large_client)(
+        _get_extracted_data
+    )
+
 
-@with_retry_client(authenticated_client, large_client)
-async def get_extracted_data(doc_type_string, content, *, client):
+async def _get_extracted_data(doc_type_string, content, *, client, used_client=None):
     document_type = DocumentType[doc_type_string]
     if not should_get_content(document_type) or should_skip(document_type):
         return None
+    if document_type in llm_extracted_types:
+        if used_client is not None:
+            used_client.append(
+                retry_client_name
+                if client is baml.get_large_client()
+                else default_client_name
+            )
+        function_name = f"Extract{llm_extracted_types[document_type]}"
+        extract = getattr(client, function_name)
+        return await get_llm_scheduler().submit(
+            lambda: extract(content), tokens=estimate_tokens(content)
+        )
     match document_type:
-        case DocumentType.para_35_decision:
-            return await client.ExtractPara35Decision(content)
-        case DocumentType.acceptance_decision:
-            return await client.ExtractAcceptanceDecision(content)
-        case DocumentType.bargaining_unit_decision:
-            return await client.ExtractBargainingUnitDecision(content)
-        case DocumentType.bargaining_decision:
-            return await client.ExtractBargainingDecision(content)
-        case DocumentType.form_of_ballot_decision:
-            return await client.ExtractFormOfBallotDecision(content)
-        case DocumentType.whether_to_ballot_decision:
-            return await client.ExtractWhetherToBallotDecision(content)
-        case DocumentType.validity_decision:
-            return await client.ExtractValidityDecision(content)
         case DocumentType.case_closure:
             return DateOnly(decision_date=extract_date(content))
-        case DocumentType.recognition_decision:
-            return await client.ExtractRecognitionDecision(content)
         case DocumentType.application_received:
             return DateOnly(decision_date=extract_date(content))
-        case DocumentType.access_decision_or_dispute:
-            return await client.ExtractAccessDecisionOrDispute(content)
         case DocumentType.method_agreed:
             date = extract_date(content)
             if date is None:
@@ -1,4 +1,7 @@
-from transitions import Machine
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from transitions import Machine, MachineError
 
 from .model import EventType, OutcomeState, Event
 
@@ -142,11 +145,58 @@ class InvalidEventError(Exception):
     pass
 
 
-class EventsBuilder(Machine):
+class CompiledTransitions:
+    """The transitions table compiled to a flat (state, event) -> state array.
+
+    Constructing a transitions ``Machine`` builds its states, events and
+    trigger methods afresh each time, which was a large part of indexing an
+    outcome. Lookups here fail the same way as the ``Machine`` built from
+    ``machine_params``.
+    """
+
+    def __init__(self, transitions_list):
+        self.states = tuple(OutcomeState)
+        self.event_types = tuple(EventType)
+        self.state_ordinals = {state: i for i, state in enumerate(self.states)}
+        self.event_ordinals = {event: i for i, event in enumerate(self.event_types)}
+        self.triggerable = {event for event, _, _ in transitions_list}
+        self.table: list[Optional[int]] = [None] * (
+            len(self.states) * len(self.event_types)
+        )
+        for event, source, dest in transitions_list:
+            i = self._position(self.state_ordinals[source], event)
+            # Like Machine, the first matching transition wins
+            if self.table[i] is None:
+                self.table[i] = self.state_ordinals[dest]
+
+    def _position(self, state: int, event: EventType) -> int:
+        return state * len(self.event_types) + self.event_ordinals[event]
+
+    def next_state(self, state: int, event: EventType) -> int:
+        dest = self.table[self._position(state, event)]
+        if dest is None:
+            if event not in self.triggerable:
+                raise AttributeError(f"Do not know event named '{event.value}'.")
+            raise MachineError(
+                f"Can't trigger event {event.value} from state "
+                f"{self.states[state].value}!"
+            )
+        return dest
+
+
+compiled_transitions = CompiledTransitions(transitions)
+
+
+class BaseEventsBuilder(ABC):
+    """Collects an outcome's events, checking each against the state machine."""
+
     def __init__(self):
         self.seen_types = set()
         self.event_list: list[Event] = []
-        Machine.__init__(self, **machine_params)
+
+    @abstractmethod
+    def _transition(self, event_type: EventType):
+        """Move to the state ``event_type`` leads to, or raise if it can't happen."""
 
     def add_event(
         self,
@@ -164,7 +214,7 @@ class EventsBuilder(Machine):
             return
 
         if is_state_changing(event.type):
-            self.trigger(event.type.value)
+            self._transition(event.type)
 
         self.seen_types.add(event.type)
         self.event_list.append(event)
@@ -188,3 +238,32 @@ class EventsBuilder(Machine):
 
     def labelled_state(self):
         return OutcomeState(self.state)
+
+
+class TransitionsEventsBuilder(BaseEventsBuilder, Machine):
+    """Events builder on a transitions ``Machine``, kept as the reference for
+    ``EventsBuilder``.
+    """
+
+    def __init__(self):
+        BaseEventsBuilder.__init__(self)
+        Machine.__init__(self, **machine_params)
+
+    def _transition(self, event_type: EventType):
+        self.trigger(event_type.value)
+
+
+class EventsBuilder(BaseEventsBuilder):
+    def __init__(self):
+        super().__init__()
+        self._state = compiled_transitions.state_ordinals[OutcomeState.Initial]
+
+    def _transition(self, event_type: EventType):
+        self._state = compiled_transitions.next_state(self._state, event_type)
+
+    @property
+    def state(self) -> str:
+        return compiled_transitions.states[self._state].value
+
+    def labelled_state(self):
+        return compiled_transitions.states[self._state]
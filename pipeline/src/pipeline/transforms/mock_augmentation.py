@@ -12,7 +12,7 @@ def mock(model):
     return ModelFactory.create_factory(model=model).build()
 
 
-async def get_extracted_data(doc_type_string, content):
+async def get_extracted_data(doc_type_string, content, *, cache=None):
     document_type = DocumentType[doc_type_string]
     if not should_get_content(document_type) or should_skip(document_type):
         return None
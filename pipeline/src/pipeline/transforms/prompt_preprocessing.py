@@ -0,0 +1,215 @@
+"""Trims decision documents before they're sent to the LLM extractors.
+
+Converted PDFs carry page furniture (page separators, page numbers, running
+headers and footers repeated on every page) and many decisions end with
+annexes - attendee lists, or the full text of the specified bargaining
+method - that no extractor reads. Removing them is most of the token spend
+on long documents.
+"""
+
+import logging
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from ..services.llm_scheduler import estimate_tokens
+from ..types.documents import DocumentType
+
+# The line pymupdf4llm emits between pages
+_page_break = re.compile(r"^\s*-{3,}\s*$")
+# A page number, only ever looked for at the top or bottom of a page
+_page_number = re.compile(r"^\s*(page\s+)?\d{1,3}(\s+of\s+\d{1,3})?\s*$", re.IGNORECASE)
+_heading_markup = re.compile(r"^[#*_\s]+|[*_\s]+$")
+
+ATTENDEES = r"names of (those|people|persons) (who )?(were )?(present|attend)"
+ANNEX = r"(annex|appendix)\b"
+
+
+@dataclass(frozen=True)
+class PromptRules:
+    # Heading patterns: a matching heading and everything after it is dropped
+    drop_sections: tuple[str, ...] = (ATTENDEES,)
+    # Documents still longer than this keep their head and tail only. Lossy,
+    # so only set for document types whose extracted fields all sit there
+    max_tokens: Optional[int] = None
+
+
+default_rules = PromptRules()
+
+prompt_rules: dict[DocumentType, PromptRules] = {
+    # The specified method of collective bargaining is appended in full
+    # The request for the CAC's help is in the introduction and the decision
+    # date at the end; the middle is the parties' submissions on the method
+    DocumentType.bargaining_decision: PromptRules(
+        drop_sections=(ATTENDEES, ANNEX), max_tokens=20_000
+    ),
+    DocumentType.recognition_decision: PromptRules(drop_sections=(ATTENDEES, ANNEX)),
+    DocumentType.form_of_ballot_decision: PromptRules(drop_sections=(ATTENDEES, ANNEX)),
+    DocumentType.whether_to_ballot_decision: PromptRules(
+        drop_sections=(ATTENDEES, ANNEX)
+    ),
+    # Bargaining unit locations are sometimes only listed in an annex, so the
+    # acceptance, bargaining unit and validity decisions keep theirs
+}
+
+
+@dataclass(frozen=True)
+class PreparedPrompt:
+    content: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+@dataclass
+class PromptSavings:
+    documents: int = 0
+    original_tokens: int = 0
+    tokens: int = 0
+    by_document_type: Counter = field(default_factory=Counter)
+
+    def add(self, document_type: DocumentType, prepared: PreparedPrompt):
+        self.documents += 1
+        self.original_tokens += prepared.original_tokens
+        self.tokens += prepared.tokens
+        self.by_document_type[document_type.value] += prepared.saved_tokens
+
+    def report(self) -> str:
+        saved = self.original_tokens - self.tokens
+        percent = 100 * saved / self.original_tokens if self.original_tokens else 0
+        return (
+            f"Prompt preprocessing saved ~{saved} of {self.original_tokens} tokens "
+            f"({percent:.1f}%) over {self.documents} documents"
+        )
+
+
+# Running totals for this process
+prompt_savings = PromptSavings()
+
+
+def preprocessing_enabled() -> bool:
+    return os.getenv("PROMPT_PREPROCESSING", "true").lower() not in ("0", "false")
+
+
+def _heading_text(line: str) -> str:
+    return _heading_markup.sub("", line).strip().lower()
+
+
+def _page_edges(page: list[str], edge_lines: int) -> set[int]:
+    """Indices of the first and last ``edge_lines`` non-blank lines of a page."""
+    non_blank = [i for i, line in enumerate(page) if line.strip()]
+    return set(non_blank[:edge_lines] + non_blank[-edge_lines:])
+
+
+def strip_page_furniture(
+    content: str, min_repeats: int = 3, edge_lines: int = 2
+) -> str:
+    """Drop page breaks, and the page numbers and running headers or footers
+    at the top and bottom of each page.
+
+    Only lines at a page's edges are candidates, since numbers and repeated
+    short lines in the body (worker counts, ballot figures, table cells) are
+    content. Documents without page breaks are left as they are.
+    """
+    pages = [[]]
+    for line in content.splitlines():
+        if _page_break.match(line):
+            pages.append([])
+        else:
+            pages[-1].append(line)
+    if len(pages) == 1:
+        return content
+
+    edges = [_page_edges(page, edge_lines) for page in pages]
+    # Short lines at the edge of many pages are running headers or footers
+    counts = Counter(
+        line
+        for page, page_edges in zip(pages, edges)
+        for line in {page[i].strip() for i in page_edges}
+        if len(line) <= 80
+    )
+    repeated = {line for line, count in counts.items() if count >= min_repeats}
+
+    def is_furniture(line: str) -> bool:
+        if line.lstrip().startswith("|"):
+            return False  # Table rows legitimately repeat
+        return bool(_page_number.match(line)) or line.strip() in repeated
+
+    kept = [
+        line
+        for page, page_edges in zip(pages, edges)
+        for i, line in enumerate(page)
+        if i not in page_edges or not is_furniture(line)
+    ]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+
+
+def drop_sections(content: str, patterns: tuple[str, ...]) -> str:
+    """Cut from the first heading-like line matching one of `patterns`.
+
+    Only considers the second half of the document, so the parties and
+    introduction (which may refer to an annex) are never dropped.
+    """
+    if not patterns:
+        return content
+    heading = re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+    lines = content.splitlines()
+    offset = 0
+    for i, line in enumerate(lines):
+        if offset >= len(content) / 2:
+            text = _heading_text(line)
+            if text and len(text) <= 100 and heading.match(text):
+                return "\n".join(lines[:i]).rstrip()
+        offset += len(line) + 1
+    return content
+
+
+def truncate_middle(content: str, max_tokens: int) -> str:
+    """Keep the head (parties, application) and tail (decision, date) of a
+    document that is still too long, dropping whole paragraphs from the middle.
+    """
+    if estimate_tokens(content) <= max_tokens:
+        return content
+    paragraphs = content.split("\n\n")
+    head_budget = max_tokens * 2 // 5
+    tail_budget = max_tokens - head_budget
+    head, tail = [], []
+    used = 0
+    for paragraph in paragraphs:
+        used += estimate_tokens(paragraph)
+        if used > head_budget:
+            break
+        head.append(paragraph)
+    used = 0
+    for paragraph in reversed(paragraphs[len(head) :]):
+        used += estimate_tokens(paragraph)
+        if used > tail_budget:
+            break
+        tail.insert(0, paragraph)
+    omitted = len(paragraphs) - len(head) - len(tail)
+    return "\n\n".join([*head, f"[... {omitted} paragraphs omitted ...]", *tail])
+
+
+def prepare_prompt(document_type: DocumentType, content: str) -> PreparedPrompt:
+    rules = prompt_rules.get(document_type, default_rules)
+    prepared = strip_page_furniture(content)
+    prepared = drop_sections(prepared, rules.drop_sections)
+    if rules.max_tokens:
+        prepared = truncate_middle(prepared, rules.max_tokens)
+
+    result = PreparedPrompt(
+        content=prepared,
+        original_tokens=estimate_tokens(content),
+        tokens=estimate_tokens(prepared),
+    )
+    prompt_savings.add(document_type, result)
+    logging.info(
+        f"Prepared {document_type.value} prompt: ~{result.tokens} tokens "
+        f"(saved ~{result.saved_tokens})"
+    )
+    return result
@@ -8,7 +8,9 @@ from pydantic import BaseModel
 from pipeline.services.opensearch_utils import (
     ensure_index_mapping,
     get_mapping_from_path,
+    invalidate_index_mapping,
 )
+from pipeline.spider.fingerprints import fingerprint_mapping
 from pipeline.types.decisions import decision_raw_mapping, decision_augmented_mapping
 
 
@@ -48,6 +50,8 @@ async def load_docs(opensearch_client, index_name, docs=[]):
         mapping = {"dynamic": "strict", "properties": decision_augmented_mapping}
     elif index_name.startswith("outcomes-indexed"):
         mapping = get_mapping_from_path("./index_mappings/outcomes_indexed.json")
+    elif index_name.startswith("outcomes-fingerprints"):
+        mapping = fingerprint_mapping
     elif index_name.startswith("disambiguated-companies"):
         mapping = get_mapping_from_path("./index_mappings/disambiguated_companies.json")
     else:
@@ -88,6 +92,7 @@ def indexer(opensearch_client):
                 exists = await opensearch_client.indices.exists(index=index_name)
                 if exists:
                     await opensearch_client.indices.delete(index=index_name)
+                invalidate_index_mapping(index_name)
             except Exception as e:
                 # Log but don't raise - cleanup failures shouldn't break tests
                 print(f"Warning: Failed to delete index {index_name}: {e}")
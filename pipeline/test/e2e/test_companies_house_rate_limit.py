@@ -0,0 +1,39 @@
+import asyncio
+
+import httpx
+import pytest
+
+from company_disambiguator.companies_house import CompaniesHouseClient
+from company_disambiguator.rate_limit import FileLockTokenBucket
+
+FAKE_CH = "http://localhost:3001/ch"
+
+
+@pytest.fixture
+async def small_quota():
+    async with httpx.AsyncClient() as client:
+        await client.post(
+            f"{FAKE_CH}/ratelimit", json={"limit": 20, "window_seconds": 2}
+        )
+        yield client
+        await client.post(f"{FAKE_CH}/ratelimit", json={})
+
+
+async def test_concurrent_clients_share_quota(small_quota, tmp_path):
+    bucket_path = str(tmp_path / "companies-house.bucket")
+
+    async def lambda_run():
+        async with CompaniesHouseClient(
+            api_key="key",
+            base_url=FAKE_CH,
+            # Burst plus refill stays within the fake API's fixed window
+            rate_limit=FileLockTokenBucket(bucket_path, limit=8, window_seconds=2),
+        ) as client:
+            for _ in range(3):
+                results = await client.search(q="Wincanton", items_per_page=1)
+                assert results[0]["company_number"] == "04178808"
+
+    await asyncio.gather(*(lambda_run() for _ in range(4)))
+
+    stats = (await small_quota.get(f"{FAKE_CH}/ratelimit")).json()
+    assert stats["rejected"] == 0
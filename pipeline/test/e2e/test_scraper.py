@@ -3,7 +3,11 @@ from . import invoke_lambda, indexer
 
 async def test_scraper_normal(opensearch_client):
     index_for_test = indexer(opensearch_client)
-    async with index_for_test("outcomes-raw") as raw:
+    async with (
+        index_for_test("outcomes-raw") as raw,
+        # Created by the scraper; cleaned up with the raw index
+        index_for_test("outcomes-fingerprints", suffix=raw.suffix),
+    ):
         result = await invoke_lambda(
             "scraper", {"limitItems": 1, "indexSuffix": raw.suffix}
         )
@@ -1,6 +1,64 @@
 import type { Context } from "hono";
 
+// Simulates the Companies House fixed-window rate limit (600 per 5 minutes by
+// default), shared by every client - reconfigurable via POST /ch/ratelimit
+const rateLimit = {
+  limit: 600,
+  windowSeconds: 300,
+  windowStart: Date.now(),
+  count: 0,
+  rejected: 0,
+};
+
+function rateLimited(context: Context) {
+  const now = Date.now();
+  if (now - rateLimit.windowStart >= rateLimit.windowSeconds * 1000) {
+    rateLimit.windowStart = now;
+    rateLimit.count = 0;
+  }
+  rateLimit.count += 1;
+  const reset = Math.ceil(
+    (rateLimit.windowStart + rateLimit.windowSeconds * 1000) / 1000
+  );
+  context.header("X-Ratelimit-Limit", String(rateLimit.limit));
+  context.header(
+    "X-Ratelimit-Remain",
+    String(Math.max(0, rateLimit.limit - rateLimit.count))
+  );
+  context.header("X-Ratelimit-Reset", String(reset));
+  context.header("X-Ratelimit-Window", `${rateLimit.windowSeconds}s`);
+  if (rateLimit.count <= rateLimit.limit) {
+    return null;
+  }
+  rateLimit.rejected += 1;
+  context.header("Retry-After", String(Math.max(1, reset - Math.floor(now / 1000))));
+  return context.json({ error: "Too Many Requests" }, 429);
+}
+
+export async function configureRateLimit(context: Context) {
+  const body = await context.req.json();
+  rateLimit.limit = body.limit ?? 600;
+  rateLimit.windowSeconds = body.window_seconds ?? 300;
+  rateLimit.windowStart = Date.now();
+  rateLimit.count = 0;
+  rateLimit.rejected = 0;
+  return context.json({ ok: true });
+}
+
+export function rateLimitStats(context: Context) {
+  return context.json({
+    limit: rateLimit.limit,
+    window_seconds: rateLimit.windowSeconds,
+    count: rateLimit.count,
+    rejected: rateLimit.rejected,
+  });
+}
+
 export function searchCompanies(context: Context) {
+  const limited = rateLimited(context);
+  if (limited) {
+    return limited;
+  }
   const query = context.req.query();
 
   let items: any[] = [];
@@ -41,6 +99,10 @@ export function searchCompanies(context: Context) {
 }
 
 export function getCompanyProfile(context: Context) {
+  const limited = rateLimited(context);
+  if (limited) {
+    return limited;
+  }
   const companyNumber = context.req.param("company_number");
 
   if (!companyNumber) {
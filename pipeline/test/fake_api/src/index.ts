@@ -2,7 +2,12 @@ import { serve } from "@hono/node-server";
 import { Hono } from "hono";
 import outcomes from "./outcomes.js";
 import { chatCompletions } from "./llm.js";
-import { searchCompanies, getCompanyProfile } from "./companies_house.js";
+import {
+  searchCompanies,
+  getCompanyProfile,
+  configureRateLimit,
+  rateLimitStats,
+} from "./companies_house.js";
 
 const app = new Hono();
 
@@ -10,6 +15,8 @@ app.get("/cac/api/outcomes", outcomes);
 app.post("/llm/chat/completions", chatCompletions);
 app.get("/ch/search/companies", searchCompanies);
 app.get("/ch/company/:company_number", getCompanyProfile);
+app.post("/ch/ratelimit", configureRateLimit);
+app.get("/ch/ratelimit", rateLimitStats);
 
 serve(
   {
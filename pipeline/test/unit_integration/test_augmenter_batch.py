@@ -0,0 +1,90 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from opensearchpy.serializer import JSONSerializer
+
+import lambdas
+from lambdas import RefBatchEvent, augmenter
+
+
+class FakeOpensearch:
+    """mget answers with the concrete index, as OpenSearch does for an alias."""
+
+    def __init__(self, sources, concrete_index):
+        self.transport = SimpleNamespace(serializer=JSONSerializer())
+        self.sources = sources
+        self.concrete_index = concrete_index
+        self.written = []
+
+    def _get(self, id):
+        doc = {"_index": self.concrete_index, "_id": id, "found": id in self.sources}
+        if doc["found"]:
+            doc["_source"] = self.sources[id]
+        return doc
+
+    async def mget(self, body):
+        return {"docs": [self._get(doc["_id"]) for doc in body["docs"]]}
+
+    async def bulk(self, body, **kwargs):
+        lines = body if isinstance(body, list) else body.splitlines()
+        lines = [json.loads(line) for line in lines]
+        ids = [line["update"]["_id"] for line in lines[::2]]
+        self.written += ids
+        return {
+            "errors": False,
+            "items": [
+                {"update": {"_id": id, "status": 200, "result": "updated"}}
+                for id in ids
+            ],
+        }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeOpensearch(
+        {id: {"id": id} for id in ("good-1", "broken", "good-2")},
+        concrete_index="outcomes-raw-1012-v2",
+    )
+
+    async def ensure_index_mapping(*args):
+        pass
+
+    async def augment_doc(doc):
+        if doc.id == "broken":
+            raise RuntimeError("LLM fell over")
+        return {"id": doc.id, "document_type": "recognition_decision"}
+
+    def validate(source):
+        return SimpleNamespace(id=source["id"])
+
+    monkeypatch.setattr(lambdas, "get_client", lambda: client)
+    monkeypatch.setattr(augmenter, "get_client", lambda: client)
+    monkeypatch.setattr(lambdas, "ensure_index_mapping", ensure_index_mapping)
+    monkeypatch.setattr(augmenter, "augment_doc", augment_doc)
+    monkeypatch.setattr(augmenter.DecisionRaw, "model_validate", validate)
+    return client
+
+
+async def test_batch_keeps_successes_when_one_extraction_fails(client):
+    event = RefBatchEvent(
+        refs=[
+            {"_id": id, "_index": "outcomes-raw-1012"}
+            for id in ("good-1", "broken", "missing", "good-2")
+        ]
+    )
+
+    good_1, broken, missing, good_2 = await augmenter.process_batch(event)
+
+    assert client.written == ["good-1", "good-2"]
+    assert good_1["ref"] == {
+        "_id": "good-1",
+        "_index": "outcomes-augmented-1012",
+        "passthrough": False,
+    }
+    assert good_2["ref"]["_id"] == "good-2"
+    assert broken == {"error": "RuntimeError", "cause": "LLM fell over"}
+    assert missing == {
+        "error": "ValueError",
+        "cause": "Decision not found: outcomes-raw-1012/missing",
+    }
@@ -0,0 +1,132 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from opensearchpy.serializer import JSONSerializer
+
+from baml_client import types as baml_types
+from company_disambiguator.model import DisambiguateCompanyRequest, StoredResult
+from company_disambiguator.pipeline import (
+    bulk_upsert_stored_results,
+    disambiguate_companies,
+)
+from pipeline.services import baml
+
+
+def make_request(name, bargaining_unit="Warehouse operatives"):
+    return DisambiguateCompanyRequest(
+        name=name,
+        unions=["GMB"],
+        application_date="2024-01-01",
+        bargaining_unit=bargaining_unit,
+    )
+
+
+class FakeCompaniesHouse:
+    def __init__(self):
+        self.searches = []
+
+    async def search(self, q, items_per_page=20):
+        self.searches.append(q)
+        await asyncio.sleep(0.01)
+        return [{"title": q, "company_number": "01234567", "sic_codes": ["47910"]}]
+
+
+class FakeBamlClient:
+    def __init__(self):
+        self.calls = []
+
+    async def DisambiguateCompany(self, name, candidates, bargaining_unit, **kwargs):
+        self.calls.append((name, bargaining_unit))
+        if name == "Broken":
+            raise RuntimeError("LLM fell over")
+        return baml_types.IdentifiedCompany(
+            type="identified", company_number="01234567", reason="?"
+        )
+
+
+@pytest.fixture
+def fake_baml(monkeypatch):
+    client = FakeBamlClient()
+    monkeypatch.setattr(baml, "_client_overrides", {})
+    baml.override_clients(authenticated_client=client, large_client=client)
+    return client
+
+
+async def test_bulk_disambiguation_shares_work(fake_baml):
+    companies_house = FakeCompaniesHouse()
+    requests = [
+        make_request("Acme Ltd"),
+        make_request("Other Ltd"),
+        make_request("Acme Ltd"),
+        make_request(" ACME  ltd", bargaining_unit="Drivers"),
+    ]
+
+    results = await disambiguate_companies(requests, companies_house)
+
+    assert [result.input for result in results] == requests
+    assert results[0] is results[2]
+    assert all(
+        result.disambiguated_company.root.company_number == "01234567"
+        for result in results
+    )
+    # One search per normalized name, one LLM call per distinct request
+    assert sorted(companies_house.searches) == ["Acme Ltd", "Other Ltd"]
+    assert len(fake_baml.calls) == 3
+
+
+async def test_bulk_disambiguation_isolates_failures(fake_baml):
+    results = await disambiguate_companies(
+        [make_request("Broken"), make_request("Acme Ltd")], FakeCompaniesHouse()
+    )
+
+    assert isinstance(results[0], RuntimeError)
+    assert isinstance(results[1], StoredResult)
+
+
+class FakeOpensearch:
+    def __init__(self, reject=()):
+        self.bulk_calls = []
+        self.reject = set(reject)
+        self.transport = SimpleNamespace(serializer=JSONSerializer())
+
+    async def bulk(self, body, **kwargs):
+        self.bulk_calls.append((body, kwargs))
+        ids = [json.loads(line)["update"]["_id"] for line in body.splitlines()[::2]]
+        items = [
+            {"update": {"_id": id, "status": 400, "error": {"type": "mapper"}}}
+            if id in self.reject
+            else {"update": {"_id": id, "status": 200, "result": "created"}}
+            for id in ids
+        ]
+        return {"errors": bool(self.reject & set(ids)), "items": items}
+
+
+async def test_bulk_upsert_is_one_request(fake_baml):
+    results = await disambiguate_companies(
+        [make_request("Acme Ltd"), make_request("Other Ltd")], FakeCompaniesHouse()
+    )
+    client = FakeOpensearch()
+
+    await bulk_upsert_stored_results(client, "disambiguated-companies", results)
+
+    assert len(client.bulk_calls) == 1
+    body, kwargs = client.bulk_calls[0]
+    assert body.count('"doc_as_upsert":true') == 2
+    assert kwargs["refresh"] == "wait_for"
+
+
+async def test_bulk_upsert_reports_rejected_documents(fake_baml):
+    results = await disambiguate_companies(
+        [make_request("Acme Ltd"), make_request("Other Ltd")], FakeCompaniesHouse()
+    )
+    client = FakeOpensearch(reject={results[0].id})
+
+    written = await bulk_upsert_stored_results(
+        client, "disambiguated-companies", results
+    )
+
+    assert isinstance(written[0], ValueError)
+    assert results[0].id in str(written[0])
+    assert written[1] is results[1]
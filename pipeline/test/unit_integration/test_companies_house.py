@@ -0,0 +1,116 @@
+import asyncio
+import http.server
+import json
+import threading
+
+import httpx
+
+from company_disambiguator.companies_house import CompaniesHouseClient
+
+
+def handler(requests):
+    def handle(request: httpx.Request):
+        requests.append(request.url.path)
+        if request.url.path == "/search/companies":
+            return httpx.Response(
+                200,
+                json={
+                    "items": [
+                        {"title": "ACME LTD", "company_number": "01234567"},
+                        {"title": "ACME GROUP", "company_number": "07654321"},
+                    ]
+                },
+            )
+        return httpx.Response(200, json={"sic_codes": ["62020"], "extra": "dropped"})
+
+    return handle
+
+
+async def test_search_reuses_pooled_client_and_batcher():
+    requests = []
+    async with CompaniesHouseClient(
+        api_key="key",
+        base_url="https://ch.example",
+        transport=httpx.MockTransport(handler(requests)),
+    ) as client:
+        first = await client.search(q="acme", items_per_page=2)
+        http_client, batcher = client._session()
+        second = await client.search(q="acme", items_per_page=2)
+        assert client._session() == (http_client, batcher)
+
+    assert first == second
+    assert first[0]["sic_codes"] == ["62020"]
+    assert "extra" not in first[0]
+    assert sorted(requests) == sorted(
+        ["/search/companies", "/company/01234567", "/company/07654321"] * 2
+    )
+    assert http_client.is_closed
+    assert client._http_client is None
+
+
+def test_session_left_on_an_idle_loop_is_closed_there():
+    client = CompaniesHouseClient(
+        api_key="key",
+        base_url="https://ch.example",
+        transport=httpx.MockTransport(handler([])),
+    )
+    old_loop = asyncio.new_event_loop()
+    old_loop.run_until_complete(client.search(q="acme", items_per_page=2))
+    old_http_client = client._http_client
+
+    asyncio.run(client.search(q="acme", items_per_page=2))
+
+    assert old_http_client.is_closed
+    assert client._http_client is not old_http_client
+    asyncio.run(client.aclose())
+    old_loop.close()
+
+
+class CompaniesHouseHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    closed = None
+
+    def do_GET(self):
+        if self.path.startswith("/search/companies"):
+            body = {"items": [{"title": "ACME LTD", "company_number": "01234567"}]}
+        else:
+            body = {"sic_codes": ["62020"]}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def finish(self):
+        super().finish()
+        self.closed.release()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_connections_left_on_a_closed_loop_are_shut_down():
+    closed = threading.Semaphore(0)
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        type("Handler", (CompaniesHouseHandler,), {"closed": closed}),
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = CompaniesHouseClient(
+        api_key="key", base_url=f"http://127.0.0.1:{server.server_address[1]}"
+    )
+    try:
+        asyncio.run(client.search(q="acme", items_per_page=1))
+        old_connections = len(client._http_client._transport._pool.connections)
+        assert old_connections > 0
+        assert not closed.acquire(timeout=0.1)
+
+        asyncio.run(client.search(q="acme", items_per_page=1))
+
+        for _ in range(old_connections):
+            assert closed.acquire(timeout=5)
+        asyncio.run(client.aclose())
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,63 @@
+import pytest
+
+from pipeline.spider import content_cache
+from pipeline.spider.content_cache import LocalContentCache
+from pipeline.spider.fingerprints import content_hash
+
+
+@pytest.mark.asyncio
+async def test_local_content_cache_round_trip(tmp_path):
+    cache = LocalContentCache(str(tmp_path))
+    body_hash = content_hash(b"%PDF-1.7 some decision")
+
+    assert await cache.get(body_hash) is None
+    await cache.put(body_hash, "# Decision\n\nSome content")
+    assert await cache.get(body_hash) == "# Decision\n\nSome content"
+
+
+@pytest.mark.asyncio
+async def test_local_content_cache_is_versioned(tmp_path, monkeypatch):
+    cache = LocalContentCache(str(tmp_path))
+    body_hash = content_hash(b"<html>decision</html>")
+    await cache.put(body_hash, "old conversion")
+
+    monkeypatch.setattr(
+        content_cache, "content_cache_version", content_cache.content_cache_version + 1
+    )
+    assert await cache.get(body_hash) is None
+
+
+@pytest.mark.asyncio
+async def test_cached_content_is_independent_of_document_type(tmp_path):
+    from scrapy.http import HtmlResponse
+
+    from pipeline.spider.updated_outcomes import UpdatedOutcomesSpider
+    from pipeline.types.documents import DocumentType
+
+    spider = UpdatedOutcomesSpider()
+    spider.content_cache = LocalContentCache(str(tmp_path))
+    response = HtmlResponse(
+        url="https://www.gov.uk/government/publications/some-decision",
+        body=b"""<html><head>
+        <meta name="govuk:first-published-at" content="2024-02-01T10:00:00+00:00">
+        </head><body><main id="content"><div id="contents">
+        <div class="govspeak"><p>The parties agreed a method</p></div>
+        </div></main></body></html>""",
+        encoding="utf-8",
+    )
+
+    async def document_content(document_type):
+        [item] = [
+            item
+            async for item in spider.parse_document(
+                response, reference="TUR1/1234(2024)", document_type=document_type
+            )
+        ]
+        return item["document_content"]
+
+    assert await document_content(DocumentType.method_agreed) == (
+        "First published at: 2024-02-01T10:00:00+00:00"
+    )
+    assert await document_content(DocumentType.recognition_decision) == (
+        "The parties agreed a method"
+    )
@@ -1,13 +1,44 @@
 import pytest
 from datetime import datetime
 
+from pipeline.transforms import events
 from pipeline.transforms.events import events_from_outcome
+from pipeline.transforms.events_machine import EventsBuilder, TransitionsEventsBuilder
 from pipeline.transforms.model import EventType
 from pipeline.transforms.document_classifier import DocumentType
 from pipeline.types.outcome import Outcome, OutcomeEntities
 from baml_client import types as baml_types
 
 
+class ParityEventsBuilder(EventsBuilder):
+    """Runs the transitions Machine alongside the compiled table, failing if
+    they ever disagree."""
+
+    def __init__(self):
+        super().__init__()
+        self.reference = TransitionsEventsBuilder()
+
+    def add_event(self, event):
+        try:
+            self.reference.add_event(event)
+            expected = None
+        except Exception as e:
+            expected = e
+        try:
+            super().add_event(event)
+        except Exception as e:
+            assert (type(e), str(e)) == (type(expected), str(expected))
+            raise
+        assert expected is None
+        assert self.state == self.reference.state
+        assert self.dump_events() == self.reference.dump_events()
+
+
+@pytest.fixture(autouse=True)
+def engine_parity(monkeypatch):
+    monkeypatch.setattr(events, "EventsBuilder", ParityEventsBuilder)
+
+
 def create_outcome(
     id: str,
     last_updated: str,
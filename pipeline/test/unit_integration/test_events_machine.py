@@ -0,0 +1,52 @@
+import pytest
+from transitions import MachineError
+
+from pipeline.transforms.events_machine import (
+    EventsBuilder,
+    TransitionsEventsBuilder,
+    compiled_transitions,
+)
+from pipeline.transforms.model import EventType, OutcomeState
+
+
+def outcome_of(trigger):
+    try:
+        return trigger()
+    except (MachineError, AttributeError) as e:
+        return type(e), str(e)
+
+
+@pytest.mark.parametrize("state", list(OutcomeState))
+def test_compiled_table_matches_machine(state):
+    for event_type in EventType:
+        machine = TransitionsEventsBuilder()
+        machine.set_state(state.value)
+        expected = outcome_of(
+            lambda machine=machine, event_type=event_type: (
+                machine.trigger(event_type.value) and machine.state
+            )
+        )
+
+        actual = outcome_of(
+            lambda event_type=event_type: (
+                compiled_transitions.states[
+                    compiled_transitions.next_state(
+                        compiled_transitions.state_ordinals[state], event_type
+                    )
+                ].value
+            )
+        )
+
+        assert actual == expected, (state, event_type)
+
+
+def test_builder_state():
+    builder = EventsBuilder()
+    assert builder.state == OutcomeState.Initial.value
+    builder._transition(EventType.ApplicationReceived)
+    builder._transition(EventType.ApplicationAccepted)
+    assert builder.labelled_state() is OutcomeState.PendingRecognitionDecision
+
+    with pytest.raises(MachineError):
+        builder._transition(EventType.MethodAgreed)
+    assert builder.labelled_state() is OutcomeState.PendingRecognitionDecision
@@ -0,0 +1,58 @@
+import pytest
+
+from baml_client import types as baml_types
+from pipeline.services import extraction_cache
+from pipeline.services.extraction_cache import LocalExtractionCache, extraction_key
+from pipeline.transforms import augmentation
+from pipeline.transforms.mock_augmentation import mock
+
+content = "The CAC has decided to accept the application."
+
+
+class FakeBamlClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def ExtractAcceptanceDecision(self, document):
+        self.calls += 1
+        return mock(baml_types.AcceptanceDecision)
+
+
+def test_extraction_key_depends_on_baml_src(monkeypatch):
+    args = (
+        "acceptance_decision",
+        content,
+        "ExtractAcceptanceDecision",
+        "DefaultClient",
+    )
+    key = extraction_key(*args)
+    assert key != extraction_key(*args[:3], "LargeClient")
+    assert key != extraction_key(args[0], content + ".", *args[2:])
+
+    monkeypatch.setattr(extraction_cache, "baml_src_hash", lambda: "edited")
+    assert key != extraction_key(*args)
+
+
+@pytest.mark.asyncio
+async def test_cached_extraction_skips_llm(tmp_path, monkeypatch):
+    fake_client = FakeBamlClient()
+
+    async def extract(doc_type_string, content, **kwargs):
+        return await augmentation._get_extracted_data(
+            doc_type_string, content, client=fake_client, **kwargs
+        )
+
+    monkeypatch.setattr(augmentation, "_extract_with_retry_client", lambda: extract)
+    monkeypatch.setattr(augmentation.baml, "get_large_client", lambda: None)
+    cache = LocalExtractionCache(str(tmp_path))
+
+    first = await augmentation.get_extracted_data(
+        "acceptance_decision", content, cache=cache
+    )
+    second = await augmentation.get_extracted_data(
+        "acceptance_decision", content, cache=cache
+    )
+
+    assert fake_client.calls == 1
+    assert second == first
+    assert isinstance(second, baml_types.AcceptanceDecision)
@@ -0,0 +1,181 @@
+import pytest
+from scrapy.http import HtmlResponse, Response
+from scrapy.settings import Settings
+from scrapy.spidermiddlewares.httperror import HttpErrorMiddleware
+
+from pipeline.spider.fingerprints import FingerprintIndex, content_hash
+from pipeline.spider.updated_outcomes import UpdatedOutcomesSpider
+
+
+def test_outcome_unchanged_only_after_every_document_stored():
+    fingerprints = FingerprintIndex()
+    fingerprints.expect_outcome(
+        "TUR1/1234(2024)",
+        "2024-02-01T10:00:00+00:00",
+        ["acceptance_decision", "recognition_decision"],
+    )
+    fingerprints.record(
+        "TUR1/1234(2024)",
+        "acceptance_decision",
+        document={"content_hash": content_hash(b"pdf")},
+    )
+    assert not fingerprints.outcome_unchanged(
+        "TUR1/1234(2024)", "2024-02-01T10:00:00+00:00"
+    )
+
+    fingerprints.record("TUR1/1234(2024)", "recognition_decision")
+    assert fingerprints.outcome_unchanged(
+        "TUR1/1234(2024)", "2024-02-01T10:00:00+00:00"
+    )
+    assert not fingerprints.outcome_unchanged(
+        "TUR1/1234(2024)", "2024-03-01T10:00:00+00:00"
+    )
+    assert fingerprints.dirty == {"TUR1/1234(2024)"}
+    assert not fingerprints.pending
+
+
+def test_outcome_with_a_failed_document_is_not_recorded():
+    fingerprints = FingerprintIndex()
+    fingerprints.expect_outcome(
+        "TUR1/1234(2024)",
+        "2024-02-01T10:00:00+00:00",
+        ["acceptance_decision", "acceptance_decision", "recognition_decision"],
+    )
+    # One of the two acceptance decisions and the recognition decision stored;
+    # the other acceptance decision failed
+    fingerprints.record("TUR1/1234(2024)", "acceptance_decision")
+    fingerprints.record("TUR1/1234(2024)", "recognition_decision")
+
+    assert not fingerprints.outcome_unchanged(
+        "TUR1/1234(2024)", "2024-02-01T10:00:00+00:00"
+    )
+    assert "last_updated" not in fingerprints.fingerprints.get("TUR1/1234(2024)", {})
+
+
+def test_document_unchanged_compares_content_hash():
+    fingerprints = FingerprintIndex(
+        {
+            "TUR1/1234(2024)": {
+                "reference": "TUR1/1234(2024)",
+                "documents": {
+                    "acceptance_decision": {"content_hash": content_hash(b"v1")}
+                },
+            }
+        }
+    )
+
+    assert fingerprints.document_unchanged(
+        "TUR1/1234(2024)", "acceptance_decision", content_hash(b"v1")
+    )
+    assert not fingerprints.document_unchanged(
+        "TUR1/1234(2024)", "acceptance_decision", content_hash(b"v2")
+    )
+    assert not fingerprints.document_unchanged(
+        "TUR1/1234(2024)", "validity_decision", content_hash(b"v1")
+    )
+    assert not fingerprints.dirty
+
+
+reference = "TUR1/1234(2024)"
+outcome_url = "https://www.gov.uk/government/publications/cac-outcome-gmb-acme"
+acceptance_url = "https://assets.publishing.service.gov.uk/acceptance.pdf"
+recognition_url = "https://assets.publishing.service.gov.uk/recognition.pdf"
+
+
+def outcome_page(last_updated):
+    return HtmlResponse(
+        url=outcome_url,
+        body=f"""<html><head>
+        <meta name="govuk:public-updated-at" content="{last_updated}">
+        </head><body><main id="content"><h1>CAC Outcome: GMB &amp; Acme</h1>
+        <section id="documents"><p>Ref: TUR1/1234(2024)</p>
+        <section><h3><a href="{acceptance_url}">Acceptance Decision</a></h3></section>
+        <section><h3><a href="{recognition_url}">Recognition Decision</a></h3></section>
+        </section></main></body></html>""".encode(),
+        encoding="utf-8",
+    )
+
+
+def test_conditional_headers_only_for_the_stored_url():
+    fingerprints = FingerprintIndex()
+    fingerprints.record(
+        reference,
+        "acceptance_decision",
+        document={
+            "content_hash": content_hash(b"v1"),
+            "url": acceptance_url,
+            "etag": '"abc"',
+            "last_modified": "Thu, 01 Feb 2024 10:00:00 GMT",
+        },
+    )
+
+    assert fingerprints.conditional_headers(
+        reference, "acceptance_decision", acceptance_url
+    ) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Thu, 01 Feb 2024 10:00:00 GMT",
+    }
+    assert not fingerprints.conditional_headers(
+        reference, "acceptance_decision", recognition_url
+    )
+    assert not fingerprints.conditional_headers(
+        reference, "recognition_decision", recognition_url
+    )
+
+
+@pytest.mark.asyncio
+async def test_not_modified_document_is_skipped_without_its_body():
+    spider = UpdatedOutcomesSpider()
+    spider.fingerprints = FingerprintIndex()
+    for document_type, url in (
+        ("acceptance_decision", acceptance_url),
+        ("recognition_decision", recognition_url),
+    ):
+        spider.fingerprints.record(
+            reference,
+            document_type,
+            document={"content_hash": content_hash(b"v1"), "url": url, "etag": '"v1"'},
+        )
+
+    acceptance, recognition = spider.parse_outcome(outcome_page("2024-03-01"))
+
+    assert acceptance.headers[b"If-None-Match"] == b'"v1"'
+    # The last document carries last_updated so is always fetched in full
+    assert b"If-None-Match" not in recognition.headers
+
+    not_modified = Response(acceptance.url, status=304, request=acceptance)
+    # Scrapy passes the 304 through to the callback rather than filtering it
+    HttpErrorMiddleware(Settings()).process_spider_input(not_modified)
+    items = [
+        item
+        async for item in spider.parse_document(not_modified, **acceptance.cb_kwargs)
+    ]
+
+    assert items == []
+    assert spider.fingerprints.pending[reference][1] == {"recognition_decision": 1}
+
+
+@pytest.mark.asyncio
+async def test_fetched_document_fingerprint_keeps_its_validators():
+    spider = UpdatedOutcomesSpider()
+    [request, _] = spider.parse_outcome(outcome_page("2024-03-01"))
+    response = HtmlResponse(
+        url=request.url,
+        headers={"ETag": '"v2"', "Last-Modified": "Fri, 01 Mar 2024 10:00:00 GMT"},
+        body=b"""<html><body><main id="content"><div id="contents">
+        <div class="govspeak"><p>The application is accepted</p></div>
+        </div></main></body></html>""",
+        encoding="utf-8",
+        request=request,
+    )
+
+    [item] = [
+        item async for item in spider.parse_document(response, **request.cb_kwargs)
+    ]
+
+    assert item["fingerprint"] == {
+        "content_hash": content_hash(response.body),
+        "url": acceptance_url,
+        "etag": '"v2"',
+        "last_modified": "Fri, 01 Mar 2024 10:00:00 GMT",
+    }
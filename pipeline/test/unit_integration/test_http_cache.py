@@ -0,0 +1,30 @@
+from pipeline.spider import http_cache_settings
+
+
+def test_http_cache_disabled_without_a_directory(monkeypatch):
+    monkeypatch.delenv("HTTP_CACHE_DIR", raising=False)
+    assert http_cache_settings() == {}
+    assert http_cache_settings(None, expiration_secs=60) == {}
+
+
+def test_http_cache_directory_and_expiry_from_env(monkeypatch):
+    monkeypatch.setenv("HTTP_CACHE_DIR", "/mnt/efs/http-cache")
+    monkeypatch.setenv("HTTP_CACHE_EXPIRATION_SECS", "86400")
+
+    settings = http_cache_settings()
+
+    assert settings["HTTPCACHE_ENABLED"]
+    assert settings["HTTPCACHE_DIR"] == "/mnt/efs/http-cache"
+    assert settings["HTTPCACHE_EXPIRATION_SECS"] == 86400
+    assert settings["HTTPCACHE_POLICY"].endswith("RFC2616Policy")
+    assert settings["HTTPCACHE_ALWAYS_STORE"]
+
+
+def test_http_cache_arguments_override_env(monkeypatch):
+    monkeypatch.setenv("HTTP_CACHE_DIR", "/mnt/efs/http-cache")
+    monkeypatch.delenv("HTTP_CACHE_EXPIRATION_SECS", raising=False)
+
+    assert http_cache_settings()["HTTPCACHE_EXPIRATION_SECS"] == 0
+    settings = http_cache_settings("/tmp/http-cache", expiration_secs=60)
+    assert settings["HTTPCACHE_DIR"] == "/tmp/http-cache"
+    assert settings["HTTPCACHE_EXPIRATION_SECS"] == 60
@@ -0,0 +1,64 @@
+import pytest
+from baml_py.errors import BamlValidationError
+
+from baml_client import types as baml_types
+from pipeline.services.llm_replay import (
+    RecordingClient,
+    ReplayClient,
+    ThrottledError,
+    call_trace,
+    load_recordings,
+)
+from pipeline.transforms.mock_augmentation import mock
+
+
+class FakeBamlClient:
+    def __init__(self):
+        self.result = mock(baml_types.AcceptanceDecision)
+
+    async def ExtractAcceptanceDecision(self, document):
+        return self.result
+
+    async def search(self, q, items_per_page=20):
+        return [{"title": q.upper(), "company_number": "01234567"}]
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay(tmp_path):
+    path = str(tmp_path / "recordings.jsonl")
+    inner = FakeBamlClient()
+    recorder = RecordingClient(inner, "DefaultClient", path)
+    await recorder.ExtractAcceptanceDecision("decision text")
+    await recorder.search(q="acme", items_per_page=5)
+
+    replay = ReplayClient(load_recordings(path), "LargeClient", latency=0)
+    trace = []
+    call_trace.set(trace)
+    assert await replay.ExtractAcceptanceDecision("decision text") == inner.result
+    assert await replay.search(q="acme", items_per_page=5) == [
+        {"title": "ACME", "company_number": "01234567"}
+    ]
+    assert [call[:2] for call in trace] == [
+        ("ExtractAcceptanceDecision", "LargeClient"),
+        ("search", "LargeClient"),
+    ]
+    assert replay.stats.calls["ExtractAcceptanceDecision"] == 1
+
+    with pytest.raises(KeyError):
+        await replay.ExtractAcceptanceDecision("some other decision")
+
+
+@pytest.mark.asyncio
+async def test_replay_injects_errors(tmp_path):
+    path = str(tmp_path / "recordings.jsonl")
+    await RecordingClient(FakeBamlClient(), "DefaultClient", path).search(q="acme")
+    recordings = load_recordings(path)
+
+    throttled = ReplayClient(recordings, "DefaultClient", latency=0, throttle_rate=1)
+    with pytest.raises(ThrottledError):
+        await throttled.search(q="acme")
+
+    invalid = ReplayClient(recordings, "DefaultClient", latency=0, invalid_rate=1)
+    with pytest.raises(BamlValidationError):
+        await invalid.search(q="acme")
+    assert invalid.stats.errors["BamlValidationError"] == 1
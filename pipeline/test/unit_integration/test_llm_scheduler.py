@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from pipeline.services.llm_scheduler import LlmScheduler, Priority, TokenBucket
+
+
+class Throttled(Exception):
+    status_code = 429
+
+
+def test_token_bucket_delay():
+    now = [0.0]
+    bucket = TokenBucket(60, clock=lambda: now[0])
+    assert bucket.delay(60) == 0
+    bucket.take(60)
+    assert bucket.delay(1) == pytest.approx(1.0)
+    now[0] = 30.0
+    assert bucket.delay(30) == 0
+    # Requests larger than the bucket only need a full bucket
+    assert bucket.delay(1000) == pytest.approx(30.0)
+
+
+@pytest.mark.asyncio
+async def test_dispatches_by_priority_within_concurrency():
+    scheduler = LlmScheduler(max_concurrency=1)
+    started = []
+    gate = asyncio.Event()
+
+    async def call(name):
+        started.append(name)
+        if name == "first":
+            await gate.wait()
+        return name
+
+    first = asyncio.create_task(scheduler.submit(lambda: call("first")))
+    await asyncio.sleep(0)
+    low = asyncio.create_task(
+        scheduler.submit(lambda: call("low"), priority=Priority.low)
+    )
+    high = asyncio.create_task(
+        scheduler.submit(lambda: call("high"), priority=Priority.high)
+    )
+    await asyncio.sleep(0)
+    assert started == ["first"]
+
+    gate.set()
+    assert await asyncio.gather(first, low, high) == ["first", "low", "high"]
+    assert started == ["first", "high", "low"]
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_retries_throttled_calls_with_backoff():
+    scheduler = LlmScheduler(backoff_base=0.01, max_retries=3)
+    attempts = []
+
+    async def call():
+        attempts.append(scheduler.clock())
+        if len(attempts) < 3:
+            raise Throttled()
+        return "ok"
+
+    assert await scheduler.submit(call) == "ok"
+    assert scheduler.throttled == 2
+    assert scheduler.consecutive_throttles == 0
+    assert attempts[2] - attempts[1] >= 0.02
+
+
+@pytest.mark.asyncio
+async def test_non_throttling_errors_are_not_retried():
+    scheduler = LlmScheduler(backoff_base=0.01)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        await scheduler.submit(call)
+    assert len(attempts) == 1
+    assert scheduler.active == 0
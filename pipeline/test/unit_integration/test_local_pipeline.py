@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from lambdas.local_pipeline import LocalPipeline, PipelineSteps, report
+
+
+async def refs_from(ids):
+    for id in ids:
+        yield {"_id": id, "_index": "outcomes-raw"}
+
+
+class FakeSteps:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.in_flight = {"augment": 0, "disambiguate": 0, "index": 0}
+        self.max_in_flight = dict(self.in_flight)
+        self.disambiguated = []
+        self.indexed = []
+
+    async def _step(self, name):
+        self.in_flight[name] += 1
+        self.max_in_flight[name] = max(self.max_in_flight[name], self.in_flight[name])
+        await asyncio.sleep(self.delay)
+        self.in_flight[name] -= 1
+
+    async def augment(self, ref):
+        await self._step("augment")
+        if ref.id.endswith("broken"):
+            raise RuntimeError("LLM fell over")
+        result = {"ref": {"_id": ref.id, "_index": "outcomes-augmented"}}
+        if "acceptance_decision" in ref.id:
+            result.update(
+                name="Acme Ltd",
+                unions=["GMB"],
+                application_date="2024-01-01",
+                bargaining_unit="Warehouse operatives",
+                locations=None,
+            )
+        return result
+
+    async def disambiguate(self, event):
+        await self._step("disambiguate")
+        self.disambiguated.append(event.name)
+        return {}
+
+    async def index(self, event):
+        await self._step("index")
+        self.indexed.append(event.ref.id)
+        return {}
+
+    def pipeline_steps(self):
+        return PipelineSteps(
+            augment=self.augment, disambiguate=self.disambiguate, index=self.index
+        )
+
+
+async def test_routes_refs_through_every_stage():
+    steps = FakeSteps()
+    pipeline = LocalPipeline(steps=steps.pipeline_steps())
+
+    stats = await pipeline.run(
+        refs_from(
+            ["TUR1/1:acceptance_decision", "TUR1/1:recognition_decision", "x:broken"]
+        )
+    )
+
+    assert steps.disambiguated == ["Acme Ltd"]
+    assert sorted(steps.indexed) == [
+        "TUR1/1:acceptance_decision",
+        "TUR1/1:recognition_decision",
+    ]
+    by_name = {stage.name: stage for stage in stats}
+    assert by_name["source"].processed == 3
+    assert (by_name["augment"].processed, by_name["augment"].failed) == (2, 1)
+    assert by_name["disambiguate"].processed == 1
+    assert by_name["index"].processed == 2
+    assert "augment" in report(stats)
+
+
+async def test_stages_respect_their_concurrency():
+    steps = FakeSteps(delay=0.01)
+    pipeline = LocalPipeline(
+        steps=steps.pipeline_steps(),
+        augment_concurrency=4,
+        disambiguate_concurrency=3,
+        index_concurrency=2,
+        queue_size=2,
+    )
+
+    await pipeline.run(refs_from([f"TUR1/{i}:acceptance_decision" for i in range(20)]))
+
+    assert steps.max_in_flight == {"augment": 4, "disambiguate": 3, "index": 2}
+    assert len(steps.indexed) == 20
+
+
+async def test_source_errors_are_raised_after_draining():
+    steps = FakeSteps()
+
+    async def failing_refs():
+        yield {"_id": "TUR1/1:recognition_decision", "_index": "outcomes-raw"}
+        raise RuntimeError("Scrape failed")
+
+    with pytest.raises(RuntimeError, match="Scrape failed"):
+        await LocalPipeline(steps=steps.pipeline_steps()).run(failing_refs())
+    assert steps.indexed == ["TUR1/1:recognition_decision"]
@@ -0,0 +1,83 @@
+import json
+import os
+
+from pipeline.services.manifests import (
+    LocalManifestStore,
+    S3ManifestStore,
+    manifest_store_from_uri,
+    write_jsonl_manifest,
+)
+
+
+async def aiter_refs(n):
+    for i in range(n):
+        yield {"_id": f"ref-{i}", "_index": "outcomes-raw", "passthrough": False}
+
+
+def read_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def manifest_parts(manifest):
+    directory = manifest["directory"]
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))]
+
+
+def test_manifest_store_from_uri(tmp_path):
+    store = manifest_store_from_uri(f"file://{tmp_path}")
+    assert isinstance(store, LocalManifestStore)
+    assert store.directory == str(tmp_path)
+
+
+async def test_write_jsonl_manifest_chunks(tmp_path):
+    store = LocalManifestStore(str(tmp_path))
+
+    manifest = await write_jsonl_manifest(store, "run", aiter_refs(5), chunk_size=2)
+
+    assert manifest["count"] == 5
+    assert manifest["directory"] == os.path.join(str(tmp_path), "run", "")
+    parts = manifest_parts(manifest)
+    assert [p.rsplit("/", 1)[-1] for p in parts] == [
+        "part-00000.jsonl",
+        "part-00001.jsonl",
+        "part-00002.jsonl",
+    ]
+    refs = [ref for path in parts for ref in read_lines(path)]
+    assert [ref["_id"] for ref in refs] == [f"ref-{i}" for i in range(5)]
+
+
+async def test_write_jsonl_manifest_empty(tmp_path):
+    store = LocalManifestStore(str(tmp_path))
+
+    manifest = await write_jsonl_manifest(store, "run", aiter_refs(0))
+
+    assert manifest["count"] == 0
+    [part] = manifest_parts(manifest)
+    assert read_lines(part) == []
+
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[(Bucket, Key)] = Body
+
+
+async def test_s3_manifest_pointer_is_a_prefix():
+    store = S3ManifestStore("manifests", "/redrive/")
+    store.s3 = FakeS3()
+
+    manifest = await write_jsonl_manifest(
+        store, "outcomes-raw/run", aiter_refs(3), chunk_size=2
+    )
+
+    # What an ItemReader listing with s3:listObjectsV2 takes
+    assert manifest == {
+        "Bucket": "manifests",
+        "Prefix": "redrive/outcomes-raw/run/",
+        "count": 3,
+    }
+    assert all(key.startswith(manifest["Prefix"]) for _, key in store.s3.objects)
+    assert len(store.s3.objects) == 2
@@ -9,6 +9,7 @@ import pipeline.decisions_to_outcomes as decisions_to_outcomes
 from pipeline.decisions_to_outcomes import (
     merge_decisions,
     merge_decisions_to_outcome,
+    merge_decisions_to_outcomes,
     merge_without_none,
 )
 from pipeline.transforms import get_parties
@@ -49,6 +50,7 @@ class MockOpenSearchClient:
         self.search_args = None
         self.search_calls = []
         self.get_calls = []
+        self.mget_calls = []
 
     async def search(self, index, body):
         self.search_called = True
@@ -61,6 +63,10 @@ class MockOpenSearchClient:
         if "reference" in term:
             ref_val = term["reference"]
             results = [r for r in results if r.get("reference") == ref_val]
+        terms = query.get("terms") or {}
+        if "reference" in terms:
+            ref_vals = set(terms["reference"])
+            results = [r for r in results if r.get("reference") in ref_vals]
 
         results = copy.deepcopy(results)
         if "sort" in body:
@@ -91,6 +97,17 @@ class MockOpenSearchClient:
             ) from e
         return copy.deepcopy(doc)
 
+    async def mget(self, index, body):
+        self.mget_calls.append({"index": index, "body": body})
+        docs = []
+        for id in body["ids"]:
+            doc = self.get_documents.get((index, id))
+            if doc is None:
+                docs.append({"_index": index, "_id": id, "found": False})
+            else:
+                docs.append({"_index": index, "_id": id, "found": True, **doc})
+        return copy.deepcopy({"docs": docs})
+
     def _apply_sort(self, results, sort_specs):
         """Apply sorting to results based on sort specifications"""
 
@@ -855,3 +872,133 @@ def test_merge_without_none():
     # Test 8: One empty, one with values
     result8 = merge_without_none({}, {"a": "value", "b": None})
     assert result8 == {"a": "value", "b": None}
+
+
+async def test_merge_decisions_to_outcomes_batch(
+    mock_client_with_data, merge_decisions_on_deepcopy
+):
+    """Batched merge issues one search for all references and keys results by reference"""
+    outcomes = await merge_decisions_to_outcomes(
+        mock_client_with_data,
+        index="test-index",
+        non_pipeline_indices={"application-withdrawals"},
+        references=["TUR1/1234/2024", "TUR1/5678/2024", "TUR1/1234/2024"],
+    )
+
+    assert list(outcomes) == ["TUR1/1234/2024", "TUR1/5678/2024"]
+    assert len(mock_client_with_data.search_calls) == 1
+    body = mock_client_with_data.search_calls[0]["body"]
+    assert body["query"]["terms"]["reference"] == ["TUR1/1234/2024", "TUR1/5678/2024"]
+    assert body["size"] == 2 * len(DocumentType)
+    assert set(outcomes["TUR1/1234/2024"].documents) == {
+        "application_received",
+        "recognition_decision",
+    }
+    assert set(outcomes["TUR1/5678/2024"].documents) == {"application_received"}
+    assert mock_client_with_data.mget_calls == []
+
+
+async def test_merge_decisions_to_outcomes_batch_companies_via_mget(
+    merge_decisions_on_deepcopy,
+):
+    """Companies for the whole batch come from one mget; missing ones skip the outcome"""
+
+    def acceptance_decision(reference, employer):
+        return {
+            "reference": reference,
+            "document_type": "acceptance_decision",
+            "document_content": "Application accepted",
+            "document_url": "https://example.com/acceptance",
+            "extracted_data": {
+                "decision_date": "2024-03-01",
+                "success": True,
+                "rejection_reasons": [],
+                "application_date": "2023-06-01",
+                "end_of_acceptance_period": "2024-03-10",
+                "bargaining_unit": {
+                    "description": "Shop floor",
+                    "size_considered": True,
+                    "size": 50,
+                    "claimed_membership": 30,
+                    "membership": 28,
+                },
+                "bargaining_unit_agreed": True,
+                "petition_signatures": 10,
+            },
+            "outcome_url": f"https://example.com/outcome/{reference}",
+            "outcome_title": f"Unite & {employer}",
+            "last_updated": "2024-03-01T10:00:00Z",
+        }
+
+    found = acceptance_decision("TUR1/1234/2024", "Acme Ltd")
+    missing = acceptance_decision("TUR1/5678/2024", "Other Ltd")
+    found_id = request_to_doc_id(disambiguate_request_from_acceptance_decision(found))
+    missing_id = request_to_doc_id(
+        disambiguate_request_from_acceptance_decision(missing)
+    )
+    get_documents = {
+        ("disambiguated-companies", found_id): {
+            "_source": {
+                "disambiguated_company": {
+                    "type": "identified",
+                    "company_name": "Acme Ltd",
+                    "company_number": "01234567",
+                    "industrial_classifications": [],
+                }
+            },
+        }
+    }
+    mock_client = MockOpenSearchClient([found, missing], get_documents=get_documents)
+
+    outcomes = await merge_decisions_to_outcomes(
+        mock_client,
+        index="test-index",
+        non_pipeline_indices=set(),
+        references=["TUR1/1234/2024", "TUR1/5678/2024"],
+    )
+
+    assert mock_client.get_calls == []
+    assert mock_client.mget_calls == [
+        {"index": "disambiguated-companies", "body": {"ids": [found_id, missing_id]}}
+    ]
+    assert outcomes["TUR1/1234/2024"].entities.company.root.company_name == "Acme Ltd"
+    assert outcomes["TUR1/5678/2024"] is None
+
+
+async def test_merge_decisions_to_outcomes_batch_isolates_errors(
+    merge_decisions_on_deepcopy,
+):
+    """A reference that fails to merge is returned as its error, not raised"""
+
+    def para_35_decision(reference, last_updated):
+        return {
+            "reference": reference,
+            "document_type": "para_35_decision",
+            "document_content": "Paragraph 35 decision - application can proceed",
+            "document_url": f"https://example.com/para35/{reference}",
+            "extracted_data": {
+                "decision_date": "2024-02-15",
+                "application_date": "2023-12-01",
+                "application_can_proceed": True,
+            },
+            "outcome_url": f"https://example.com/outcome/{reference}",
+            "outcome_title": f"Outcome {reference}",
+            "last_updated": last_updated,
+        }
+
+    mock_client = MockOpenSearchClient(
+        [
+            para_35_decision("TUR1/1234/2024", "invalid-date-format"),
+            para_35_decision("TUR1/5678/2024", "2024-02-15T10:00:00Z"),
+        ]
+    )
+
+    outcomes = await merge_decisions_to_outcomes(
+        mock_client,
+        index="test-index",
+        non_pipeline_indices=set(),
+        references=["TUR1/1234/2024", "TUR1/5678/2024"],
+    )
+
+    assert isinstance(outcomes["TUR1/1234/2024"], ValidationError)
+    assert set(outcomes["TUR1/5678/2024"].documents) == {"para_35_decision"}
@@ -0,0 +1,177 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import scrapy
+from opensearchpy.serializer import JSONSerializer
+
+from pipeline.services.opensearch_pipeline import (
+    BulkLoadConfig,
+    OpensearchAsyncBatcher,
+    OpensearchPipeline,
+    action_size,
+    byte_chunks,
+)
+
+
+class FakeOpensearch:
+    """Answers bulk requests, rejecting each id in ``reject`` the first time
+    it is seen and failing each id in ``fail``."""
+
+    def __init__(self, reject=(), fail=(), noop=()):
+        self.transport = SimpleNamespace(serializer=JSONSerializer())
+        self.indices = self
+        self.reject = set(reject)
+        self.fail = set(fail)
+        self.noop = set(noop)
+        self.requests = []
+        self.settings = []
+        self.refreshed = []
+
+    async def bulk(self, body, **kwargs):
+        lines = body if isinstance(body, list) else body.splitlines()
+        lines = [line.decode() if isinstance(line, bytes) else line for line in lines]
+        ids = [json.loads(line)["update"]["_id"] for line in lines[::2]]
+        self.requests.append(ids)
+        items = []
+        for id in ids:
+            if id in self.reject:
+                self.reject.discard(id)
+                item = {"_id": id, "status": 429, "error": {"type": "rejected"}}
+            elif id in self.fail:
+                item = {"_id": id, "status": 400, "error": {"type": "mapper"}}
+            else:
+                result = "noop" if id in self.noop else "updated"
+                item = {"_id": id, "status": 200, "result": result}
+            items.append({"update": item})
+        return {
+            "errors": any(i["update"]["status"] >= 300 for i in items),
+            "items": items,
+        }
+
+    async def get_settings(self, index):
+        return {index: {"settings": {"index": {"number_of_shards": "1"}}}}
+
+    async def put_settings(self, index, body):
+        self.settings.append(body["index"])
+
+    async def refresh(self, index):
+        self.refreshed.append(index)
+
+    async def close(self):
+        pass
+
+
+def action(id, text="x"):
+    return {
+        "_op_type": "update",
+        "_index": "outcomes-raw",
+        "_id": id,
+        "doc": {"text": text},
+        "doc_as_upsert": True,
+    }
+
+
+def test_byte_chunks():
+    assert byte_chunks([40, 40, 40, 100, 10], 100) == [[0, 1], [2], [3], [4]]
+    assert byte_chunks([], 100) == []
+
+
+async def test_batches_split_into_byte_sized_bulks():
+    client = FakeOpensearch()
+    size = action_size(action("a"), client.transport.serializer)
+    batcher = OpensearchAsyncBatcher(client, max_bytes=2 * size, max_batch_size=10)
+
+    results = await batcher.process_batch([action(id) for id in "abcde"])
+
+    assert results == [None] * 5
+    assert client.requests == [["a", "b"], ["c", "d"], ["e"]]
+    assert batcher.stats.requests == 3
+    assert batcher.stats.items == 5
+    assert batcher.stats.bytes == 5 * size
+    assert len(batcher.stats.latencies) == 3
+
+
+async def test_rejected_items_are_retried_and_counted():
+    client = FakeOpensearch(reject={"b", "c"}, fail={"d"}, noop={"a"})
+    batcher = OpensearchAsyncBatcher(
+        client, max_retries=2, initial_backoff=0, max_batch_size=10
+    )
+
+    a, b, c, d = await batcher.process_batch([action(id) for id in "abcd"])
+
+    assert isinstance(a, scrapy.exceptions.DropItem)
+    assert b is None and c is None
+    assert isinstance(d, Exception)
+    assert client.requests == [["a", "b", "c", "d"], ["b", "c"]]
+    assert batcher.stats.requests == 1
+    assert batcher.stats.rejected == 0
+    assert batcher.stats.failed == 1
+    assert "0 rejected, 1 failed" in batcher.stats.report()
+
+
+async def test_rejected_items_fail_once_retries_run_out():
+    client = FakeOpensearch(reject={"a"})
+    batcher = OpensearchAsyncBatcher(client, max_batch_size=10)
+
+    [result] = await batcher.process_batch([action("a")])
+
+    assert isinstance(result, Exception)
+    assert batcher.stats.rejected == 1
+    assert batcher.stats.failed == 1
+
+
+def test_bulk_load_config_from_settings():
+    assert BulkLoadConfig.from_settings(None) is None
+    config = BulkLoadConfig.from_settings(
+        {"MAX_BYTES": 1024, "CONCURRENCY": None, "REFRESH_INTERVAL": "-1"}
+    )
+    assert config == BulkLoadConfig(max_bytes=1024, refresh_interval="-1")
+
+
+class RawPipeline(OpensearchPipeline):
+    def doc(self, item):
+        return {"text": item["text"]}
+
+    def id(self, item):
+        return item["id"]
+
+
+async def test_bulk_load_relaxes_refresh_interval_until_closed(monkeypatch):
+    client = FakeOpensearch()
+    monkeypatch.setattr(
+        "pipeline.services.opensearch_pipeline.create_client", lambda **_: client
+    )
+
+    async def ping():
+        return True
+
+    async def ensure_index_mapping(**_):
+        pass
+
+    client.ping = ping
+    monkeypatch.setattr(
+        "pipeline.services.opensearch_pipeline.ensure_index_mapping",
+        ensure_index_mapping,
+    )
+    pipeline = RawPipeline(
+        cluster_host=None,
+        auth=None,
+        index="outcomes-raw",
+        bulk_load=BulkLoadConfig(
+            max_items=2, concurrency=1, max_queue_time=0.01, refresh_interval="60s"
+        ),
+    )
+
+    await pipeline.open_spider()
+    assert client.settings == [{"refresh_interval": "60s"}]
+    # Far more items than the batch size wait their turn rather than overflowing
+    await asyncio.gather(
+        *(pipeline.process_item({"id": id, "text": "x"}) for id in "abcdef")
+    )
+    await pipeline.close_spider()
+
+    assert sum(client.requests, []) == list("abcdef")
+    # The index didn't set refresh_interval, so it goes back to the default
+    assert client.settings[-1] == {"refresh_interval": None}
+    assert client.refreshed == ["outcomes-raw"]
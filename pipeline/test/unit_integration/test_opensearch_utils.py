@@ -0,0 +1,339 @@
+import pytest
+
+from pipeline.services.opensearch_utils import (
+    ensure_index_mapping,
+    invalidate_index_mapping,
+    mapping_hash,
+    alias_for_versioned_index,
+    bulk_load_settings,
+    flip_aliases,
+    pit_search_after,
+    swap_alias,
+    versioned_index,
+    versioned_index_name,
+)
+from opensearchpy import exceptions
+
+
+class MockIndicesClient:
+    def __init__(self, existing=(), fail_put=False):
+        self.existing = set(existing)
+        self.fail_put = fail_put
+        self.calls = []
+
+    async def exists(self, index):
+        self.calls.append(("exists", index))
+        return index in self.existing
+
+    async def create(self, index, body):
+        self.calls.append(("create", index))
+        self.existing.add(index)
+
+    async def put_mapping(self, index, body):
+        self.calls.append(("put_mapping", index))
+        if self.fail_put:
+            raise exceptions.RequestError(400, "illegal_argument_exception", {})
+
+
+class MockOpenSearchClient:
+    def __init__(self, **kwargs):
+        self.indices = MockIndicesClient(**kwargs)
+
+
+mapping = {"dynamic": "strict", "properties": {"a": {"type": "keyword"}}}
+
+
+@pytest.fixture(autouse=True)
+def clear_mapping_registry():
+    invalidate_index_mapping()
+    yield
+    invalidate_index_mapping()
+
+
+def test_mapping_hash_ignores_key_order():
+    assert mapping_hash({"a": 1, "b": {"c": 2, "d": 3}}) == mapping_hash(
+        {"b": {"d": 3, "c": 2}, "a": 1}
+    )
+
+
+async def test_ensure_index_mapping_is_memoized():
+    client = MockOpenSearchClient(existing={"idx"})
+
+    await ensure_index_mapping(client, "idx", mapping)
+    await ensure_index_mapping(client, "idx", mapping)
+
+    assert client.indices.calls == [("exists", "idx"), ("put_mapping", "idx")]
+
+
+async def test_ensure_index_mapping_reapplies_changed_mapping():
+    client = MockOpenSearchClient()
+
+    await ensure_index_mapping(client, "idx", mapping)
+    await ensure_index_mapping(
+        client, "idx", {**mapping, "properties": {"b": {"type": "text"}}}
+    )
+
+    assert client.indices.calls == [
+        ("exists", "idx"),
+        ("create", "idx"),
+        ("exists", "idx"),
+        ("put_mapping", "idx"),
+    ]
+
+
+async def test_ensure_index_mapping_after_invalidation():
+    client = MockOpenSearchClient(existing={"idx"})
+
+    await ensure_index_mapping(client, "idx", mapping)
+    invalidate_index_mapping("idx")
+    await ensure_index_mapping(client, "idx", mapping)
+
+    assert len(client.indices.calls) == 4
+
+
+async def test_ensure_index_mapping_failure_is_not_memoized():
+    client = MockOpenSearchClient(existing={"idx"}, fail_put=True)
+
+    with pytest.raises(RuntimeError):
+        await ensure_index_mapping(client, "idx", mapping)
+
+    client.indices.fail_put = False
+    await ensure_index_mapping(client, "idx", mapping)
+    assert client.indices.calls[-1] == ("put_mapping", "idx")
+    assert len(client.indices.calls) == 4
+
+
+async def test_ensure_index_mapping_cache_disabled(monkeypatch):
+    monkeypatch.setenv("OPENSEARCH_MAPPING_CACHE", "false")
+    client = MockOpenSearchClient(existing={"idx"})
+
+    await ensure_index_mapping(client, "idx", mapping)
+    await ensure_index_mapping(client, "idx", mapping)
+
+    assert len(client.indices.calls) == 4
+
+
+class MockPitClient:
+    def __init__(self, ids):
+        self.ids = ids
+        self.search_bodies = []
+        self.deleted = []
+
+    async def create_pit(self, index, params):
+        return {"pit_id": "pit-1"}
+
+    async def search(self, body):
+        self.search_bodies.append(body)
+        after = body.get("search_after", [None])[0]
+        remaining = [i for i in sorted(self.ids) if after is None or i > after]
+        page = remaining[: body["size"]]
+        return {
+            "pit_id": "pit-1",
+            "hits": {"hits": [{"_id": i, "sort": [i]} for i in page]},
+        }
+
+    async def delete_pit(self, body):
+        self.deleted.append(body)
+
+
+async def test_pit_search_after_pages_through_everything():
+    client = MockPitClient([f"id-{i:02d}" for i in range(5)])
+
+    hits = [
+        hit
+        async for hit in pit_search_after(
+            client, "idx", sort=[{"id": "asc"}], page_size=2, _source=False
+        )
+    ]
+
+    assert [hit["_id"] for hit in hits] == [f"id-{i:02d}" for i in range(5)]
+    assert [b.get("search_after") for b in client.search_bodies] == [
+        None,
+        ["id-01"],
+        ["id-03"],
+    ]
+    assert all(b["_source"] is False for b in client.search_bodies)
+    assert client.deleted == [{"pit_id": ["pit-1"]}]
+
+
+class MockAliasClient:
+    def __init__(self, indices=(), aliases=None, settings=None):
+        self.indices = self
+        self.existing = set(indices)
+        self.aliases = dict(aliases or {})
+        self.settings = dict(settings or {})
+        self.updates = []
+        self.calls = []
+
+    async def get_alias(self, name=None, index=None):
+        if index is not None:
+            aliases = [
+                alias for target, alias in self.aliases.items() if target == index
+            ]
+            return {index: {"aliases": {alias: {} for alias in aliases}}}
+        targets = [index for index, alias in self.aliases.items() if alias == name]
+        if not targets:
+            raise exceptions.NotFoundError(404, "aliases_not_found_exception", {})
+        return {index: {"aliases": {name: {}}} for index in targets}
+
+    async def exists(self, index):
+        return index in self.existing or index in self.aliases.values()
+
+    async def update_aliases(self, body):
+        self.updates.append(body["actions"])
+
+    async def get_settings(self, index):
+        return {index: {"settings": {"index": self.settings.get(index, {})}}}
+
+    async def create(self, index, body):
+        self.calls.append(("create", index, body["settings"]))
+        self.existing.add(index)
+
+    async def put_settings(self, index, body):
+        self.calls.append(("put_settings", index, body["index"]))
+
+    async def refresh(self, index):
+        self.calls.append(("refresh", index))
+
+    async def forcemerge(self, index, params, **kwargs):
+        self.calls.append(("forcemerge", index, params["max_num_segments"]))
+
+    async def delete(self, index):
+        self.calls.append(("delete", index))
+        self.existing.discard(index)
+
+
+def test_versioned_index_name():
+    assert versioned_index_name("outcomes-indexed", "2") == "outcomes-indexed-v2"
+    assert versioned_index_name("outcomes-indexed").startswith("outcomes-indexed-v20")
+
+
+async def test_swap_alias_moves_existing_alias():
+    client = MockAliasClient(indices={"idx-v1", "idx-v2"}, aliases={"idx-v1": "idx"})
+
+    previous = await swap_alias(client, "idx", "idx-v2")
+
+    assert previous == ["idx-v1"]
+    assert client.updates == [
+        [
+            {"remove": {"index": "idx-v1", "alias": "idx"}},
+            {"add": {"index": "idx-v2", "alias": "idx"}},
+        ]
+    ]
+
+
+async def test_swap_alias_replaces_concrete_index_only_when_asked():
+    client = MockAliasClient(indices={"idx", "idx-v1"})
+
+    with pytest.raises(RuntimeError, match="concrete index"):
+        await swap_alias(client, "idx", "idx-v1")
+    assert client.updates == []
+
+    await swap_alias(client, "idx", "idx-v1", replace_index=True)
+    assert client.updates == [
+        [
+            {"remove_index": {"index": "idx"}},
+            {"add": {"index": "idx-v1", "alias": "idx"}},
+        ]
+    ]
+
+
+async def test_replacing_concrete_index_keeps_its_other_aliases():
+    # A legacy index the webapp reads through another alias
+    client = MockAliasClient(indices={"idx", "idx-v1"}, aliases={"idx": "read"})
+
+    previous = await swap_alias(client, "idx", "idx-v1", replace_index=True)
+
+    assert previous == []
+    assert client.updates == [
+        [
+            {"remove_index": {"index": "idx"}},
+            {"add": {"index": "idx-v1", "alias": "idx"}},
+            {"add": {"index": "idx-v1", "alias": "read"}},
+        ]
+    ]
+
+
+async def test_replacing_concrete_index_moves_aliases_once():
+    client = MockAliasClient(indices={"idx", "idx-v1"}, aliases={"idx": "read"})
+
+    previous = await flip_aliases(client, "idx-v1", ["idx", "read"], replace_index=True)
+
+    assert previous == {"idx": [], "read": ["idx"]}
+    assert client.updates == [
+        [
+            {"remove_index": {"index": "idx"}},
+            {"add": {"index": "idx-v1", "alias": "idx"}},
+            # No separate remove: the alias goes with the index
+            {"add": {"index": "idx-v1", "alias": "read"}},
+        ]
+    ]
+
+
+def test_alias_for_versioned_index():
+    assert alias_for_versioned_index("outcomes-indexed-1012-v20250101") == (
+        "outcomes-indexed-1012"
+    )
+    assert alias_for_versioned_index("outcomes-indexed-1012") is None
+    assert alias_for_versioned_index("outcomes-indexed-vague") is None
+
+
+async def test_flip_aliases_moves_read_and_write_aliases_together():
+    client = MockAliasClient(
+        indices={"idx-1012-v1", "idx-1012-v2"},
+        aliases={"idx-1012-v1": "idx-1012"},
+    )
+    client.aliases["idx-1011"] = "idx"
+
+    previous = await flip_aliases(client, "idx-1012-v2", ["idx-1012", "idx"])
+
+    assert previous == {"idx-1012": ["idx-1012-v1"], "idx": ["idx-1011"]}
+    assert client.updates == [
+        [
+            {"remove": {"index": "idx-1012-v1", "alias": "idx-1012"}},
+            {"add": {"index": "idx-1012-v2", "alias": "idx-1012"}},
+            {"remove": {"index": "idx-1011", "alias": "idx"}},
+            {"add": {"index": "idx-1012-v2", "alias": "idx"}},
+        ]
+    ]
+
+
+async def test_versioned_index_lifecycle():
+    client = MockAliasClient(
+        indices={"idx-v1"},
+        aliases={"idx-v1": "idx"},
+        settings={"idx-v1": {"number_of_replicas": "2"}},
+    )
+
+    async with versioned_index(client, "idx", mapping, version="2") as index:
+        assert index == "idx-v2"
+        assert client.updates == []
+
+    assert client.calls == [
+        ("create", "idx-v2", bulk_load_settings),
+        # refresh_interval wasn't set on the live index, so goes back to default
+        (
+            "put_settings",
+            "idx-v2",
+            {"refresh_interval": None, "number_of_replicas": "2"},
+        ),
+        ("refresh", "idx-v2"),
+        ("forcemerge", "idx-v2", 1),
+    ]
+    assert client.updates == [
+        [
+            {"remove": {"index": "idx-v1", "alias": "idx"}},
+            {"add": {"index": "idx-v2", "alias": "idx"}},
+        ]
+    ]
+
+
+async def test_versioned_index_discarded_on_failure():
+    client = MockAliasClient(indices={"idx-v1"}, aliases={"idx-v1": "idx"})
+
+    with pytest.raises(ValueError):
+        async with versioned_index(client, "idx", mapping, version="2"):
+            raise ValueError("Load failed")
+
+    assert client.calls[-1] == ("delete", "idx-v2")
+    assert client.updates == []
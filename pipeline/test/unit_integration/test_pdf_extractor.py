@@ -0,0 +1,49 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pipeline.extractors import pdf_extractor
+from pipeline.extractors.pdf_extractor import PdfExtractorPool
+
+
+def slow_pdf_to_markdown(body):
+    time.sleep(float(body))
+    return body.decode()
+
+
+@pytest.fixture
+def slow_conversion(monkeypatch):
+    monkeypatch.setattr(pdf_extractor, "pdf_to_markdown", slow_pdf_to_markdown)
+
+
+def test_thread_fallback_converts_one_pdf_at_a_time(monkeypatch):
+    def unavailable(**kwargs):
+        raise OSError("No /dev/shm")
+
+    monkeypatch.setattr(pdf_extractor, "ProcessPoolExecutor", unavailable)
+
+    pool = PdfExtractorPool(workers=8)
+
+    assert not pool.processes
+    assert isinstance(pool.executor, ThreadPoolExecutor)
+    assert pool.executor._max_workers == 1
+    pool.shutdown()
+
+
+async def test_timed_out_conversion_replaces_process_pool(monkeypatch, slow_conversion):
+    # Threads standing in for processes, which the monkeypatch wouldn't reach
+    monkeypatch.setattr(
+        pdf_extractor,
+        "ProcessPoolExecutor",
+        lambda max_workers, mp_context: ThreadPoolExecutor(max_workers=1),
+    )
+    pool = PdfExtractorPool(workers=1, timeout=0.05)
+    stuck = pool.executor
+
+    with pytest.raises(TimeoutError):
+        await pool.to_markdown(b"0.2")
+
+    assert pool.executor is not stuck
+    assert await pool.to_markdown(b"0") == "0"
+    pool.shutdown()
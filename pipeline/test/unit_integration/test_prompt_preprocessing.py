@@ -0,0 +1,105 @@
+from pipeline.transforms.prompt_preprocessing import (
+    ANNEX,
+    drop_sections,
+    prepare_prompt,
+    strip_page_furniture,
+    truncate_middle,
+)
+from pipeline.types.documents import DocumentType
+
+header = "CENTRAL ARBITRATION COMMITTEE"
+
+
+def paged(*pages):
+    return "\n\n-----\n\n".join(
+        f"{header}\n\n{page}\n\n{i}" for i, page in enumerate(pages, start=1)
+    )
+
+
+def test_strip_page_furniture():
+    content = paged(
+        "1. The Union applied on 8 March 2024.",
+        "2. The bargaining unit is all employees.\n\n| Site | Workers |\n| A | 5 |",
+        "3. The application is accepted.\n\n| Site | Workers |\n| B | 5 |",
+    )
+    stripped = strip_page_furniture(content)
+    assert header not in stripped
+    assert "-----" not in stripped
+    assert "\n1\n" not in stripped
+    assert "1. The Union applied on 8 March 2024." in stripped
+    assert stripped.count("| Site | Workers |") == 2
+
+
+def test_drop_sections_only_in_second_half():
+    body = "\n\n".join(f"{i}. Paragraph about the annex." for i in range(20))
+    content = f"{body}\n\n## Annex\n\nThe specified method\n\nStep 1"
+    dropped = drop_sections(content, (ANNEX,))
+    assert dropped == body
+
+    intro = "Annex 1 lists the sites\n\n" + body
+    assert drop_sections(intro, (ANNEX,)) == intro
+
+
+def test_truncate_middle_keeps_head_and_tail():
+    paragraphs = [f"Paragraph {i} " + "x" * 400 for i in range(100)]
+    truncated = truncate_middle("\n\n".join(paragraphs), max_tokens=2000)
+    assert truncated.startswith("Paragraph 0 ")
+    assert truncated.endswith(paragraphs[-1])
+    assert "paragraphs omitted" in truncated
+
+
+def test_prepare_prompt_reports_savings():
+    decision = "\n\n".join(
+        f"{i}. The Panel considered the evidence." for i in range(30)
+    )
+    content = paged(decision, "Names of those who attended the hearing:\n\nMr A")
+    prepared = prepare_prompt(DocumentType.acceptance_decision, content)
+    assert "attended the hearing" not in prepared.content
+    assert prepared.saved_tokens > 0
+
+
+def test_strip_page_furniture_keeps_numbers_and_repeats_in_the_body():
+    ballot = "Votes for:\n\n312\n\nVotes against:\n\n48\n\nSpoilt:\n\n3"
+    answers = "\n\n".join(["Yes", "The Union's case", "Yes", "Yes"])
+    content = paged(
+        f"The workers in the unit:\n\n120\n\n{ballot}\n\nEnd of results.",
+        f"Questions put:\n\n{answers}\n\nEnd of answers.",
+        "The Panel's decision follows.",
+    )
+    stripped = strip_page_furniture(content)
+    assert header not in stripped
+    for line in ("120", "312", "48", "3"):
+        assert f"\n{line}\n" in stripped
+    assert stripped.count("Yes") == 3
+    assert not stripped.endswith("3")
+
+
+def test_strip_page_furniture_leaves_unpaged_documents():
+    content = f"{header}\n\n1\n\n{header}\n\n2\n\n{header}"
+    assert strip_page_furniture(content) == content
+
+
+def long_decision(decisive):
+    paragraphs = [f"{i}. The Panel considered " + "x" * 400 for i in range(400)]
+    paragraphs[200] = decisive
+    return "\n\n".join(paragraphs)
+
+
+def test_prepare_prompt_keeps_the_middle_of_long_decisions_by_default():
+    decisive = "The Panel is satisfied that the application is valid."
+    for document_type in (
+        DocumentType.acceptance_decision,
+        DocumentType.bargaining_unit_decision,
+        DocumentType.validity_decision,
+    ):
+        prepared = prepare_prompt(document_type, long_decision(decisive))
+        assert decisive in prepared.content
+        assert "paragraphs omitted" not in prepared.content
+
+
+def test_prepare_prompt_truncates_long_bargaining_decisions():
+    prepared = prepare_prompt(
+        DocumentType.bargaining_decision, long_decision("Submissions on the method")
+    )
+    assert "paragraphs omitted" in prepared.content
+    assert prepared.content.startswith("0. The Panel considered")
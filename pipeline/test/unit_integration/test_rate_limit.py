@@ -0,0 +1,171 @@
+import asyncio
+import math
+import time
+
+import httpx
+import pytest
+from opensearchpy.exceptions import ConflictError, NotFoundError
+
+from company_disambiguator.companies_house import (
+    CompaniesHouseClient,
+    RateLimitState,
+    rate_limited_get,
+)
+from company_disambiguator.rate_limit import (
+    FileLockTokenBucket,
+    InMemoryTokenBucket,
+    OpensearchTokenBucket,
+    retry_after_seconds,
+)
+
+
+class FakeCompaniesHouse:
+    """Fixed-window quota shared by every client, like the real API (and the
+    fake API in test/fake_api)."""
+
+    def __init__(self, limit, window_seconds):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.window_start = time.time()
+        self.count = 0
+        self.rejected = 0
+
+    def __call__(self, request: httpx.Request):
+        now = time.time()
+        if now - self.window_start >= self.window_seconds:
+            self.window_start, self.count = now, 0
+        self.count += 1
+        reset = math.ceil(self.window_start + self.window_seconds)
+        headers = {
+            "X-Ratelimit-Limit": str(self.limit),
+            "X-Ratelimit-Remain": str(max(0, self.limit - self.count)),
+            "X-Ratelimit-Reset": str(reset),
+        }
+        if self.count > self.limit:
+            self.rejected += 1
+            return httpx.Response(429, headers={**headers, "Retry-After": "0"})
+        if request.url.path == "/search/companies":
+            items = [
+                {"title": "ACME", "company_number": number}
+                for number in ("01234567", "07654321")
+            ]
+            return httpx.Response(200, headers=headers, json={"items": items})
+        return httpx.Response(200, headers=headers, json={"sic_codes": ["62020"]})
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds({"Retry-After": "7"}) == 7
+    assert retry_after_seconds(
+        {"Retry-After": "Wed, 21 Oct 2015 07:28:10 GMT"}, now=1445412480
+    ) == pytest.approx(10, abs=1)
+    assert retry_after_seconds({"X-Ratelimit-Reset": "110"}, now=100) == 10
+    assert retry_after_seconds({}, default=3) == 3
+
+
+async def test_429_is_retried_after_retry_after():
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(200, json={"ok": True}),
+    ]
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: responses.pop(0))
+    ) as client:
+        response = await rate_limited_get(
+            client, InMemoryTokenBucket(), "https://ch.example/company/1"
+        )
+    assert response.json() == {"ok": True}
+
+
+async def test_rate_limit_state_reads_headers_case_insensitively():
+    state = RateLimitState()
+    await state.observe(httpx.Headers({"x-ratelimit-remain": "3"}))
+    assert state.remaining == 3
+
+
+async def test_shared_bucket_keeps_concurrent_clients_under_quota(tmp_path):
+    # Simulates several lambdas sharing one API key: each has its own client
+    # but they draw from the same bucket, sized so that burst plus refill
+    # never exceeds the API's fixed window
+    api = FakeCompaniesHouse(limit=40, window_seconds=0.5)
+    bucket_path = str(tmp_path / "companies-house.bucket")
+
+    async def lambda_run():
+        async with CompaniesHouseClient(
+            api_key="key",
+            base_url="https://ch.example",
+            transport=httpx.MockTransport(api),
+            rate_limit=FileLockTokenBucket(bucket_path, limit=16, window_seconds=0.5),
+        ) as client:
+            for _ in range(4):
+                results = await client.search(q="acme", items_per_page=2)
+                assert [item["sic_codes"] for item in results] == [["62020"]] * 2
+
+    await asyncio.gather(*(lambda_run() for _ in range(3)))
+    assert api.rejected == 0
+
+
+class ContendedBucketIndex:
+    """Holds the bucket document, losing the first ``conflicts`` updates to
+    another (imaginary) lambda."""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        self.doc = None
+        self.seq_no = 0
+        self.updates = 0
+
+    async def get(self, index, id):
+        if self.doc is None:
+            raise NotFoundError(404, "not_found", {})
+        return {"_source": self.doc, "_seq_no": self.seq_no, "_primary_term": 1}
+
+    async def index(self, index, id, body, params):
+        self.updates += 1
+        if self.conflicts:
+            self.conflicts -= 1
+            raise ConflictError(409, "version_conflict_engine_exception", {})
+        self.doc, self.seq_no = body, self.seq_no + 1
+
+
+@pytest.fixture
+def no_index_mapping(monkeypatch):
+    async def ensure_index_mapping(*args):
+        pass
+
+    monkeypatch.setattr(
+        "company_disambiguator.rate_limit.ensure_index_mapping", ensure_index_mapping
+    )
+
+
+def opensearch_bucket(client, **kwargs):
+    return OpensearchTokenBucket(
+        client, "rate-limits", "companies-house", initial_backoff=0.001, **kwargs
+    )
+
+
+async def test_opensearch_bucket_retries_conflicts_with_backoff(
+    no_index_mapping, monkeypatch
+):
+    client = ContendedBucketIndex(conflicts=3)
+    sleeps = []
+    sleep = asyncio.sleep
+
+    async def record_sleep(seconds):
+        sleeps.append(seconds)
+        await sleep(0)
+
+    monkeypatch.setattr("company_disambiguator.rate_limit.asyncio.sleep", record_sleep)
+    await opensearch_bucket(client, limit=10).acquire()
+
+    assert client.updates == 4
+    assert client.doc["tokens"] == 9
+    assert len(sleeps) == 3
+    assert all(0 <= s <= 0.001 * 2**i for i, s in enumerate(sleeps))
+
+
+async def test_opensearch_bucket_gives_up_after_max_attempts(no_index_mapping):
+    client = ContendedBucketIndex(conflicts=100)
+
+    with pytest.raises(ConflictError):
+        await opensearch_bucket(client, max_attempts=5).acquire()
+    assert client.updates == 5
@@ -0,0 +1,122 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from pipeline.rebuild_outcomes import (
+    RebuildStats,
+    index_actions,
+    reference_groups,
+    transform_groups,
+)
+
+
+def decision(reference, document_type, decision_date, index="outcomes-augmented"):
+    return {
+        "_index": index,
+        "_source": {
+            "id": f"{reference}:{document_type}",
+            "reference": reference,
+            "document_type": document_type,
+            "document_content": "...",
+            "document_url": f"https://example.com/{reference}/{document_type}",
+            "extracted_data": {"decision_date": decision_date},
+            "outcome_url": f"https://example.com/{reference}",
+            "outcome_title": "Test Union & Test Employer",
+            "last_updated": "2024-02-01T10:00:00Z",
+        },
+    }
+
+
+class MockRebuildClient:
+    """Serves hits already in decisions_sort order through a PIT."""
+
+    def __init__(self, hits):
+        self.hits = hits
+        self.pages = 0
+
+    async def create_pit(self, index, params):
+        return {"pit_id": "pit-1"}
+
+    async def search(self, body):
+        self.pages += 1
+        start = body.get("search_after", [0])[0]
+        page = [
+            {**hit, "sort": [i + 1]}
+            for i, hit in enumerate(self.hits[start : start + body["size"]], start)
+        ]
+        return {"pit_id": "pit-1", "hits": {"hits": page}}
+
+    async def delete_pit(self, body):
+        pass
+
+    async def mget(self, index, body):
+        return {"docs": [{"_id": id, "found": False} for id in body["ids"]]}
+
+
+hits = [
+    decision("TUR1/1(2024)", "application_received", "2024-01-01"),
+    decision("TUR1/1(2024)", "application_withdrawn", "2024-01-10"),
+    decision("TUR1/2(2024)", "application_received", "2024-01-02"),
+    decision(
+        "TUR1/3(2024)",
+        "application_withdrawn",
+        "2024-01-03",
+        index="application-withdrawals",
+    ),
+]
+
+
+async def test_reference_groups_span_pages():
+    client = MockRebuildClient(hits)
+
+    groups = [
+        [hit["_source"]["document_type"] for hit in group]
+        async for group in reference_groups(client, ["outcomes-augmented"], page_size=1)
+    ]
+
+    assert groups == [
+        ["application_received", "application_withdrawn"],
+        ["application_received"],
+        ["application_withdrawn"],
+    ]
+    assert client.pages == 5
+
+
+async def test_index_actions_transform_in_worker_processes():
+    client = MockRebuildClient(hits)
+    stats = RebuildStats(index="outcomes-indexed-v1")
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        actions = [
+            action
+            async for action in index_actions(
+                client,
+                reference_groups(client, ["outcomes-augmented"]),
+                index="outcomes-indexed-v1",
+                executor=executor,
+                stats=stats,
+                chunk_size=1,
+                max_pending=2,
+            )
+        ]
+
+    # Withdrawal-only references are never indexed by the pipeline
+    assert [action["_id"] for action in actions] == ["TUR1/1(2024)", "TUR1/2(2024)"]
+    assert all(action["_index"] == "outcomes-indexed-v1" for action in actions)
+    assert actions[0]["_source"]["id"] == "TUR1/1(2024)"
+    assert (stats.outcomes, stats.decisions, stats.skipped) == (2, 3, 0)
+
+
+def test_transform_groups_isolates_failures():
+    broken = decision("TUR1/4(2024)", "application_received", "2024-01-04")
+    broken["_source"]["last_updated"] = "not a date"
+    groups = [hits[:2], [broken], hits[2:3]]
+
+    results, failed = transform_groups(groups, {})
+
+    assert [outcome_id for outcome_id, _ in results] == [
+        "TUR1/1(2024)",
+        "TUR1/4(2024)",
+        "TUR1/2(2024)",
+    ]
+    assert results[1][1] is None
+    assert results[0][1] is not None and results[2][1] is not None
+    assert failed == ["TUR1/4(2024)"]
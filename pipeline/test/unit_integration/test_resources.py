@@ -0,0 +1,56 @@
+import json
+import marshal
+import os
+
+import pytest
+
+from pipeline.services.resources import (
+    compile_resources,
+    compiled_path,
+    load_json_resource,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_resource_cache():
+    load_json_resource.cache_clear()
+    yield
+    load_json_resource.cache_clear()
+
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def test_load_json_resource_is_memoized(tmp_path):
+    path = str(tmp_path / "mapping.json")
+    write_json(path, {"a": 1})
+
+    first = load_json_resource(path)
+    write_json(path, {"a": 2})
+
+    assert load_json_resource(path) is first
+    assert first == {"a": 1}
+
+
+def test_load_json_resource_prefers_compiled_sidecar(tmp_path):
+    path = str(tmp_path / "mapping.json")
+    write_json(path, {"a": 1})
+    compile_resources(path)
+    # Only the sidecar reflects this, proving it was read
+    with open(compiled_path(path), "wb") as f:
+        marshal.dump({"a": "compiled"}, f)
+
+    assert load_json_resource(path) == {"a": "compiled"}
+
+
+def test_load_json_resource_ignores_stale_sidecar(tmp_path):
+    path = str(tmp_path / "mapping.json")
+    write_json(path, {"a": 1})
+    compile_resources(path)
+    write_json(path, {"a": 2})
+    stat = os.stat(compiled_path(path))
+    os.utime(path, (stat.st_atime + 10, stat.st_mtime + 10))
+
+    assert load_json_resource(path) == {"a": 2}
@@ -0,0 +1,72 @@
+import httpx
+
+from company_disambiguator.companies_house import CompaniesHouseClient
+from company_disambiguator.response_cache import (
+    DiskCacheTier,
+    ResponseCache,
+    search_cache_key,
+)
+
+
+def test_search_cache_key_normalizes_query():
+    assert search_cache_key("  Acme   Ltd ", 5, 0, None) == search_cache_key(
+        "acme ltd", 5, 0, None
+    )
+    assert search_cache_key("acme", 5, 0, None) != search_cache_key("acme", 20, 0, None)
+
+
+async def test_ttl_expiry_and_backing_tier(tmp_path):
+    now = [1000.0]
+    backing = DiskCacheTier(str(tmp_path))
+    cache = ResponseCache("profile", 60, backing=backing, clock=lambda: now[0])
+
+    assert await cache.get("01234567") is None
+    await cache.put("01234567", {"sic_codes": ["62020"]})
+    assert await cache.get("01234567") == {"sic_codes": ["62020"]}
+
+    # A fresh process only has the backing tier
+    other = ResponseCache("profile", 60, backing=backing, clock=lambda: now[0])
+    assert await other.get("01234567") == {"sic_codes": ["62020"]}
+    assert other.stats.backing_hits == 1
+
+    now[0] += 61
+    assert await cache.get("01234567") is None
+    assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+    assert cache.stats.hit_rate == 1 / 3
+
+
+async def test_client_serves_repeat_searches_and_profiles_from_cache():
+    requests = []
+
+    def handle(request: httpx.Request):
+        requests.append(request.url.path)
+        if request.url.path == "/search/companies":
+            q = request.url.params["q"]
+            numbers = ["01234567", "07654321"] if q == "acme" else ["01234567"]
+            return httpx.Response(
+                200,
+                json={"items": [{"title": q, "company_number": n} for n in numbers]},
+            )
+        return httpx.Response(200, json={"sic_codes": ["62020"]})
+
+    async with CompaniesHouseClient(
+        api_key="key",
+        base_url="https://ch.example",
+        transport=httpx.MockTransport(handle),
+        search_cache=ResponseCache("search", 60),
+        profile_cache=ResponseCache("profile", 60),
+    ) as client:
+        first = await client.search(q="acme", items_per_page=5)
+        assert await client.search(q=" ACME ", items_per_page=5) == first
+        await client.search(q="acme limited", items_per_page=5)
+
+    assert sorted(requests) == sorted(
+        [
+            "/search/companies",
+            "/company/01234567",
+            "/company/07654321",
+            "/search/companies",
+        ]
+    )
+    assert client.search_cache.stats.hits == 1
+    assert client.profile_cache.stats.hits == 1
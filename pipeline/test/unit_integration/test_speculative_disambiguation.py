@@ -0,0 +1,130 @@
+import asyncio
+import gc
+
+import pytest
+
+from baml_client import types as baml_types
+from company_disambiguator.model import DisambiguateCompanyRequest
+from company_disambiguator.pipeline import disambiguate_company
+from pipeline.services import baml
+
+request = DisambiguateCompanyRequest(
+    name="Acme",
+    unions=["GMB"],
+    application_date="2024-01-01",
+    bargaining_unit="Warehouse operatives",
+)
+
+
+class FakeCompaniesHouse:
+    async def search(self, q, items_per_page=20):
+        await asyncio.sleep(0.01)
+        return [{"title": q, "company_number": "01234567", "sic_codes": ["62020"]}]
+
+
+class FakeBamlClient:
+    def __init__(self, second_result, guess_error=None):
+        self.second_result = second_result
+        self.guess_error = guess_error
+        self.calls = []
+        self.guess_cancelled = False
+
+    async def DisambiguateCompany(self, name, **kwargs):
+        self.calls.append(("DisambiguateCompany", name))
+        if name == request.name:
+            return baml_types.RequiresNewSearch(
+                type="requires-new-search", suggested_name="Acme Ltd", reason="?"
+            )
+        return self.second_result
+
+    async def GuessSicCodes(self, name, **kwargs):
+        self.calls.append(("GuessSicCodes", name))
+        if self.guess_error:
+            raise self.guess_error
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            self.guess_cancelled = True
+            raise
+        return baml_types.GuessedSicCodes(
+            type="unidentified", subtype="Unknown", sic_codes=["62020"], reason="?"
+        )
+
+
+@pytest.fixture
+def fake_baml(monkeypatch):
+    def install(second_result, **kwargs):
+        client = FakeBamlClient(second_result, **kwargs)
+        monkeypatch.setattr(baml, "_client_overrides", {})
+        baml.override_clients(authenticated_client=client, large_client=client)
+        return client
+
+    return install
+
+
+@pytest.mark.asyncio
+async def test_speculative_guess_is_cancelled_when_second_search_identifies(
+    fake_baml,
+):
+    client = fake_baml(
+        baml_types.IdentifiedCompany(type="identified", company_number="01234567")
+    )
+    result, debug = await disambiguate_company(
+        request, FakeCompaniesHouse(), speculative=True
+    )
+    await asyncio.sleep(0)
+
+    assert result.type == "identified"
+    assert result.company_number == "01234567"
+    assert ("GuessSicCodes", "Acme") in client.calls
+    assert client.guess_cancelled
+
+
+@pytest.mark.asyncio
+async def test_speculative_guess_is_used_when_second_search_fails(fake_baml):
+    second = baml_types.RequiresNewSearch(
+        type="requires-new-search", suggested_name="Acme Group", reason="?"
+    )
+    sequential_client = fake_baml(second)
+    sequential, sequential_debug = await disambiguate_company(
+        request, FakeCompaniesHouse(), speculative=False
+    )
+    speculative_client = fake_baml(second)
+    speculative, speculative_debug = await disambiguate_company(
+        request, FakeCompaniesHouse(), speculative=True
+    )
+
+    assert speculative == sequential
+    assert speculative.type == "unidentified"
+    assert speculative_debug == sequential_debug
+    assert sequential_client.calls == [
+        ("DisambiguateCompany", "Acme"),
+        ("DisambiguateCompany", "Acme Ltd"),
+        ("GuessSicCodes", "Acme"),
+    ]
+    # The guess starts while the second Companies House search is in flight
+    assert speculative_client.calls == [
+        ("DisambiguateCompany", "Acme"),
+        ("GuessSicCodes", "Acme"),
+        ("DisambiguateCompany", "Acme Ltd"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_speculative_guess_is_not_left_unretrieved(fake_baml):
+    fake_baml(
+        baml_types.IdentifiedCompany(type="identified", company_number="01234567"),
+        guess_error=RuntimeError("LLM unavailable"),
+    )
+    unhandled = []
+    loop = asyncio.get_running_loop()
+    loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+
+    result, _ = await disambiguate_company(
+        request, FakeCompaniesHouse(), speculative=True
+    )
+    await asyncio.sleep(0)
+    gc.collect()
+
+    assert result.type == "identified"
+    assert unhandled == []
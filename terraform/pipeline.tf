@@ -59,6 +59,7 @@ module "augmenter" {
     OPENSEARCH_ENDPOINT           = local.opensearch_endpoint
     OPENSEARCH_CREDENTIALS_SECRET = module.opensearch_credentials.arn
     GOOGLE_API_KEY_SECRET         = module.google_api_key.arn
+    EXTRACTION_CACHE_INDEX        = "llm-extraction-cache"
   }
 }
 
@@ -70,6 +71,21 @@ module "indexer" {
   image_command = ["lambdas.indexer.handler"]
   timeout       = 60 * 15
   memory_size   = 512
+  environment = {
+    OPENSEARCH_ENDPOINT           = local.opensearch_endpoint
+    OPENSEARCH_CREDENTIALS_SECRET = module.opensearch_credentials.arn
+    # Refreshed once at the end of the map run by the refresher
+    OPENSEARCH_REFRESH_POLICY = "deferred"
+  }
+}
+
+module "refresher" {
+  source        = "./modules/lambda"
+  name          = "pipeline-refresher"
+  image_uri     = "${aws_ecr_repository.pipeline.repository_url}:latest"
+  image_command = ["lambdas.refresher.handler"]
+  timeout       = 60
+  memory_size   = 256
   environment = {
     OPENSEARCH_ENDPOINT           = local.opensearch_endpoint
     OPENSEARCH_CREDENTIALS_SECRET = module.opensearch_credentials.arn
@@ -89,6 +105,10 @@ module "company_disambiguator" {
     OPENSEARCH_ENDPOINT            = local.opensearch_endpoint
     OPENSEARCH_CREDENTIALS_SECRET  = module.opensearch_credentials.arn
     GOOGLE_API_KEY_SECRET          = module.google_api_key.arn
+    # Only ever read back by realtime GET in the indexer
+    OPENSEARCH_REFRESH_POLICY = "none"
+    CH_CACHE_INDEX            = "companies-house-cache"
+    CH_RATE_LIMIT_INDEX       = "companies-house-rate-limit"
   }
 }
 
@@ -108,6 +128,7 @@ module "pipeline_step_function" {
     augmenter_lambda_arn             = module.augmenter.function.arn
     indexer_lambda_arn               = module.indexer.function.arn
     company_disambiguator_lambda_arn = module.company_disambiguator.function.arn
+    refresher_lambda_arn             = module.refresher.function.arn
     map_run_label                    = local.map_run_label
   })
 
@@ -117,7 +138,8 @@ module "pipeline_step_function" {
         module.scraper.function.arn,
         module.augmenter.function.arn,
         module.indexer.function.arn,
-        module.company_disambiguator.function.arn
+        module.company_disambiguator.function.arn,
+        module.refresher.function.arn
       ]
     }
   }